@@ -46,8 +46,25 @@ CREATE TABLE IF NOT EXISTS patient (
     birth_year INT NOT NULL,
     gender VARCHAR(50) NOT NULL,
     phone_number VARCHAR(20) NOT NULL,
-    nationality VARCHAR(100) NOT NULL,
-    medical_history TEXT
+    nationality VARCHAR(100) NOT NULL
+);
+
+-- ✅ Medical Condition Dictionary (one row per distinct condition name)
+CREATE TABLE IF NOT EXISTS medical_condition (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    UNIQUE KEY uq_medical_condition_name (name)
+);
+
+-- ✅ Patient Conditions (a patient's medical history, in order)
+CREATE TABLE IF NOT EXISTS patient_condition (
+    patient_id INT NOT NULL,
+    condition_id INT NOT NULL,
+    position INT NOT NULL,
+    PRIMARY KEY (patient_id, condition_id),
+    FOREIGN KEY (patient_id) REFERENCES patient(id) ON DELETE CASCADE,
+    FOREIGN KEY (condition_id) REFERENCES medical_condition(id) ON DELETE CASCADE,
+    INDEX idx_patient_condition_condition (condition_id, patient_id)
 );
 
 -- ✅ Prescription Table (Links Doctor & Patient)
@@ -58,7 +75,9 @@ CREATE TABLE IF NOT EXISTS prescription (
     medication VARCHAR(255) NOT NULL,
     date_issued DATETIME NOT NULL,
     FOREIGN KEY (doctor_id) REFERENCES doctor(id) ON DELETE CASCADE,
-    FOREIGN KEY (patient_id) REFERENCES patient(id) ON DELETE CASCADE
+    FOREIGN KEY (patient_id) REFERENCES patient(id) ON DELETE CASCADE,
+    INDEX idx_prescription_patient_issued (patient_id, date_issued),
+    INDEX idx_prescription_doctor_issued (doctor_id, date_issued)
 );
 
 -- ✅ Printed Prescriptions Table (Logs Prescription Printing)
@@ -68,7 +87,8 @@ CREATE TABLE IF NOT EXISTS printed_prescriptions (
     data_entry_id INT NOT NULL,
     printed_at DATETIME NOT NULL,
     FOREIGN KEY (prescription_id) REFERENCES prescription(id) ON DELETE CASCADE,
-    FOREIGN KEY (data_entry_id) REFERENCES data_entry(id) ON DELETE CASCADE
+    FOREIGN KEY (data_entry_id) REFERENCES data_entry(id) ON DELETE CASCADE,
+    INDEX idx_printed_prescription_printed (prescription_id, printed_at)
 );
 
 
@@ -1,9 +1,31 @@
+import csv
+import gzip
+import io
+import json
+import logging
+import os
 import pytest
+import threading
 from datetime import date
 from datetime import datetime
+from decimal import Decimal
 from hospital import (
     Person, Employee, Doctor, Patient, DataEntry, Manager, Nurse, Prescription ,PrescriptionFactory , HospitalDatabase
 )
+from backends import translate_schema
+from cache import EntityCache
+from categories import CategoryDictionary, DEPARTMENTS, MEDICATIONS, NATIONALITIES
+from export import export_table
+from importer import _shard_lines, _shards, import_csv, import_parallel
+from logging_config import configure_logging, shutdown_logging
+from payroll import Payroll, department_summary, main as payroll_main
+from pool import ConnectionPool, PoolTimeoutError
+from query_stats import QueryStats, normalize
+from registry import HospitalRegistry
+from roster import Roster
+from write_behind import WriteBehindWriter
+from benchmarks.bench_startup import DEFERRED, IMPORT_BUDGET, import_profile
+from benchmarks.suite import compare
 
 # ✅ Fixture for valid Person instance
 @pytest.fixture
@@ -238,4 +260,1264 @@ def test_hospital_database_singleton():
     assert db1 is db2  # Both instances should be the same
 
 
+# ✅ Test ConnectionPool
+class FakeConnection:
+    """Minimal stand-in for a DB-API connection."""
+    def __init__(self):
+        self.alive = True
+        self.closed = False
 
+    def close(self):
+        self.closed = True
+
+
+def test_pool_reuses_released_connection():
+    """A checked-in connection is handed out again instead of opening a new one."""
+    pool = ConnectionPool(FakeConnection, min_size=1, max_size=2)
+    pool.fill()
+    with pool.connection() as first:
+        assert pool.in_use == 1
+    with pool.connection() as second:
+        assert second is first
+    assert pool.size == 1
+
+
+def test_pool_is_bounded():
+    """Checkout blocks at max_size and times out with PoolTimeoutError."""
+    pool = ConnectionPool(FakeConnection, min_size=0, max_size=1, timeout=0.05)
+    conn = pool.acquire()
+    with pytest.raises(PoolTimeoutError):
+        pool.acquire()
+    pool.release(conn)
+    assert pool.acquire() is conn
+
+
+def test_pool_replaces_unhealthy_connection():
+    """A connection failing its health check on checkout is closed and replaced."""
+    pool = ConnectionPool(FakeConnection, max_size=1, validate=lambda c: c.alive, health_check_after=0)
+    conn = pool.acquire()
+    conn.alive = False
+    pool.release(conn)
+    replacement = pool.acquire()
+    assert replacement is not conn
+    assert conn.closed
+    assert pool.size == 1
+
+
+def test_pool_concurrent_checkout():
+    """Concurrent workers never share a connection or exceed max_size."""
+    pool = ConnectionPool(FakeConnection, max_size=3)
+    holders = {}
+    lock = threading.Lock()
+    errors = []
+
+    def worker():
+        for _ in range(200):
+            with pool.connection() as conn:
+                with lock:
+                    if id(conn) in holders:
+                        errors.append("connection shared between threads")
+                    holders[id(conn)] = threading.get_ident()
+                with lock:
+                    del holders[id(conn)]
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert not errors
+    assert pool.size <= 3
+
+
+def test_hospital_database_rejects_unknown_setting():
+    """configure() only accepts known connection settings."""
+    with pytest.raises(ValueError):
+        HospitalDatabase.configure(hostname="db")
+
+
+# ✅ Test bulk persistence
+class RecordingCursor:
+    """Cursor that records statements and hands out auto-increment ids."""
+    def __init__(self, conn):
+        self.conn = conn
+        self.lastrowid = None
+        self.rowcount = -1
+
+    def execute(self, sql, params=None):
+        self.conn.statements.append((sql, params))
+        if "VALUES" in sql:
+            self.lastrowid = self.conn.next_id
+            self.conn.next_id += sql.count("(%s")
+
+    def fetchone(self):
+        return (1,)
+
+    def fetchall(self):
+        return []
+
+    def close(self):
+        pass
+
+
+class RecordingConnection(FakeConnection):
+    def __init__(self):
+        super().__init__()
+        self.statements = []
+        self.commits = 0
+        self.rollbacks = 0
+        self.next_id = 1
+        self.connection_id = 1
+        self.prepared_cursors = 0
+
+    def cursor(self, prepared=False):
+        self.prepared_cursors += prepared
+        return RecordingCursor(self)
+
+    def commit(self):
+        self.commits += 1
+
+    def rollback(self):
+        self.rollbacks += 1
+
+    def is_connected(self):
+        return True
+
+
+@pytest.fixture
+def recording_db(monkeypatch):
+    settings = dict(HospitalDatabase.config)
+    conn = RecordingConnection()
+    monkeypatch.setattr(HospitalDatabase, "_open_connection", lambda self: conn)
+    HospitalDatabase.configure(backend="mysql", pool_min_size=0, pool_max_size=1)
+    yield conn
+    HospitalDatabase.configure(**settings)
+
+
+def test_patient_save_many_batches_rows(recording_db):
+    """save_many writes one multi-row INSERT and one commit per batch."""
+    patients = [Patient(i, f"Patient {i}", 1990, "Male", "1234567890", "Egyptian", ["Flu"]) for i in range(1, 8)]
+    assert Patient.save_many(patients, batch_size=3) == 7
+    inserts = [sql for sql, _ in recording_db.statements if sql.startswith("INSERT INTO patient (")]
+    assert [sql.count("(%s") for sql in inserts] == [3, 3, 1]
+    assert recording_db.commits == 1 + 3  # the new "Flu" condition, then one per batch
+
+
+def test_employee_save_many_accepts_generator(recording_db):
+    """save_many streams any iterable of employees."""
+    staff = (Manager(i, f"Manager {i}", 1980, "Female", "1234567890", 9000, "Administration", "Egyptian") for i in range(1, 5))
+    assert Employee.save_many(staff, batch_size=10) == 4
+    sql, params = next(stmt for stmt in recording_db.statements if stmt[0].startswith("INSERT INTO employee"))
+    assert len(params) == 4 * len(Employee._columns)
+
+
+def test_prescription_save_many_assigns_ids(recording_db, valid_doctor, valid_patient):
+    """Each prescription gets its auto-increment id back after a bulk save."""
+    recording_db.next_id = 100
+    prescriptions = [Prescription(valid_doctor, valid_patient, f"Drug {i}") for i in range(5)]
+    assert Prescription.save_many(prescriptions, batch_size=2) == 5
+    assert [p.id for p in prescriptions] == [100, 101, 102, 103, 104]
+
+
+def test_save_many_rejects_bad_batch_size(recording_db, valid_patient):
+    """A non-positive batch size is rejected."""
+    with pytest.raises(ValueError):
+        Patient.save_many([valid_patient], batch_size=0)
+
+
+def test_read_checkout_ends_its_transaction(recording_db):
+    """A read's implicit transaction (and its snapshot) ends before the connection is pooled again."""
+    db = HospitalDatabase()
+    db.query("SELECT 1;")
+    db.query("SELECT 2;")
+    assert recording_db.rollbacks == 2 and recording_db.commits == 0
+
+
+# ✅ Test embedded SQLite backend
+@pytest.fixture
+def sqlite_db(tmp_path):
+    """A private on-disk SQLite database per test, safe to run in parallel."""
+    settings = dict(HospitalDatabase.config)
+    HospitalDatabase.configure(backend="sqlite", sqlite_path=str(tmp_path / "hospital.db"), pool_min_size=1, pool_max_size=4)
+    db = HospitalDatabase()
+    yield db
+    HospitalDatabase.configure(**settings)
+
+
+def test_translate_schema_for_sqlite():
+    """The MySQL schema translates to SQLite DDL."""
+    script = translate_schema("""
+        CREATE DATABASE IF NOT EXISTS hospitalll_db;
+        USE hospitalll_db;
+        -- ✅ Comment
+        CREATE TABLE IF NOT EXISTS visit (
+            id INT AUTO_INCREMENT PRIMARY KEY,
+            patient_id INT NOT NULL,
+            INDEX idx_visit_patient (patient_id)
+        );
+    """)
+    assert "CREATE DATABASE" not in script and "USE" not in script
+    assert "id INTEGER PRIMARY KEY AUTOINCREMENT" in script
+    assert "CREATE INDEX IF NOT EXISTS idx_visit_patient ON visit (patient_id)" in script
+
+
+def test_sqlite_backend_uses_wal(sqlite_db):
+    """The embedded engine runs in WAL mode with foreign keys enforced."""
+    assert sqlite_db.query("PRAGMA journal_mode;") == [("wal",)]
+    assert sqlite_db.query("PRAGMA foreign_keys;") == [(1,)]
+
+
+def test_sqlite_round_trip(sqlite_db, valid_doctor, valid_patient):
+    """Entities save through the SQLite backend and read back with native types."""
+    valid_doctor.save_to_db()
+    valid_patient.save_to_db()
+    prescription = Prescription(valid_doctor, valid_patient, "Amoxicillin")
+    prescription.save_to_db()
+    assert prescription.id == 1
+
+    rows = sqlite_db.query("SELECT medication, date_issued FROM prescription WHERE id = %s;", (prescription.id,))
+    assert rows == [("Amoxicillin", prescription.date_issued)]
+
+
+def test_sqlite_bulk_ids(sqlite_db, valid_doctor, valid_patient):
+    """Bulk-saved prescriptions get their SQLite AUTOINCREMENT ids."""
+    valid_doctor.save_to_db()
+    valid_patient.save_to_db()
+    prescriptions = [Prescription(valid_doctor, valid_patient, f"Drug {i}") for i in range(5)]
+    Prescription.save_many(prescriptions, batch_size=2)
+    stored = dict(sqlite_db.query("SELECT id, medication FROM prescription;"))
+    assert {p.id: p.medication for p in prescriptions} == stored
+
+
+def test_sqlite_enforces_foreign_keys(sqlite_db, valid_data_entry, caplog):
+    """Logging a print for a missing prescription is rejected by the FK."""
+    valid_data_entry.print_prescription(999)
+    assert "Database Error" in caplog.text
+    assert sqlite_db.query("SELECT COUNT(*) FROM printed_prescriptions;") == [(0,)]
+
+
+def test_pinned_connection_returned_when_thread_exits(sqlite_db):
+    """Threads using the legacy db.cursor give their connection back when they exit."""
+    def legacy_read():
+        sqlite_db.cursor.execute("SELECT COUNT(*) FROM patient;")
+        sqlite_db.cursor.fetchall()
+
+    for _ in range(sqlite_db.pool.max_size + 1):
+        thread = threading.Thread(target=legacy_read)
+        thread.start()
+        thread.join()
+    assert sqlite_db.pool.in_use == 0
+
+
+# ✅ Test transactions and group commit
+def test_transaction_commits_once(recording_db, valid_patient, valid_doctor):
+    """Saves inside a transaction share one commit at exit."""
+    db = HospitalDatabase()
+    with db.transaction():
+        valid_patient.save_to_db()
+        valid_doctor.save_to_db()
+        assert recording_db.commits == 0
+    assert recording_db.commits == 1
+
+
+def test_transaction_rolls_back_on_error(sqlite_db, valid_patient):
+    """An exception inside the block undoes all of its statements."""
+    with pytest.raises(RuntimeError):
+        with sqlite_db.transaction():
+            valid_patient.save_to_db()
+            raise RuntimeError("abort")
+    assert sqlite_db.query("SELECT COUNT(*) FROM patient;") == [(0,)]
+
+
+def test_nested_transaction_uses_savepoint(sqlite_db, valid_patient, valid_doctor):
+    """A failing nested block is undone without aborting the outer one."""
+    with sqlite_db.transaction():
+        valid_patient.save_to_db()
+        with pytest.raises(RuntimeError):
+            with sqlite_db.transaction():
+                valid_doctor.save_to_db()
+                raise RuntimeError("abort")
+    assert sqlite_db.query("SELECT COUNT(*) FROM patient;") == [(1,)]
+    assert sqlite_db.query("SELECT COUNT(*) FROM employee;") == [(0,)]
+
+
+def test_group_commit_coalesces_concurrent_writes(recording_db):
+    """Concurrent writers share commits when group commit is enabled."""
+    HospitalDatabase.configure(group_commit_window=0.02)
+    db = HospitalDatabase()
+    start_line = threading.Barrier(8)
+
+    def worker(n):
+        start_line.wait()
+        for i in range(5):
+            db.execute("INSERT INTO audit (n) VALUES (%s);", (n * 10 + i,))
+
+    threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    writes = [sql for sql, _ in recording_db.statements if sql.startswith("INSERT INTO audit")]
+    assert len(writes) == 40
+    assert recording_db.commits == db.group_commit.commits
+    assert recording_db.commits < 40
+
+
+def test_entity_saves_use_group_commit(recording_db, valid_patient, valid_doctor, valid_nurse):
+    """Saves wrapped in transaction() commit through the group committer."""
+    HospitalDatabase.configure(group_commit_window=0.01)
+    db = HospitalDatabase()
+    valid_patient.save_to_db()
+    valid_doctor.save_to_db()
+    valid_nurse.save_to_db()
+    assert db.group_commit.commits > 0
+    assert recording_db.commits == db.group_commit.commits
+
+
+def test_group_committed_transaction_rolls_back_own_block(sqlite_db, valid_patient, valid_doctor):
+    """A failing transaction on the shared connection undoes only its own statements."""
+    HospitalDatabase.configure(group_commit_window=0.01)
+    db = HospitalDatabase()
+    valid_patient.save_to_db()
+    with pytest.raises(RuntimeError):
+        with db.transaction():
+            valid_doctor.save_to_db()
+            raise RuntimeError("abort")
+    db.execute("INSERT INTO medical_condition (name) VALUES (%s);", ("Gout",))
+    assert db.query("SELECT COUNT(*) FROM patient;") == [(1,)]
+    assert db.query("SELECT COUNT(*) FROM employee;") == [(0,)]
+
+
+# ✅ Test polymorphic employee persistence
+def test_employee_save_writes_subtype_rows(sqlite_db, valid_doctor, valid_nurse, valid_employee, valid_data_entry):
+    """Each employee subclass writes its parent and subtype rows."""
+    for employee in (valid_doctor, valid_nurse, valid_employee, valid_data_entry):
+        employee.save_to_db()
+    assert sqlite_db.query("SELECT COUNT(*) FROM employee;") == [(4,)]
+    assert sqlite_db.query("SELECT id, specialization FROM doctor;") == [(301, "Neurosurgeon")]
+    assert sqlite_db.query("SELECT id, specialty FROM nurse;") == [(202, "Emergency Care")]
+    assert sqlite_db.query("SELECT id FROM manager;") == [(101,)]
+    assert sqlite_db.query("SELECT id FROM data_entry;") == [(1001,)]
+
+
+def test_employee_save_is_atomic(sqlite_db, valid_doctor):
+    """A failing subtype insert leaves no orphan employee row."""
+    sqlite_db.execute("DROP TABLE doctor;")
+    valid_doctor.save_to_db()
+    assert sqlite_db.query("SELECT COUNT(*) FROM employee;") == [(0,)]
+
+
+def test_employee_save_single_commit(recording_db, valid_doctor):
+    """A hire costs two INSERTs and one commit."""
+    valid_doctor.save_to_db()
+    assert [sql.split("(")[0].split()[-1] for sql, _ in recording_db.statements] == ["employee", "doctor"]
+    assert recording_db.commits == 1
+
+
+def test_employee_save_many_mixed_subtypes(recording_db, valid_doctor, valid_nurse, valid_employee, valid_data_entry):
+    """A mixed batch writes one INSERT per table and commits once."""
+    assert Employee.save_many([valid_doctor, valid_nurse, valid_employee, valid_data_entry]) == 4
+    tables = [sql.split("(")[0].split()[-1] for sql, _ in recording_db.statements]
+    assert tables == ["employee", "doctor", "nurse", "manager", "data_entry"]
+    assert recording_db.commits == 1
+
+
+def test_print_prescription_after_data_entry_save(sqlite_db, valid_data_entry, valid_doctor, valid_patient):
+    """Saved DataEntry staff satisfy the printed_prescriptions foreign key."""
+    valid_data_entry.save_to_db()
+    valid_doctor.save_to_db()
+    valid_patient.save_to_db()
+    prescription = Prescription(valid_doctor, valid_patient, "Amoxicillin")
+    prescription.save_to_db()
+    valid_data_entry.print_prescription(prescription.id)
+    assert sqlite_db.query("SELECT prescription_id, data_entry_id FROM printed_prescriptions;") == [(prescription.id, 1001)]
+
+
+# ✅ Test polymorphic employee loading
+@pytest.fixture
+def saved_staff(sqlite_db, valid_doctor, valid_nurse, valid_employee, valid_data_entry):
+    staff = [valid_doctor, valid_nurse, valid_employee, valid_data_entry]
+    Employee.save_many(staff)
+    return staff
+
+
+def test_load_all_rehydrates_subclasses(saved_staff):
+    """load_all builds the right subclass for every employee."""
+    loaded = {e.id: e for e in Employee.load_all(chunk_size=2)}
+    assert {i: type(e) for i, e in loaded.items()} == {e.id: type(e) for e in saved_staff}
+    assert loaded[301].specialization == "Neurosurgeon"
+    assert loaded[202].specialty == "Emergency Care"
+    assert loaded[101].salary == 90000
+
+
+def test_load_by_ids_returns_requested_subset(saved_staff):
+    """load_by_ids only returns the requested employees."""
+    loaded = list(Employee.load_by_ids([202, 1001, 999], batch_size=2))
+    assert [(e.id, type(e)) for e in loaded] == [(202, Nurse), (1001, DataEntry)]
+
+
+def test_load_all_skips_rows_without_subtype(sqlite_db, saved_staff):
+    """Legacy employee rows without a subtype row cannot be instantiated."""
+    sqlite_db.execute("DELETE FROM manager;")
+    assert 101 not in {e.id for e in Employee.load_all()}
+
+
+def test_stream_abandoned_early_releases_connection(sqlite_db, saved_staff):
+    """Closing a half-read stream returns its connection to the pool."""
+    rows = sqlite_db.stream("SELECT id FROM employee;", chunk_size=1)
+    next(rows)
+    rows.close()
+    assert sqlite_db.pool.in_use == 0
+
+
+# ✅ Test trusted hydration constructors
+def test_patient_from_row_matches_constructor(valid_patient):
+    """from_row builds the same Patient the validating constructor does."""
+    patient = Patient.from_row(valid_patient._db_values(), valid_patient.medical_history)
+    assert patient._db_values() == valid_patient._db_values()
+    assert patient.medical_history == valid_patient.medical_history
+    assert patient.prescriptions == []
+
+
+def test_from_row_skips_validation():
+    """Trusted rows are not re-validated."""
+    person = Person.from_row((2001, "John Doe", 1990, "Male", "123-456", "USA"))
+    assert person.phone_number == "123-456"
+    with pytest.raises(ValueError):
+        Person(2001, "John Doe", 1990, "Male", "123-456", "USA")
+
+
+def test_employee_from_rows_dispatches_subclass():
+    """Employee.from_rows picks the subclass and skips rows without a subtype."""
+    rows = [
+        (301, "Dr. Emily Carter", 1985, "Female", "5551112222", 120000, "Surgery", "Canadian", "Neurosurgeon", None, None, None),
+        (202, "Mark Wilson", 1992, "Male", "9876543210", 50000, "ICU", "British", None, "Emergency Care", None, None),
+        (7, "Legacy Row", 1970, "Male", "1234567890", 1000, "Records", "Egyptian", None, None, None, None),
+    ]
+    doctor, nurse = Employee.from_rows(rows)
+    assert isinstance(doctor, Doctor) and doctor.specialization == "Neurosurgeon"
+    assert isinstance(nurse, Nurse) and nurse.specialty == "Emergency Care"
+
+
+def test_prescription_from_rows_resolves_entities(valid_doctor, valid_patient):
+    """Prescription rows resolve their doctor and patient through id maps."""
+    issued = datetime(2025, 1, 2, 3, 4, 5)
+    (prescription,) = Prescription.from_rows(
+        [(9, 301, 401, "Amoxicillin", issued)], {301: valid_doctor}, {401: valid_patient}
+    )
+    assert prescription.id == 9
+    assert prescription.doctor is valid_doctor and prescription.patient is valid_patient
+    assert prescription.date_issued == issued
+
+
+# ✅ Test compact slotted entities
+@pytest.mark.parametrize("fixture", ["valid_person", "valid_doctor", "valid_nurse", "valid_employee", "valid_data_entry", "valid_patient", "valid_prescription"])
+def test_entities_have_no_instance_dict(fixture, request):
+    """Every entity stores its fields in slots rather than a __dict__."""
+    entity = request.getfixturevalue(fixture)
+    assert not hasattr(entity, "__dict__")
+    with pytest.raises(AttributeError):
+        entity.unexpected_field = 1
+
+
+def test_slots_keep_abstract_contract():
+    """Employee stays abstract with __slots__ in place."""
+    with pytest.raises(TypeError):
+        Employee(1, "Abstract", 1990, "Male", "1234567890", "USA", 1000, "Records")
+
+
+# ✅ Test indexed prescription collection
+def test_add_prescription_detects_duplicates(valid_doctor, valid_patient, capsys):
+    """A second order for the same drug by the same doctor on the same day is rejected."""
+    valid_doctor.write_prescription(valid_patient, "Amoxicillin")
+    valid_doctor.write_prescription(valid_patient, "Amoxicillin")
+    assert len(valid_patient.prescriptions) == 1
+    assert "already exists" in capsys.readouterr().out
+
+
+def test_prescription_identity_uses_issue_day(valid_doctor, valid_patient):
+    """Orders issued on different days are distinct."""
+    first = Prescription(valid_doctor, valid_patient, "Amoxicillin")
+    later = Prescription(valid_doctor, valid_patient, "Amoxicillin")
+    later.date_issued = first.date_issued.replace(year=first.date_issued.year - 1)
+    assert first != later
+    valid_patient.add_prescription(first)
+    valid_patient.add_prescription(later)
+    assert len(valid_patient.prescriptions) == 2
+
+
+def test_prescription_collection_secondary_lookups(valid_doctor, valid_patient):
+    """Prescriptions can be looked up by medication and by doctor."""
+    other_doctor = Doctor(302, "Dr. Omar", 1980, "Male", "5551113333", "Egyptian", 110000, "ICU", "Intensivist")
+    valid_doctor.write_prescription(valid_patient, "Amoxicillin")
+    valid_doctor.write_prescription(valid_patient, "Ibuprofen")
+    other_doctor.write_prescription(valid_patient, "Amoxicillin")
+    prescriptions = valid_patient.prescriptions
+    assert [p.doctor.id for p in prescriptions.by_medication("Amoxicillin")] == [301, 302]
+    assert [p.medication for p in prescriptions.by_doctor(301)] == ["Amoxicillin", "Ibuprofen"]
+    first = prescriptions[0]
+    assert prescriptions.get(301, "Amoxicillin", first.date_issued.date()) is first
+
+
+def test_prescription_collection_is_list_compatible(valid_doctor, valid_patient):
+    """Indexing, deletion, reversal and list equality behave like a list."""
+    for medication in ("A", "B", "C"):
+        valid_doctor.write_prescription(valid_patient, medication)
+    prescriptions = valid_patient.prescriptions
+    a, b, c = prescriptions
+    assert prescriptions == [a, b, c]
+    prescriptions.reverse()
+    assert prescriptions[-1] is a
+    del prescriptions[0]
+    assert prescriptions == [b, a]
+    assert c not in prescriptions and prescriptions.by_medication("C") == []
+    prescriptions.append(c)
+    with pytest.raises(ValueError):
+        prescriptions.append(Prescription(valid_doctor, valid_patient, "C"))
+
+
+def test_prescription_equality_includes_patient(valid_doctor, valid_patient):
+    """The same order for two different patients is two prescriptions."""
+    other_patient = Patient(402, "Mona Ali", 1990, "Female", "4445557777", "Egyptian", ["Flu"])
+    a = Prescription(valid_doctor, valid_patient, "Amoxicillin")
+    b = Prescription(valid_doctor, other_patient, "Amoxicillin")
+    assert a != b and len({a, b}) == 2
+    valid_patient.add_prescription(a)
+    assert b not in valid_patient.prescriptions
+
+
+def test_prescription_slice_assignment_is_atomic(valid_doctor, valid_patient):
+    """A slice assignment that would create a duplicate leaves the collection unchanged."""
+    for medication in ("A", "B"):
+        valid_doctor.write_prescription(valid_patient, medication)
+    prescriptions = valid_patient.prescriptions
+    a, b = prescriptions
+    with pytest.raises(ValueError):
+        prescriptions[0:1] = [Prescription(valid_doctor, valid_patient, "B")]
+    assert prescriptions == [a, b] and prescriptions.by_medication("A") == [a]
+    del prescriptions[0:1]
+    assert prescriptions == [b] and a not in prescriptions
+
+
+# ✅ Test prescription history queries
+@pytest.fixture
+def prescription_history(sqlite_db, valid_doctor, valid_patient):
+    """Five prescriptions for one patient, one per day in January."""
+    valid_doctor.save_to_db()
+    valid_patient.save_to_db()
+    prescriptions = []
+    for day in range(1, 6):
+        prescription = Prescription(valid_doctor, valid_patient, f"Drug {day}")
+        prescription.date_issued = datetime(2025, 1, day, 9, 0)
+        prescriptions.append(prescription)
+    Prescription.save_many(prescriptions)
+    return prescriptions
+
+
+def test_load_prescriptions_keyset_pages(prescription_history, valid_patient):
+    """Pages come back newest first and continue from the last row seen."""
+    first = valid_patient.load_prescriptions(limit=2)
+    assert [p.medication for p in first] == ["Drug 5", "Drug 4"]
+    last = first[-1]
+    second = valid_patient.load_prescriptions(limit=2, after=(last.date_issued, last.id))
+    assert [p.medication for p in second] == ["Drug 3", "Drug 2"]
+    assert isinstance(second[0].doctor, Doctor) and second[0].patient is valid_patient
+
+
+def test_load_prescriptions_since(prescription_history, valid_patient):
+    """since bounds the history from below."""
+    recent = valid_patient.load_prescriptions(since=datetime(2025, 1, 4))
+    assert [p.medication for p in recent] == ["Drug 5", "Drug 4"]
+
+
+def test_prescription_history_uses_composite_index(sqlite_db):
+    """The history query is served by the (patient_id, date_issued) index."""
+    plan = sqlite_db.query(
+        "EXPLAIN QUERY PLAN SELECT id FROM prescription WHERE patient_id = %s AND date_issued <= %s"
+        " AND (date_issued < %s OR id < %s) ORDER BY date_issued DESC, id DESC LIMIT 10;",
+        (1, datetime(2025, 1, 1), datetime(2025, 1, 1), 5),
+    )
+    details = " ".join(row[-1] for row in plan)
+    assert "idx_prescription_patient_issued (patient_id=? AND date_issued<?)" in details
+    assert "TEMP B-TREE" not in details
+
+
+# ✅ Test entity cache
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_entity_cache_evicts_least_recently_used():
+    """The cache is bounded and evicts the least recently used entry."""
+    cache = EntityCache(maxsize=2)
+    cache.put(1, "a")
+    cache.put(2, "b")
+    assert cache.get(1) == "a"
+    cache.put(3, "c")
+    assert cache.get(2) is None
+    assert cache.stats() == {"size": 2, "hits": 1, "misses": 1, "evictions": 1, "expirations": 0}
+
+
+def test_entity_cache_expires_entries():
+    """Entries older than the TTL are treated as misses."""
+    clock = FakeClock()
+    cache = EntityCache(maxsize=10, ttl=5, clock=clock)
+    cache.put(1, "a")
+    clock.now = 4.9
+    assert cache.get(1) == "a"
+    clock.now = 5.0
+    assert cache.get(1) is None
+    assert cache.expirations == 1
+
+
+def test_entity_cache_rejects_stale_put():
+    """A read that raced with an invalidation is not cached."""
+    cache = EntityCache()
+    token = cache.token()
+    cache.invalidate(1)
+    cache.put(1, "stale", token)
+    assert cache.get(1) is None
+
+
+def test_patient_load_reads_through_cache(sqlite_db, valid_patient):
+    """The second lookup of a patient is served from the cache."""
+    valid_patient.save_to_db()
+    first = Patient.load(valid_patient.id)
+    assert first.medical_history == ["Asthma"]
+    assert Patient.load(valid_patient.id) is first
+    assert sqlite_db.cache_stats()["patient"]["hits"] == 1
+    assert Patient.load(999) is None
+
+
+def test_delete_invalidates_cache(sqlite_db, valid_doctor, valid_patient):
+    """Deleting an entity drops it from the cache."""
+    valid_doctor.save_to_db()
+    valid_patient.save_to_db()
+    assert Employee.load(valid_doctor.id) is not None
+    assert Patient.load(valid_patient.id) is not None
+    valid_doctor.delete_from_db()
+    valid_patient.delete_from_db()
+    assert Employee.load(valid_doctor.id) is None
+    assert Patient.load(valid_patient.id) is None
+
+
+def test_cache_can_be_disabled(sqlite_db, valid_patient):
+    """A cache size of zero turns caching off."""
+    HospitalDatabase.configure(cache_size=0)
+    valid_patient.save_to_db()
+    assert Patient.load(valid_patient.id) is not Patient.load(valid_patient.id)
+    assert HospitalDatabase().cache_stats()["patient"]["size"] == 0
+
+
+# ✅ Test streaming export
+def test_export_csv(prescription_history, tmp_path):
+    """A table exports to CSV with a header row."""
+    path = str(tmp_path / "prescriptions.csv")
+    rows, _ = export_table("prescription", path, chunk_size=2)
+    assert rows == 5
+    with open(path, newline="") as f:
+        lines = list(csv.reader(f))
+    assert lines[0] == ["id", "doctor_id", "patient_id", "medication", "date_issued"]
+    assert lines[1] == ["1", "301", "401", "Drug 1", "2025-01-01 09:00:00"]
+
+
+def test_export_gzip_jsonl(prescription_history, tmp_path):
+    """JSON Lines output can be gzip-compressed."""
+    path = str(tmp_path / "prescriptions.jsonl.gz")
+    export_table("prescription", path)
+    with gzip.open(path, "rt") as f:
+        records = [json.loads(line) for line in f]
+    assert len(records) == 5
+    assert records[-1] == {"id": 5, "doctor_id": 301, "patient_id": 401, "medication": "Drug 5", "date_issued": "2025-01-05 09:00:00"}
+
+
+def test_export_medical_history(condition_patients, tmp_path):
+    """The condition tables export, and rebuild every patient's history in order."""
+    exported = {}
+    for table in ("medical_condition", "patient_condition"):
+        path = str(tmp_path / f"{table}.jsonl")
+        export_table(table, path)
+        with open(path) as f:
+            exported[table] = [json.loads(line) for line in f]
+    names = {row["id"]: row["name"] for row in exported["medical_condition"]}
+    histories = {}
+    for row in sorted(exported["patient_condition"], key=lambda row: (row["patient_id"], row["position"])):
+        histories.setdefault(row["patient_id"], []).append(names[row["condition_id"]])
+    assert histories == {p.id: p.medical_history for p in Patient.load_by_ids([1, 2, 3, 4])}
+
+
+def test_export_rejects_unknown_table(tmp_path):
+    """Only hospital tables can be exported."""
+    with pytest.raises(ValueError):
+        export_table("mysql.user", str(tmp_path / "users.csv"))
+
+
+# ✅ Test bulk CSV import
+def write_csv(path, header, rows):
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+    return str(path)
+
+
+def test_import_patients_rejects_bad_rows(sqlite_db, tmp_path, valid_patient):
+    """Invalid and duplicate rows land in the reject file; the rest are imported."""
+    valid_patient.save_to_db()
+    path = write_csv(tmp_path / "patients.csv", ["id", "name", "birth_year", "gender", "phone_number", "nationality", "medical_history"], [
+        [501, "Ann Lee", 1980, "Female", "5550001111", "Canadian", "Asthma, Diabetes"],
+        [502, "Bob Ray", 1975, "Male", "555-000", "American", "Flu"],
+        [401, "John Smith", 1995, "Male", "4445556666", "American", "Asthma"],
+        [503, "Cy Young", "unknown", "Male", "5550002222", "British", "Gout"],
+        [504, "Di Moss", 1990, "Female", "5550003333", "Irish", "Migraine"],
+    ])
+    imported, rejected, _ = import_csv("patient", path, batch_size=10)
+    assert (imported, rejected) == (2, 3)
+    assert Patient.load(501).medical_history == ["Asthma", "Diabetes"]
+    with open(path + ".rejects.csv", newline="") as f:
+        rejects = list(csv.DictReader(f))
+    assert [row["id"] for row in rejects] == ["502", "503", "401"]
+    assert all(row["error"] for row in rejects)
+
+
+def test_import_doctors_writes_subtype_rows(sqlite_db, tmp_path):
+    """Imported staff load back as their subclass."""
+    path = write_csv(tmp_path / "doctors.csv", ["id", "name", "birth_year", "gender", "phone_number", "nationality", "salary", "department", "specialization"], [
+        [601, "Dr. A", 1970, "Female", "5551230001", "Egyptian", "150000.50", "Cardiology", "Cardiologist"],
+        [602, "Dr. B", 1972, "Male", "5551230002", "Egyptian", "140000", "Oncology", "Oncologist"],
+    ])
+    assert import_csv("doctor", path, batch_size=1)[:2] == (2, 0)
+    doctors = list(Employee.load_by_ids([601, 602]))
+    assert [type(d) for d in doctors] == [Doctor, Doctor]
+    assert doctors[0].salary == 150000.5
+    assert not (tmp_path / "doctors.csv.rejects.csv").exists()
+
+
+def test_load_data_batch_with_duplicate_staff_falls_back(sqlite_db, tmp_path, valid_nurse, monkeypatch):
+    """A staff id LOAD DATA skips as a duplicate is rejected whole, not filed under a second subtype."""
+    def load_skipping_duplicates(cursor, table, columns, path):
+        # LOAD DATA LOCAL semantics: duplicate keys are skipped, not errors.
+        with open(path, encoding="utf-8") as tsv:
+            rows = [[None if value == "\\N" else value for value in line.rstrip("\n").split("\t")] for line in tsv]
+        cursor.executemany(f"INSERT OR IGNORE INTO {table} ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))});", rows)
+        return cursor.rowcount
+
+    valid_nurse.save_to_db()
+    monkeypatch.setattr(sqlite_db.backend, "can_load_file", lambda: True)
+    monkeypatch.setattr(sqlite_db.backend, "load_file", load_skipping_duplicates)
+    path = write_csv(tmp_path / "doctors.csv", ["id", "name", "birth_year", "gender", "phone_number", "nationality", "salary", "department", "specialization"], [
+        [202, "Dr. Dup", 1970, "Female", "5551230001", "Egyptian", "150000", "Cardiology", "Cardiologist"],
+        [603, "Dr. C", 1972, "Male", "5551230002", "Egyptian", "140000", "Oncology", "Oncologist"],
+    ])
+    assert import_csv("doctor", path, batch_size=10)[:2] == (1, 1)
+    assert sqlite_db.query("SELECT id FROM doctor;") == [(603,)]
+    assert type(Employee.load(202)) is Nurse
+    with open(path + ".rejects.csv", newline="") as f:
+        assert [row["id"] for row in csv.DictReader(f)] == ["202"]
+
+
+def test_import_requires_constructor_columns(sqlite_db, tmp_path):
+    """A CSV missing constructor fields is refused before anything is written."""
+    path = write_csv(tmp_path / "nurses.csv", ["id", "name"], [[701, "Kim"]])
+    with pytest.raises(ValueError):
+        import_csv("nurse", path)
+
+
+# ✅ Test parallel ingestion
+def test_shards_cover_every_line_once(tmp_path):
+    """Byte-range shards split at line starts and never lose or repeat a line."""
+    path = write_csv(tmp_path / "lines.csv", ["id"], [[i] for i in range(1, 1001)])
+    lines = [line for shard in _shards([path], 7) for line in _shard_lines(*shard)]
+    assert [int(line) for line in lines] == list(range(1, 1001))
+
+
+def test_import_parallel_matches_serial(sqlite_db, tmp_path):
+    """Worker processes parse the shards; the single writer rejects what the database refuses."""
+    header = ["id", "name", "birth_year", "gender", "phone_number", "nationality", "medical_history"]
+    rows = [[i, f"Patient {i}", 1950 + i % 50, "Female", f"555{i:07d}", "Egyptian", "Flu"] for i in range(1, 301)]
+    rows[10][4] = "not-a-number"
+    rows[20][0] = rows[19][0]
+    first = write_csv(tmp_path / "part1.csv", header, rows[:150])
+    second = write_csv(tmp_path / "part2.csv", header, rows[150:])
+    imported, rejected, _ = import_parallel("patient", [first, second], workers=2, batch_size=25)
+    assert (imported, rejected) == (298, 2)
+    assert len(list(Patient.load_by_ids(range(1, 301)))) == 298
+    with open(first + ".rejects.csv", newline="") as f:
+        assert sorted(row["id"] for row in csv.DictReader(f)) == ["11", "20"]
+
+
+# ✅ Test benchmark baseline comparison
+def test_benchmark_compare_flags_regressions(capsys):
+    """Only cases slower than the baseline by more than the tolerance are regressions."""
+    baseline = {"results": {"fast": {"seconds_per_op": 1e-6}, "slow": {"seconds_per_op": 1e-6}}}
+    current = {"results": {"fast": {"seconds_per_op": 1.1e-6}, "slow": {"seconds_per_op": 2e-6}, "new": {"seconds_per_op": 1e-6}}}
+    assert compare(current, baseline, tolerance=0.25) == ["slow"]
+    assert "regression" in capsys.readouterr().out
+
+
+# ✅ Test query instrumentation
+def test_normalize_collapses_literals_and_lists():
+    """Literals and placeholder lists collapse so one statement shape is one stats key."""
+    assert normalize("SELECT *  FROM patient\n WHERE id IN (%s, %s, %s) AND name = 'Ann';") == \
+        "SELECT * FROM patient WHERE id IN (?...) AND name = ?;"
+    assert normalize("INSERT INTO t (a, b) VALUES (%s, %s), (%s, %s);") == normalize("INSERT INTO t (a, b) VALUES (%s, %s);")
+
+
+def test_statement_stats_record_rows_errors_and_slow_queries(sqlite_db, valid_patient, tmp_path):
+    """Statements are grouped by shape; slow ones go to the slow-query log."""
+    log = tmp_path / "slow.log"
+    sqlite_db.stats = QueryStats(slow_threshold=0, slow_log=str(log))
+    valid_patient.save_to_db()
+    sqlite_db.query("SELECT id FROM patient WHERE id = %s;", (valid_patient.id,))
+    sqlite_db.query("SELECT id FROM patient WHERE id = %s;", (12345,))
+    with pytest.raises(sqlite_db.errors):
+        sqlite_db.query("SELECT nope FROM patient;")
+    stats = {s["sql"]: s for s in sqlite_db.statement_stats()}
+    select = stats["SELECT id FROM patient WHERE id = ?;"]
+    assert (select["count"], select["rows"], select["errors"]) == (2, 1, 0)
+    assert stats["SELECT nope FROM patient;"]["errors"] == 1
+    insert = next(s for sql, s in stats.items() if sql.startswith("INSERT INTO patient"))
+    assert insert["rows"] == 1
+    assert select["p50"] <= select["max"]
+    assert "SELECT id FROM patient WHERE id = ?;" in log.read_text()
+    assert "12345" not in log.read_text()
+
+
+# ✅ Test structured logging
+@pytest.fixture
+def log_output():
+    """Route the hospital logger through configure_logging into a buffer, then undo it."""
+    logger = logging.getLogger("hospital")
+    handlers, level, propagate = list(logger.handlers), logger.level, logger.propagate
+    out = io.StringIO()
+    yield out
+    shutdown_logging()
+    logger.handlers[:] = handlers
+    logger.setLevel(level)
+    logger.propagate = propagate
+
+
+def test_save_logs_structured_event(sqlite_db, valid_patient, log_output, capsys):
+    """Write paths log JSON events through the queue instead of printing."""
+    configure_logging(fmt="json", stream=log_output)
+    valid_patient.save_to_db()
+    shutdown_logging()
+    events = [json.loads(line) for line in log_output.getvalue().splitlines()]
+    assert {"event": "patient_saved", "patient_id": 401, "level": "INFO"}.items() <= events[-1].items()
+    assert capsys.readouterr().out == ""
+
+
+def test_quiet_logging_silences_write_paths(sqlite_db, valid_patient, valid_doctor, log_output):
+    """Quiet mode drops the INFO events of every write path."""
+    configure_logging(quiet=True, stream=log_output)
+    valid_patient.save_to_db()
+    valid_doctor.save_to_db()
+    Prescription(valid_doctor, valid_patient, "Ibuprofen").save_to_db()
+    shutdown_logging()
+    assert log_output.getvalue() == ""
+
+
+# ✅ Test prepared-statement cache
+def test_fixed_inserts_reuse_prepared_statement(recording_db):
+    """Repeated saves prepare each INSERT once per connection."""
+    for i in range(1, 4):
+        Patient(i, f"Patient {i}", 1990, "Male", "1234567890", "Egyptian", ["Flu"]).save_to_db()
+    assert recording_db.prepared_cursors == 2  # the patient and its one-condition INSERT
+    assert len([sql for sql, _ in recording_db.statements if "INSERT INTO patient (" in sql]) == 3
+
+
+def test_prepared_statements_reprepared_after_reconnect(recording_db, valid_patient, valid_doctor):
+    """A new server session prepares its statements afresh."""
+    valid_patient.save_to_db()
+    valid_doctor.save_to_db()
+    assert recording_db.prepared_cursors == 4  # patient, patient_condition, employee and doctor INSERTs
+    recording_db.connection_id = 2  # the driver reconnected: a new server session
+    valid_patient.save_to_db()
+    assert recording_db.prepared_cursors == 6
+
+
+# ✅ Test write-behind print logging
+@pytest.fixture
+def audit_db(sqlite_db, tmp_path, valid_data_entry, valid_doctor, valid_patient):
+    """SQLite database with write-behind print logging and one saved prescription."""
+    HospitalDatabase.configure(audit_spool=str(tmp_path / "audit.spool"), audit_flush_interval=0.05)
+    db = HospitalDatabase()
+    valid_data_entry.save_to_db()
+    valid_doctor.save_to_db()
+    valid_patient.save_to_db()
+    prescription = Prescription(valid_doctor, valid_patient, "Amoxicillin")
+    prescription.save_to_db()
+    yield db, prescription.id
+
+
+def test_print_prescription_write_behind(audit_db, valid_data_entry):
+    """Print events are spooled, then inserted in a batch; flush() waits for them."""
+    db, prescription_id = audit_db
+    for _ in range(3):
+        valid_data_entry.print_prescription(prescription_id)
+    valid_data_entry.print_prescription(999)  # violates the foreign key: dropped, not retried
+    assert db.audit.flush(timeout=5)
+    assert db.query("SELECT COUNT(*) FROM printed_prescriptions;") == [(3,)]
+    assert (db.audit.written, db.audit.dropped) == (3, 1)
+    assert os.path.getsize(db.audit.spool_path) == 0
+
+
+def test_write_behind_replays_spool(audit_db, tmp_path):
+    """Rows left uncommitted in the spool by a crashed writer are written on restart."""
+    db, prescription_id = audit_db
+    spool = tmp_path / "crashed.spool"
+    spool.write_text(
+        f'{{"seq":1,"row":[{prescription_id},1001,{{"datetime":"2025-01-01T09:00:00"}}]}}\n'
+        '{"committed":1}\n'
+        f'{{"seq":2,"row":[{prescription_id},1001,{{"datetime":"2025-01-02T09:00:00"}}]}}\n'
+        '{"seq":3,"row":[1'  # torn write
+    )
+    writer = WriteBehindWriter(db, "printed_prescriptions", ("prescription_id", "data_entry_id", "printed_at"), str(spool))
+    writer.close()
+    assert db.query("SELECT printed_at FROM printed_prescriptions;") == [(datetime(2025, 1, 2, 9, 0),)]
+    with pytest.raises(RuntimeError):
+        writer.submit((prescription_id, 1001, datetime.now()))
+
+
+class ExhaustedPoolDatabase:
+    """Stand-in database whose every transaction times out waiting for a connection."""
+    errors = (ConnectionError,)
+    permanent_errors = (ValueError,)
+
+    def __init__(self):
+        self.attempts = 0
+
+    @property
+    def backend(self):
+        return self
+
+    def transaction(self):
+        self.attempts += 1
+        raise PoolTimeoutError("Timed out waiting for a database connection.")
+
+
+def test_write_behind_close_during_outage(tmp_path):
+    """Pool timeouts are retried, and close() returns even with the queue full."""
+    spool = str(tmp_path / "outage.spool")
+    db = ExhaustedPoolDatabase()
+    writer = WriteBehindWriter(db, "printed_prescriptions", ("prescription_id", "data_entry_id", "printed_at"), spool,
+                               batch_size=1, flush_interval=0.01, max_queue=2, retry_interval=0.01)
+    writer.submit((1, 1001, datetime(2025, 1, 1, 9, 0)))
+    while db.attempts < 2:
+        assert writer._thread.is_alive()
+        threading.Event().wait(0.01)
+    writer.submit((2, 1001, datetime(2025, 1, 2, 9, 0)))
+    writer.submit((3, 1001, datetime(2025, 1, 3, 9, 0)))
+    writer.close(timeout=5)
+    assert not writer._thread.is_alive()
+    assert writer.pending == 3
+    assert [row[0] for _, row in WriteBehindWriter._read_spool(writer)] == [1, 2, 3]
+
+
+# ✅ Test normalized medical history
+@pytest.fixture
+def condition_patients(sqlite_db):
+    histories = {1: ["Flu", "Asthma"], 2: ["Asthma", "Diabetes"], 3: ["Diabetes"], 4: ["Flu", "Asthma", "Diabetes"]}
+    Patient.save_many(Patient(i, f"Patient {i}", 1990, "Female", "1234567890", "Egyptian", h) for i, h in histories.items())
+    return sqlite_db
+
+
+def test_medical_history_round_trip(condition_patients):
+    """Histories load back in order, each condition stored once in the dictionary."""
+    assert Patient.load(4).medical_history == ["Flu", "Asthma", "Diabetes"]
+    assert [p.medical_history for p in Patient.load_by_ids([2, 3])] == [["Asthma", "Diabetes"], ["Diabetes"]]
+    assert condition_patients.query("SELECT COUNT(*) FROM medical_condition;") == [(3,)]
+
+
+def test_ids_with_conditions(condition_patients):
+    """Patients are found by all, any, or a mix of conditions."""
+    assert Patient.ids_with_conditions(all_of=["Flu", "Asthma"]) == [1, 4]
+    assert Patient.ids_with_conditions(any_of=["Flu", "Diabetes"]) == [1, 2, 3, 4]
+    assert Patient.ids_with_conditions(all_of=["Asthma"], any_of=["Flu", "Diabetes"]) == [1, 2, 4]
+    assert Patient.ids_with_conditions(all_of=["Asthma", "Measles"]) == []
+    with pytest.raises(ValueError):
+        Patient.ids_with_conditions()
+
+
+def test_condition_lookup_uses_index(condition_patients):
+    """Patients by condition come from the (condition_id, patient_id) index alone."""
+    plan = condition_patients.query("EXPLAIN QUERY PLAN SELECT patient_id FROM patient_condition WHERE condition_id IN (%s, %s);", (1, 2))
+    assert any("COVERING INDEX idx_patient_condition_condition" in row[-1] for row in plan)
+
+
+def test_rolled_back_condition_not_cached(sqlite_db, valid_patient):
+    """A condition added in a rolled-back transaction is added again on the next save."""
+    with pytest.raises(RuntimeError):
+        with sqlite_db.transaction():
+            valid_patient.save_to_db()
+            raise RuntimeError("abort")
+    valid_patient.save_to_db()
+    assert Patient.load(valid_patient.id).medical_history == valid_patient.medical_history
+
+
+def test_rolled_back_read_not_cached(sqlite_db, valid_patient):
+    """A row read back inside a rolled-back transaction is not served from the cache afterwards."""
+    with pytest.raises(RuntimeError):
+        with sqlite_db.transaction():
+            valid_patient.save_to_db()
+            assert Patient.load(valid_patient.id) is not None
+            raise RuntimeError("abort")
+    assert sqlite_db.query("SELECT COUNT(*) FROM patient;") == [(0,)]
+    assert Patient.load(valid_patient.id) is None
+
+
+def test_case_variant_conditions_share_one_entry(sqlite_db, caplog):
+    """Names a case-insensitive unique key treats as equal are added once and share its id."""
+    # MySQL's _ci collation, as SQLite's NOCASE.
+    sqlite_db.execute("DROP TABLE medical_condition;")
+    sqlite_db.execute("CREATE TABLE medical_condition (id INTEGER PRIMARY KEY AUTOINCREMENT, name VARCHAR(255) NOT NULL COLLATE NOCASE);")
+    sqlite_db.execute("CREATE UNIQUE INDEX uq_medical_condition_name ON medical_condition (name);")
+    Patient(501, "Ann Lee", 1980, "Female", "5550001111", "Canadian", ["Flu", "flu", "Asthma"]).save_to_db()
+    Patient.save_many([
+        Patient(502, "Bob Ray", 1975, "Male", "5550002222", "American", ["GOUT", "Gout "]),
+        Patient(503, "Cy Young", 1970, "Male", "5550003333", "British", ["FLU", "gout"]),
+    ])
+    assert "Database Error" not in caplog.text
+    assert sqlite_db.query("SELECT name FROM medical_condition ORDER BY id;") == [("Flu",), ("Asthma",), ("GOUT",)]
+    assert [p.medical_history for p in Patient.load_by_ids([501, 502, 503])] == [["Flu", "Asthma"], ["GOUT"], ["Flu", "GOUT"]]
+
+
+def test_patients_with_empty_history_save(sqlite_db, caplog):
+    """Patients with no conditions save alone and in bulk, writing no condition rows."""
+    lone = Patient.from_row((501, "Ann Lee", 1980, "Female", "5550001111", "Canadian"), [])
+    lone.save_to_db()
+    Patient.save_many([Patient.from_row((502, "Bob Ray", 1975, "Male", "5550002222", "American"), [])])
+    assert "Database Error" not in caplog.text
+    assert [p.medical_history for p in Patient.load_by_ids([501, 502])] == [[], []]
+    assert sqlite_db.query("SELECT COUNT(*) FROM patient_condition;") == [(0,)]
+
+
+def test_migrated_null_history_patient_saves_again(sqlite_db, caplog):
+    """A patient whose pre-migration history was NULL loads with [] and can be saved again."""
+    # What migration 002 leaves for a NULL medical_history: the patient row, no condition rows.
+    sqlite_db.execute("INSERT INTO patient (id, name, birth_year, gender, phone_number, nationality) VALUES (%s, %s, %s, %s, %s, %s);",
+                      (601, "Old Record", 1950, "Male", "5550003333", "Egyptian"))
+    patient = Patient.load(601)
+    assert patient.medical_history == []
+    patient.delete_from_db()
+    patient.save_to_db()
+    assert "Database Error" not in caplog.text
+    assert Patient.load(601).medical_history == []
+
+
+# ✅ Test in-memory registry
+@pytest.fixture
+def registry(valid_doctor, valid_nurse, valid_patient):
+    cardiologist = Doctor(302, "Dr. Sami", 1975, "Male", "5550000000", "British", 90000, "ICU", "Cardiologist")
+    return HospitalRegistry([valid_doctor, valid_nurse, valid_patient, cardiologist])
+
+
+def test_registry_secondary_indexes(registry, valid_nurse, valid_patient):
+    """Lookups by id, department, specialization, nationality and specialty."""
+    assert registry.employee(202) is valid_nurse and registry.patient(valid_patient.id) is valid_patient
+    assert [e.id for e in registry.by_specialization("Cardiologist")] == [302]
+    assert [e.id for e in registry.find(Nurse, department="ICU")] == [202]
+    assert sorted(e.id for e in registry.by_department("ICU")) == [202, 302]
+    assert sorted(e.id for e in registry.by_nationality("British")) == [202, 302]
+    assert [e.id for e in registry.by_specialty("Emergency Care")] == [202]
+    assert [e.id for e in registry.find(Doctor, department="ICU", nationality="British")] == [302]
+    with pytest.raises(ValueError):
+        registry.find(name="Mark Wilson")
+
+
+def test_registry_updates_indexes(registry, valid_nurse):
+    """Remove, reindex and same-id replacement keep every index in step."""
+    registry.remove(valid_nurse)
+    assert valid_nurse not in registry and registry.by_specialty("Emergency Care") == []
+    with pytest.raises(KeyError):
+        registry.remove(valid_nurse)
+
+    registry.add(valid_nurse)
+    valid_nurse.department = "Emergency"
+    registry.reindex(valid_nurse)
+    assert registry.find(Nurse, department="ICU") == [] and registry.by_department("Emergency") == [valid_nurse]
+
+    replacement = Nurse(202, "Mark Wilson", 1992, "Male", "9876543210", 50000, "Pediatrics", "British", "Pediatric")
+    registry.add(replacement)
+    assert registry.employee(202) is replacement and registry.by_department("Emergency") == []
+    assert len(registry) == 4
+
+
+# ✅ Test columnar roster
+@pytest.fixture
+def roster_patients():
+    return [
+        Patient(i, f"Patient {i}", 1940 + i, "Female" if i % 2 else "Male", "5550000000", "Egyptian" if i % 3 else "British", ["Flu"])
+        for i in range(1, 61)
+    ]
+
+
+def test_roster_vectorized_statistics(roster_patients):
+    """Ages, grouped counts and grouped percentiles match the per-object results."""
+    roster = Roster.from_entities(roster_patients)
+    on = date(2025, 6, 1)
+    assert list(roster.ages(on)) == [2025 - p.birth_year for p in roster_patients]
+    assert roster.count_by("gender", "nationality") == {
+        ("Female", "Egyptian"): 20, ("Male", "Egyptian"): 20, ("Female", "British"): 10, ("Male", "British"): 10,
+    }
+    by_group = roster.age_percentiles((10, 50, 90), by=("gender",), on=on)
+    for (gender,), values in by_group.items():
+        ages = [2025 - p.birth_year for p in roster_patients if p.gender == gender]
+        assert list(values) == pytest.approx(list(roster.age_percentiles((10, 50, 90), on=on, mask=roster.mask(gender=gender))))
+        assert values[1] == pytest.approx(sorted(ages)[14] / 2 + sorted(ages)[15] / 2)
+    assert roster.mask(nationality="Martian").sum() == 0
+
+
+def test_roster_views(roster_patients):
+    """Rows read back as views over the columns and map to their entities."""
+    roster = Roster.from_entities(roster_patients)
+    view = roster[-1]
+    assert (view.id, view.birth_year, view.gender, view.nationality, view.department) == (60, 2000, "Male", "British", None)
+    assert view.entity() is roster_patients[-1]
+    assert [v.id for v in roster.views(roster.mask(gender="Female", nationality="British"))] == [3, 9, 15, 21, 27, 33, 39, 45, 51, 57]
+    with pytest.raises(LookupError):
+        Roster.from_entities(roster_patients, keep=False)[0].entity()
+
+
+def test_roster_load(sqlite_db, valid_doctor, valid_nurse):
+    """Employee rosters stream from the database with departments encoded."""
+    Employee.save_many([valid_doctor, valid_nurse])
+    roster = Roster.load(Employee)
+    assert list(roster.ids) == [202, 301]
+    assert roster.count_by("department") == {("ICU",): 1, ("Surgery",): 1}
+
+
+# ✅ Test category interning
+def test_category_fields_are_interned(valid_doctor, valid_patient):
+    """Equal category strings from constructors and rows share one instance."""
+    nationality = "".join(["Cana", "dian"])
+    patient = Patient.from_row((7, "Jane", 1990, "Female", "5550000000", nationality))
+    assert patient.nationality is valid_doctor.nationality
+    first = Prescription(valid_doctor, valid_patient, "Ibuprofen 200mg")
+    second = Prescription.from_row((1, 301, 101, "".join(["Ibuprofen", " 200mg"]), None), valid_doctor, valid_patient)
+    assert first.medication is second.medication
+    assert MEDICATIONS.value(MEDICATIONS.code("Ibuprofen 200mg")) is first.medication
+    assert "Canadian" in NATIONALITIES
+
+
+def test_category_dictionary_codes():
+    """Codes are dense, stable and round-trip; only strings get codes."""
+    dictionary = CategoryDictionary("ward", ["North", "South"])
+    assert dictionary.encode(["South", "East", "North", "East"]) == [1, 2, 0, 2]
+    assert dictionary.decode([2, 0]) == ["East", "North"]
+    assert list(dictionary) == ["North", "South", "East"]
+    assert dictionary.intern(None) is None
+    with pytest.raises(TypeError):
+        dictionary.code(None)
+    with pytest.raises(IndexError):
+        dictionary.value(-1)
+
+
+# ✅ Test payroll analytics
+@pytest.fixture
+def payroll_staff():
+    return [
+        Nurse(1, "Nurse A", 1990, "Female", "5550000000", 1000.10, "ICU", "Egyptian", "Critical Care"),
+        Nurse(2, "Nurse B", 1991, "Male", "5550000000", 2000.30, "ICU", "Egyptian", "Critical Care"),
+        Doctor(3, "Dr. C", 1975, "Female", "5550000000", "Egyptian", 9000.05, "ICU", "Intensivist"),
+        Doctor(4, "Dr. D", 1970, "Male", "5550000000", "Egyptian", 12000.00, "Surgery", "Surgeon"),
+        Manager(5, "Manager E", 1965, "Female", "5550000000", 7000.00, "Surgery", "Egyptian"),
+    ]
+
+
+def test_payroll_department_statistics(payroll_staff):
+    """Totals are exact to the cent; percentiles interpolate like numpy."""
+    summary = Payroll.from_employees(payroll_staff).by_department(q=(50,))
+    assert summary["ICU"] == {
+        "count": 3, "total": Decimal("12000.45"), "mean": Decimal("4000.15"),
+        "min": Decimal("1000.10"), "max": Decimal("9000.05"), "p50": Decimal("2000.30"),
+    }
+    assert summary["Surgery"]["p50"] == Decimal("9500.00")
+
+
+def test_payroll_uses_shared_department_codes(payroll_staff):
+    """Department codes are the shared DEPARTMENTS codes, so payrolls built separately agree."""
+    payroll = Payroll.from_employees(payroll_staff)
+    departments = [e.department for e in payroll_staff]
+    assert list(payroll.departments.codes) == DEPARTMENTS.encode(departments)
+    later = Payroll.from_employees(reversed(payroll_staff))
+    assert list(later.departments.codes) == list(payroll.departments.codes)[::-1]
+    assert [later.departments[i] for i in range(len(later))] == departments[::-1]
+
+
+def test_payroll_raise_simulation(payroll_staff):
+    """A raise applies to the selected role only, rounded half-up per employee."""
+    payroll = Payroll.from_employees(payroll_staff)
+    raised = payroll.with_raise("2.5", role=Nurse)
+    assert list(raised.cents) == [102510, 205031, 900005, 1200000, 700000]
+    assert raised.by_department()["Surgery"] == payroll.by_department()["Surgery"]
+    with pytest.raises(ValueError):
+        payroll.with_raise("0.001")
+
+
+def test_payroll_pushdown_matches_pull(sqlite_db, payroll_staff):
+    """GROUP BY pushdown agrees with the pulled payroll (within a cent per employee after raises)."""
+    Employee.save_many(payroll_staff)
+    pulled = department_summary(pushdown=False)
+    pushed = department_summary(pushdown=True)
+    assert {d: {k: v for k, v in stats.items() if not k.startswith("p")} for d, stats in pulled.items()} == pushed
+
+    pulled = department_summary({"Nurse": 5}, pushdown=False)
+    pushed = department_summary({"Nurse": 5}, pushdown=True)
+    assert abs(pulled["ICU"]["total"] - pushed["ICU"]["total"]) <= Decimal("0.01") * 2
+    assert pushed["ICU"]["max"] == Decimal("9000.05") and pushed["ICU"]["min"] == Decimal("1050.11")
+    with pytest.raises(ValueError):
+        department_summary({"Janitor": 5})
+
+
+def test_payroll_cli_switches_to_pushdown(sqlite_db, payroll_staff, monkeypatch, capsys):
+    """Above --pull-limit the CLI prints the pushed-down columns, without percentiles."""
+    Employee.save_many(payroll_staff)
+    monkeypatch.setattr("sys.argv", ["payroll.py", "--pull-limit", "0"])
+    payroll_main()
+    header, *rows = capsys.readouterr().out.splitlines()
+    assert header.split() == ["department", "count", "total", "mean", "min", "max"]
+    assert len(rows) == len({e.department for e in payroll_staff})
+
+
+# ✅ Test lazy startup
+def test_import_hospital_within_budget():
+    """A fresh ``import hospital`` stays under budget and loads no driver, backend or pytest."""
+    seconds, loaded = import_profile("hospital", runs=2)
+    assert [name for name in DEFERRED if name in loaded] == []
+    assert seconds < IMPORT_BUDGET
+
+
+def test_database_connects_on_first_query(tmp_path, monkeypatch):
+    """HospitalDatabase() opens nothing; the first query fills the pool."""
+    settings = dict(HospitalDatabase.config)
+    opened = []
+    open_connection = HospitalDatabase._open_connection
+    monkeypatch.setattr(HospitalDatabase, "_open_connection", lambda self: opened.append(1) or open_connection(self))
+    HospitalDatabase.configure(backend="sqlite", sqlite_path=str(tmp_path / "lazy.db"), pool_min_size=2, pool_max_size=4)
+    try:
+        db = HospitalDatabase()
+        assert opened == [] and db._backend is None
+        assert db.query("SELECT 1;") == [(1,)]
+        assert len(opened) == 2
+    finally:
+        HospitalDatabase.configure(**settings)
+
+
+def test_unreachable_database_does_not_block_construction():
+    """Code that never queries never resolves the host, even when it is unreachable."""
+    settings = dict(HospitalDatabase.config)
+    HospitalDatabase.configure(backend="mysql", host="unreachable.invalid")
+    try:
+        db = HospitalDatabase()
+        assert db._backend is None
+        db.close_connection()
+        with pytest.raises(RuntimeError):
+            db.pool.acquire()
+        assert db._backend is None
+    finally:
+        HospitalDatabase.configure(**settings)
@@ -0,0 +1,246 @@
+import os
+import re
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from decimal import Decimal
+from functools import lru_cache
+
+SCHEMA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "OrangeFinalProjectDataBase.sql")
+
+
+class StorageBackend(ABC):
+    """Database engine behind HospitalDatabase.
+
+    Statements are written once in MySQL dialect with ``%s`` placeholders;
+    each backend opens DB-API connections and adapts statements to its engine.
+    """
+
+    name = None
+    begin_sql = None  # connections run with autocommit off, so transactions start implicitly
+    prepares_statements = False  # prepared_cursor() holds a server-side statement worth caching
+
+    @property
+    @abstractmethod
+    def errors(self):
+        """Exception class (or tuple) raised by the driver."""
+
+    @property
+    @abstractmethod
+    def permanent_errors(self):
+        """Driver errors caused by the data itself, which a retry will not fix."""
+
+    @abstractmethod
+    def connect(self):
+        """Open a new DB-API connection."""
+
+    def is_alive(self, conn):
+        return True
+
+    def reset(self, conn):
+        """End the transaction a checkout left open before the connection is reused.
+
+        With autocommit off even a SELECT starts one, and on MySQL its
+        REPEATABLE READ snapshot would hide rows committed on other pooled
+        connections from every later read on this one.
+        """
+        if getattr(conn, "in_transaction", True):
+            conn.rollback()
+
+    def sql(self, statement):
+        """Translate a MySQL-dialect statement for this engine."""
+        return statement
+
+    def stream_cursor(self, conn):
+        """Cursor that fetches rows from the server incrementally."""
+        return conn.cursor()
+
+    def prepared_cursor(self, conn):
+        """Cursor that prepares its statement once and re-executes it with new parameters."""
+        return conn.cursor()
+
+    def session_id(self, conn):
+        """Identifies the server session of ``conn``; a change means prepared statements are gone."""
+        return None
+
+    def auto_increment_step(self, cursor):
+        return 1
+
+    def first_insert_id(self, cursor, rows):
+        """Id of the first row written by the last multi-row INSERT on ``cursor``."""
+        return cursor.lastrowid
+
+    def can_load_file(self):
+        """Whether ``load_file()`` is available on this engine."""
+        return False
+
+    def load_file(self, cursor, table, columns, path):
+        """Bulk-load a tab-separated file into ``table`` and return the rows loaded."""
+        raise NotImplementedError(f"The {self.name} backend cannot bulk-load files.")
+
+
+class MySQLBackend(StorageBackend):
+    name = "mysql"
+    prepares_statements = True
+
+    def __init__(self, host, user, password, database, local_infile=False):
+        import mysql.connector  # the driver takes ~100 ms to import; only MySQL users pay for it
+
+        self._driver = mysql.connector
+        self.host = host
+        self.user = user
+        self.password = password
+        self.database = database
+        self.local_infile = local_infile
+
+    @property
+    def errors(self):
+        return self._driver.Error
+
+    @property
+    def permanent_errors(self):
+        return (self._driver.IntegrityError, self._driver.DataError)
+
+    def connect(self):
+        return self._driver.connect(
+            host=self.host,
+            user=self.user,
+            password=self.password,
+            database=self.database,
+            allow_local_infile=self.local_infile,
+        )
+
+    def is_alive(self, conn):
+        return conn.is_connected()
+
+    def stream_cursor(self, conn):
+        return conn.cursor(buffered=False)
+
+    def prepared_cursor(self, conn):
+        return conn.cursor(prepared=True)
+
+    def session_id(self, conn):
+        return conn.connection_id
+
+    def auto_increment_step(self, cursor):
+        cursor.execute("SELECT @@auto_increment_increment;")
+        return cursor.fetchone()[0]
+
+    def can_load_file(self):
+        return self.local_infile
+
+    def load_file(self, cursor, table, columns, path):
+        # With LOCAL, rows that hit a duplicate key are skipped with a warning
+        # instead of failing the statement; the row count tells how many landed.
+        cursor.execute(
+            f"LOAD DATA LOCAL INFILE %s INTO TABLE {table} CHARACTER SET utf8mb4 "
+            f"FIELDS TERMINATED BY '\\t' LINES TERMINATED BY '\\n' ({', '.join(columns)});",
+            (path,),
+        )
+        return cursor.rowcount
+
+
+class SQLiteBackend(StorageBackend):
+    """Embedded single-node engine running in WAL mode.
+
+    The schema is loaded from ``OrangeFinalProjectDataBase.sql`` on the first
+    connection. ``":memory:"`` maps to a private shared-cache database so all
+    pooled connections see the same data.
+    """
+
+    name = "sqlite"
+    begin_sql = "BEGIN;"
+
+    pragmas = (
+        "PRAGMA journal_mode = WAL;",
+        "PRAGMA synchronous = NORMAL;",  # durable at checkpoints, no fsync per commit
+        "PRAGMA foreign_keys = ON;",
+        "PRAGMA busy_timeout = 5000;",
+        "PRAGMA temp_store = MEMORY;",
+        "PRAGMA cache_size = -65536;",  # 64 MiB page cache per connection
+        "PRAGMA mmap_size = 268435456;",
+    )
+
+    def __init__(self, path, schema_path=SCHEMA_PATH):
+        if path == ":memory:":
+            self.path, self.uri = f"file:hospital-{id(self)}?mode=memory&cache=shared", True
+        else:
+            self.path, self.uri = path, False
+        self.schema_path = schema_path
+        self._schema_loaded = False
+        self._schema_lock = threading.Lock()
+
+    @property
+    def errors(self):
+        return sqlite3.Error
+
+    @property
+    def permanent_errors(self):
+        return (sqlite3.IntegrityError, sqlite3.DataError)
+
+    def connect(self):
+        conn = sqlite3.connect(
+            self.path,
+            uri=self.uri,
+            check_same_thread=False,  # the pool hands connections between threads
+            detect_types=sqlite3.PARSE_DECLTYPES,
+            cached_statements=256,  # the driver's own prepared-statement cache
+        )
+        for pragma in self.pragmas:
+            conn.execute(pragma)
+        with self._schema_lock:
+            if not self._schema_loaded and self.schema_path:
+                with open(self.schema_path, encoding="utf-8") as schema:
+                    conn.executescript(translate_schema(schema.read()))
+                self._schema_loaded = True
+        return conn
+
+    def sql(self, statement):
+        return _qmark(statement)
+
+    def first_insert_id(self, cursor, rows):
+        # SQLite reports the rowid of the last row; AUTOINCREMENT ids within
+        # one statement are consecutive.
+        return cursor.lastrowid - rows + 1
+
+
+def create_backend(config):
+    """Build the backend named by ``config["backend"]``."""
+    if config["backend"] == "mysql":
+        return MySQLBackend(config["host"], config["user"], config["password"], config["database"], config["local_infile"])
+    if config["backend"] == "sqlite":
+        return SQLiteBackend(config["sqlite_path"])
+    raise ValueError(f"Unknown database backend: {config['backend']}")
+
+
+@lru_cache(maxsize=1024)
+def _qmark(statement):
+    return statement.replace("%s", "?")
+
+
+_INLINE_INDEX = re.compile(r",\s*(UNIQUE\s+)?(?:INDEX|KEY)\s+(\w+)\s*\(([^)]*)\)", re.IGNORECASE)
+
+
+def translate_schema(script):
+    """Translate the MySQL schema script into an equivalent SQLite script."""
+    script = re.sub(r"--[^\n]*", "", script)
+    statements = []
+    for statement in script.split(";"):
+        statement = statement.strip()
+        if not statement or re.match(r"(CREATE\s+DATABASE|USE)\b", statement, re.IGNORECASE):
+            continue
+        statement = re.sub(r"\bINT\s+AUTO_INCREMENT\s+PRIMARY\s+KEY\b", "INTEGER PRIMARY KEY AUTOINCREMENT", statement, flags=re.IGNORECASE)
+        table = re.match(r"CREATE\s+TABLE\s+(?:IF\s+NOT\s+EXISTS\s+)?(\w+)", statement, re.IGNORECASE)
+        indexes = _INLINE_INDEX.findall(statement) if table else []
+        statements.append(_INLINE_INDEX.sub("", statement))
+        for unique, index, columns in indexes:
+            kind = "UNIQUE INDEX" if unique else "INDEX"
+            statements.append(f"CREATE {kind} IF NOT EXISTS {index} ON {table.group(1)} ({columns})")
+    return ";\n".join(statements) + ";\n"
+
+
+# Store timestamps and money the way MySQL returns them.
+sqlite3.register_adapter(datetime, lambda value: value.isoformat(" "))
+sqlite3.register_adapter(Decimal, str)
+sqlite3.register_converter("DATETIME", lambda value: datetime.fromisoformat(value.decode()))
@@ -0,0 +1,12 @@
+"""Performance benchmarks; run from Hospitality-System/ with ``python -m benchmarks.<name>``."""
+from hospital import HospitalDatabase
+
+
+def add_backend_arguments(parser):
+    parser.add_argument("--backend", choices=["mysql", "sqlite"], default=HospitalDatabase.config["backend"])
+    parser.add_argument("--sqlite-path", default="bench.db", help="database file for --backend sqlite")
+
+
+def configure_backend(args, **options):
+    """Point HospitalDatabase at the backend selected on the command line."""
+    HospitalDatabase.configure(backend=args.backend, sqlite_path=args.sqlite_path, **options)
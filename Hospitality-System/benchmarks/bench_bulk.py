@@ -0,0 +1,62 @@
+"""Per-object Patient.save_to_db versus Patient.save_many at several batch sizes.
+
+Run from Hospitality-System/ against the Docker MySQL service, or hermetically
+with ``--backend sqlite``:
+
+    python -m benchmarks.bench_bulk --rows 20000 --batch-sizes 100 1000 5000
+"""
+import argparse
+import contextlib
+import io
+import time
+
+from benchmarks import add_backend_arguments, configure_backend
+from hospital import HospitalDatabase, Patient
+
+ID_BASE = 900_000_000  # benchmark rows live far above real patient ids
+
+
+def make_patients(rows):
+    return [
+        Patient(ID_BASE + i, f"Bench Patient {i}", 1980, "Female", "5550000000", "Egyptian", ["Flu", "Asthma"])
+        for i in range(rows)
+    ]
+
+
+def timed(db, save):
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        save()
+        elapsed = time.perf_counter() - started
+        db.execute("DELETE FROM patient WHERE id >= %s;", (ID_BASE,))
+    return elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--batch-sizes", type=int, nargs="+", default=[100, 1000, 5000])
+    add_backend_arguments(parser)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        configure_backend(args)
+        db = HospitalDatabase()
+    patients = make_patients(args.rows)
+
+    def per_object():
+        for patient in patients:
+            patient.save_to_db()
+
+    results = [("save_to_db", timed(db, per_object))]
+    for size in args.batch_sizes:
+        results.append((f"save_many({size})", timed(db, lambda: Patient.save_many(patients, batch_size=size))))
+
+    baseline = results[0][1]
+    print(f"{'path':>18} {'rows/s':>12} {'speedup':>8}")
+    for name, elapsed in results:
+        print(f"{name:>18} {args.rows / elapsed:>12.0f} {baseline / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
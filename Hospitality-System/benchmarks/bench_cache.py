@@ -0,0 +1,94 @@
+"""Lookup latency with and without the entity cache under a read-heavy mix.
+
+Each operation looks up a patient and a doctor, with ids drawn from a skewed
+(Zipf-like) distribution; ``--write-ratio`` of operations re-save a patient,
+which invalidates it.
+
+    python -m benchmarks.bench_cache --patients 20000 --ops 50000 --cache-sizes 0 1000 10000
+"""
+import argparse
+import contextlib
+import io
+import random
+import statistics
+import time
+
+from benchmarks import add_backend_arguments, configure_backend
+from hospital import Doctor, Employee, HospitalDatabase, Patient
+
+ID_BASE = 900_000_000  # benchmark rows live far above real ids
+
+
+def cleanup(db):
+    db.execute("DELETE FROM patient WHERE id >= %s;", (ID_BASE,))
+    db.execute("DELETE FROM employee WHERE id >= %s;", (ID_BASE,))
+
+
+def populate(db, patients, doctors):
+    cleanup(db)
+    Patient.save_many(
+        Patient(ID_BASE + i, f"Patient {i}", 1980, "Female", "5550000000", "Egyptian", ["Flu"]) for i in range(patients)
+    )
+    Employee.save_many(
+        Doctor(ID_BASE + i, f"Doctor {i}", 1975, "Male", "5550000000", "Egyptian", 9000, "Cardiology", "Cardiologist")
+        for i in range(doctors)
+    )
+
+
+def workload(args):
+    rng = random.Random(42)
+    weights = [1 / (rank + 1) for rank in range(args.patients)]
+    patient_ids = rng.choices(range(args.patients), weights, k=args.ops)
+    doctor_ids = rng.choices(range(args.doctors), weights[: args.doctors], k=args.ops)
+    writes = [rng.random() < args.write_ratio for _ in range(args.ops)]
+    return list(zip(patient_ids, doctor_ids, writes))
+
+
+def run(args, cache_size, ops):
+    with contextlib.redirect_stdout(io.StringIO()):
+        configure_backend(args, cache_size=cache_size, cache_ttl=args.ttl)
+        db = HospitalDatabase()
+        latencies = []
+        for patient_offset, doctor_offset, write in ops:
+            started = time.perf_counter()
+            patient = Patient.load(ID_BASE + patient_offset)
+            Employee.load(ID_BASE + doctor_offset)
+            if write:
+                patient.delete_from_db()
+                patient.save_to_db()
+            latencies.append(time.perf_counter() - started)
+    stats = db.cache_stats()["patient"]
+    lookups = stats["hits"] + stats["misses"]
+    return latencies, stats["hits"] / lookups if lookups else 0.0
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--patients", type=int, default=20000)
+    parser.add_argument("--doctors", type=int, default=500)
+    parser.add_argument("--ops", type=int, default=50000)
+    parser.add_argument("--write-ratio", type=float, default=0.02)
+    parser.add_argument("--ttl", type=float, default=300.0)
+    parser.add_argument("--cache-sizes", type=int, nargs="+", default=[0, 1000, 10000])
+    add_backend_arguments(parser)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        configure_backend(args)
+        populate(HospitalDatabase(), args.patients, args.doctors)
+    try:
+        ops = workload(args)
+        print(f"{'cache':>7} {'mean us':>9} {'p50 us':>8} {'p99 us':>8} {'hit rate':>9}")
+        for size in args.cache_sizes:
+            latencies, hit_rate = run(args, size, ops)
+            latencies.sort()
+            p50 = latencies[len(latencies) // 2]
+            p99 = latencies[int(len(latencies) * 0.99)]
+            print(f"{size:>7} {statistics.fmean(latencies) * 1e6:>9.1f} {p50 * 1e6:>8.1f} {p99 * 1e6:>8.1f} {hit_rate:>9.1%}")
+    finally:
+        with contextlib.redirect_stdout(io.StringIO()):
+            cleanup(HospitalDatabase())
+
+
+if __name__ == "__main__":
+    main()
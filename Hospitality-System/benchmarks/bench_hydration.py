@@ -0,0 +1,63 @@
+"""Objects/sec for validating constructors versus trusted from_row hydration.
+
+    python -m benchmarks.bench_hydration --rows 200000
+"""
+import argparse
+import time
+from datetime import datetime
+
+from hospital import Doctor, Employee, Patient, Prescription
+
+
+def rate(build, rows):
+    started = time.perf_counter()
+    build(rows)
+    return len(rows) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=200000)
+    args = parser.parse_args()
+    n = args.rows
+
+    doctor_rows = [
+        (i, f"Doctor {i}", 1975, "Male", "5550000000", 9000, "Cardiology", "Egyptian", "Cardiologist", None, None, None)
+        for i in range(1, n + 1)
+    ]
+    patient_rows = [(i, f"Patient {i}", 1990, "Female", "5550000000", "Egyptian") for i in range(1, n + 1)]
+    history = ("Flu", "Asthma")
+    doctor = Employee.from_row(doctor_rows[0])
+    patient = Patient.from_row(patient_rows[0])
+    issued = datetime.now()
+    prescription_rows = [(i, doctor.id, patient.id, "Paracetamol", issued) for i in range(1, n + 1)]
+    doctors, patients = {doctor.id: doctor}, {patient.id: patient}
+
+    cases = [
+        (
+            "Doctor",
+            lambda rows: [Doctor(r[0], r[1], r[2], r[3], r[4], r[7], r[5], r[6], r[8]) for r in rows],
+            Employee.from_rows,
+            doctor_rows,
+        ),
+        (
+            "Patient",
+            lambda rows: [Patient(*r, list(history)) for r in rows],
+            lambda rows: [Patient.from_row(r, history) for r in rows],
+            patient_rows,
+        ),
+        (
+            "Prescription",
+            lambda rows: [Prescription(doctor, patient, r[3]) for r in rows],
+            lambda rows: Prescription.from_rows(rows, doctors, patients),
+            prescription_rows,
+        ),
+    ]
+    print(f"{'entity':>13} {'__init__/s':>12} {'from_row/s':>12} {'speedup':>8}")
+    for name, validated, trusted, rows in cases:
+        slow, fast = rate(validated, rows), rate(trusted, rows)
+        print(f"{name:>13} {slow:>12.0f} {fast:>12.0f} {fast / slow:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Serial import_csv versus import_parallel with growing worker counts on a synthetic CSV.
+
+Run from Hospitality-System/ against the Docker MySQL service, or hermetically
+with ``--backend sqlite``:
+
+    python -m benchmarks.bench_import --rows 1000000 --workers 2 4 8
+"""
+import argparse
+import contextlib
+import csv
+import io
+import os
+import tempfile
+import time
+
+from benchmarks import add_backend_arguments, configure_backend
+from hospital import HospitalDatabase
+from importer import import_csv, import_parallel
+
+ID_BASE = 900_000_000  # benchmark rows live far above real patient ids
+
+
+def write_patients(path, rows):
+    """Synthetic patients; one row in a thousand has a bad phone number."""
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["id", "name", "birth_year", "gender", "phone_number", "nationality", "medical_history"])
+        for i in range(rows):
+            phone = "555-0000" if i % 1000 == 999 else f"555{i:07d}"
+            writer.writerow([ID_BASE + i, f"Bench Patient {i}", 1940 + i % 60, "Female", phone, "Egyptian", "Flu, Asthma"])
+
+
+def timed(db, run):
+    with contextlib.redirect_stdout(io.StringIO()):
+        started = time.perf_counter()
+        imported, rejected, _ = run()
+        elapsed = time.perf_counter() - started
+        db.execute("DELETE FROM patient WHERE id >= %s;", (ID_BASE,))
+    return elapsed, imported, rejected
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--workers", type=int, nargs="+", default=[2, 4, os.cpu_count() or 1])
+    parser.add_argument("--batch-size", type=int, default=5000)
+    add_backend_arguments(parser)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        configure_backend(args)
+        db = HospitalDatabase()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "patients.csv")
+        write_patients(path, args.rows)
+        rejects = os.path.join(tmp, "rejects.csv")
+
+        results = [("import_csv", timed(db, lambda: import_csv("patient", path, rejects, args.batch_size)))]
+        for workers in dict.fromkeys(args.workers):
+            results.append((
+                f"parallel({workers})",
+                timed(db, lambda: import_parallel("patient", [path], workers, rejects, args.batch_size)),
+            ))
+
+    baseline = results[0][1][0]
+    print(f"{'path':>14} {'imported':>10} {'rejected':>9} {'rows/s':>10} {'speedup':>8}")
+    for name, (elapsed, imported, rejected) in results:
+        print(f"{name:>14} {imported:>10} {rejected:>9} {args.rows / elapsed:>10.0f} {baseline / elapsed:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+"""Memory held by hydrated entities with and without shared category strings.
+
+Rows carry freshly decoded strings, as they come from the database driver.
+``copies`` hydrates them field by field the way ``from_row`` did before
+interning; ``interned`` uses the current ``from_row``.
+
+    python -m benchmarks.bench_interning --people 200000 --prescriptions 400000
+"""
+import argparse
+import random
+import tracemalloc
+
+from categories import CATEGORIES
+from hospital import Employee, Patient, Prescription
+
+DEPARTMENTS = ["Cardiology", "Intensive Care", "Emergency", "Pediatrics", "Oncology", "Radiology", "Surgery", "Administration"]
+SPECIALIZATIONS = ["Cardiologist", "Surgeon", "Pediatrician", "Oncologist", "Radiologist", "Neurologist"]
+SPECIALTIES = ["Critical Care", "Pediatric", "Surgical", "Emergency Care", "Oncology"]
+NATIONALITIES = [f"Nationality {i}" for i in range(200)]
+MEDICATIONS = [f"Medication {i} 500mg" for i in range(400)]
+
+
+def fresh(value):
+    return value.encode().decode()  # a new str object, like a driver row
+
+
+def person_rows(count, seed=42):
+    rng = random.Random(seed)
+    for i in range(1, count + 1):
+        gender, nationality = fresh(rng.choice(("Female", "Male"))), fresh(rng.choice(NATIONALITIES))
+        if i % 10 < 7:
+            yield "patient", (i, "Patient", 1980, gender, "5550000000", nationality)
+            continue
+        row = (i, "Staff", 1975, gender, "5550000000", 9000.0, fresh(rng.choice(DEPARTMENTS)), nationality)
+        if i % 2:
+            yield "employee", row + (fresh(rng.choice(SPECIALIZATIONS)), None, None, None)
+        else:
+            yield "employee", row + (None, fresh(rng.choice(SPECIALTIES)), None, None)
+
+
+def prescription_rows(count, seed=7):
+    rng = random.Random(seed)
+    for i in range(1, count + 1):
+        yield (i, 1, 1, fresh(rng.choice(MEDICATIONS)), None)
+
+
+def copy_person(kind, row):
+    """Hydration without interning: every string field keeps its own copy."""
+    if kind == "patient":
+        patient = Patient.__new__(Patient)
+        patient.id, patient.name, patient.birth_year, patient.gender, patient.phone_number, patient.nationality = row
+        patient.medical_history, patient.prescriptions = [], None
+        return patient
+    employee = Employee.from_row(row)
+    employee.gender, employee.department, employee.nationality = row[3], row[6], row[7]
+    if row[8] is not None:
+        employee.specialization = row[8]
+    else:
+        employee.specialty = row[9]
+    return employee
+
+
+def intern_person(kind, row):
+    if kind == "patient":
+        patient = Patient.from_row(row)
+        patient.prescriptions = None  # like copy_person: measure the string fields only
+        return patient
+    return Employee.from_row(row)
+
+
+def copy_prescription(row, doctor, patient):
+    prescription = Prescription.from_row(row, doctor, patient)
+    prescription.medication = row[3]
+    return prescription
+
+
+def measure(build, rows):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [build(*row) for row in rows]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    return used, objects
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--people", type=int, default=200_000)
+    parser.add_argument("--prescriptions", type=int, default=400_000)
+    args = parser.parse_args()
+
+    doctor = Employee.from_row((1, "Dr", 1970, "Male", "5550000000", 9000.0, "Surgery", "Egyptian", "Surgeon", None, None, None))
+    patient = Patient.from_row((1, "Patient", 1980, "Female", "5550000000", "Egyptian"))
+    cases = [
+        ("people", args.people, lambda: person_rows(args.people), copy_person, intern_person),
+        ("prescriptions", args.prescriptions,
+         lambda: ((row, doctor, patient) for row in prescription_rows(args.prescriptions)),
+         copy_prescription, Prescription.from_row),
+    ]
+    print(f"{'entities':>14} {'count':>9} {'copies MB':>10} {'interned MB':>12} {'saved':>7}")
+    for name, count, rows, copies, interned in cases:
+        before, objects = measure(copies, rows())
+        del objects
+        after, objects = measure(interned, rows())
+        del objects
+        print(f"{name:>14} {count:>9,} {before / 2**20:>10.1f} {after / 2**20:>12.1f} {1 - after / before:>7.0%}")
+    print("distinct values:", ", ".join(f"{name}={len(dictionary)}" for name, dictionary in CATEGORIES.items()))
+
+
+if __name__ == "__main__":
+    main()
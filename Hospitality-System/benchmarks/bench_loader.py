@@ -0,0 +1,91 @@
+"""Single-query Employee.load_all versus a naive per-row subtype lookup.
+
+Run from Hospitality-System/ (``--backend sqlite`` needs no server):
+
+    python -m benchmarks.bench_loader --staff 100000
+"""
+import argparse
+import contextlib
+import io
+import time
+import tracemalloc
+
+from benchmarks import add_backend_arguments, configure_backend
+from hospital import DataEntry, Doctor, Employee, HospitalDatabase, Manager, Nurse
+
+ID_BASE = 900_000_000  # benchmark rows live far above real employee ids
+
+
+def make_staff(count):
+    for i in range(count):
+        id = ID_BASE + i
+        kind = i % 4
+        if kind == 0:
+            yield Doctor(id, f"Doctor {i}", 1975, "Male", "5550000000", "Egyptian", 9000, "Cardiology", "Cardiologist")
+        elif kind == 1:
+            yield Nurse(id, f"Nurse {i}", 1985, "Female", "5550000000", 5000, "ICU", "Egyptian", "Critical Care")
+        elif kind == 2:
+            yield Manager(id, f"Manager {i}", 1970, "Female", "5550000000", 12000, "Administration", "Egyptian")
+        else:
+            yield DataEntry(id, f"Clerk {i}", 1995, "Male", "5550000000", 3500, "Records", "Egyptian")
+
+
+def naive_load(db):
+    """What callers had to do before: one lookup per subtype table per row."""
+    staff = []
+    for row in db.query("SELECT id, name, birth_year, gender, phone_number, salary, department, nationality FROM employee;"):
+        id, name, birth_year, gender, phone, salary, department, nationality = row
+        salary = float(salary)
+        doctor = db.query("SELECT specialization FROM doctor WHERE id = %s;", (id,))
+        if doctor:
+            staff.append(Doctor(id, name, birth_year, gender, phone, nationality, salary, department, doctor[0][0]))
+            continue
+        nurse = db.query("SELECT specialty FROM nurse WHERE id = %s;", (id,))
+        if nurse:
+            staff.append(Nurse(id, name, birth_year, gender, phone, salary, department, nationality, nurse[0][0]))
+            continue
+        if db.query("SELECT id FROM manager WHERE id = %s;", (id,)):
+            staff.append(Manager(id, name, birth_year, gender, phone, salary, department, nationality))
+        elif db.query("SELECT id FROM data_entry WHERE id = %s;", (id,)):
+            staff.append(DataEntry(id, name, birth_year, gender, phone, salary, department, nationality))
+    return len(staff)
+
+
+def streamed_load():
+    return sum(1 for _ in Employee.load_all())
+
+
+def measure(load):
+    tracemalloc.start()
+    started = time.perf_counter()
+    count = load()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return count, elapsed, peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--staff", type=int, default=100000)
+    add_backend_arguments(parser)
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        configure_backend(args)
+        db = HospitalDatabase()
+        db.execute("DELETE FROM employee WHERE id >= %s;", (ID_BASE,))
+        Employee.save_many(make_staff(args.staff))
+
+    print(f"{'loader':>10} {'rows':>9} {'rows/s':>10} {'peak MiB':>9}")
+    try:
+        for name, load in (("naive", lambda: naive_load(db)), ("load_all", streamed_load)):
+            count, elapsed, peak = measure(load)
+            print(f"{name:>10} {count:>9} {count / elapsed:>10.0f} {peak / 2**20:>9.1f}")
+    finally:
+        with contextlib.redirect_stdout(io.StringIO()):
+            db.execute("DELETE FROM employee WHERE id >= %s;", (ID_BASE,))
+
+
+if __name__ == "__main__":
+    main()
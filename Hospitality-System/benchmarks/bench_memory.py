@@ -0,0 +1,55 @@
+"""Bytes per entity for the slotted hierarchy versus an equivalent __dict__ layout.
+
+    python -m benchmarks.bench_memory --count 100000
+"""
+import argparse
+import tracemalloc
+
+from hospital import Doctor, Patient, Prescription
+
+
+class DictEntity:
+    """Plain object carrying the same fields in a per-instance __dict__."""
+
+
+def as_dict_entity(entity):
+    twin = DictEntity()
+    for cls in type(entity).__mro__:
+        for field in getattr(cls, "__slots__", ()):
+            setattr(twin, field, getattr(entity, field))
+    return twin
+
+
+def bytes_per(build, count):
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    objects = [build(i) for i in range(count)]
+    used = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del objects
+    return used / count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=100000)
+    args = parser.parse_args()
+
+    doctor = Doctor(1, "Dr. Sami", 1975, "Male", "987654321", "British", 8000, "Cardiology", "Cardiologist")
+    patient = Patient(1, "John Ahmed", 1985, "Male", "123456789", "American", ["Flu"])
+    # Field values are shared across instances so only the object layout is measured.
+    cases = {
+        "Doctor": lambda i: Doctor.from_row((i, doctor.name, 1975, "Male", doctor.phone_number, 8000, "Cardiology", "British", "Cardiologist", None, None, None)),
+        "Patient": lambda i: Patient.from_row((i, patient.name, 1985, "Male", patient.phone_number, "American")),
+        "Prescription": lambda i: Prescription.from_row((i, 1, 1, "Paracetamol", None), doctor, patient),
+    }
+
+    print(f"{'entity':>13} {'__dict__ B':>11} {'__slots__ B':>12} {'saved':>7}")
+    for name, build in cases.items():
+        slotted = bytes_per(build, args.count)
+        dicted = bytes_per(lambda i: as_dict_entity(build(i)), args.count)
+        print(f"{name:>13} {dicted:>11.0f} {slotted:>12.0f} {1 - slotted / dicted:>6.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""Department payroll statistics: vectorized Payroll versus Decimal loops, and pull versus GROUP BY pushdown.
+
+    python -m benchmarks.bench_payroll --employees 1000000 --db-employees 200000
+    python -m benchmarks.bench_payroll --backend mysql    # against the Docker MySQL service
+"""
+import argparse
+import contextlib
+import io
+import random
+import statistics
+import time
+from collections import defaultdict
+from decimal import Decimal
+
+import numpy as np
+
+from benchmarks import add_backend_arguments, configure_backend
+from hospital import HospitalDatabase
+from payroll import Payroll, department_summary
+
+ID_BASE = 900_000_000  # benchmark rows live far above real ids
+DEPARTMENTS = ["Cardiology", "ICU", "Emergency", "Pediatrics", "Oncology", "Radiology", "Surgery", "Administration"]
+ROLES = ["Doctor", "Nurse", "Manager", "DataEntry"]
+
+
+def synthetic(count, seed=42):
+    rng = np.random.default_rng(seed)
+    cents = rng.integers(2_000_00, 25_000_00, count)
+    departments = rng.integers(0, len(DEPARTMENTS), count, dtype=np.int32)
+    roles = rng.choice(len(ROLES), count, p=[0.3, 0.5, 0.05, 0.15]).astype(np.int32)
+    return cents, departments, roles
+
+
+def decimal_loop(cents, departments, roles):
+    """The object-style pass: Decimal salaries, a +5% nurse raise and statistics per department."""
+    groups = defaultdict(list)
+    raise_factor = Decimal("1.05")
+    for amount, department, role in zip(cents.tolist(), departments.tolist(), roles.tolist()):
+        salary = Decimal(amount).scaleb(-2)
+        if ROLES[role] == "Nurse":
+            salary = (salary * raise_factor).quantize(Decimal("0.01"))
+        groups[DEPARTMENTS[department]].append(salary)
+    return {
+        department: (sum(salaries), sum(salaries) / len(salaries), statistics.quantiles(salaries, n=10, method="inclusive"))
+        for department, salaries in groups.items()
+    }
+
+
+def timed(run, repeat=1):
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        run()
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def populate(count):
+    db = HospitalDatabase()
+    db.execute("DELETE FROM employee WHERE id >= %s;", (ID_BASE,))
+    rng = random.Random(7)
+    employees, doctors, nurses = [], [], []
+    for i in range(count):
+        employee_id = ID_BASE + i
+        employees.append((employee_id, f"Staff {i}", 1980, "Female", "5550000000",
+                          Decimal(rng.randint(2_000_00, 25_000_00)).scaleb(-2), rng.choice(DEPARTMENTS), "Egyptian"))
+        (doctors if i % 2 else nurses).append((employee_id, "Surgeon" if i % 2 else "Critical Care"))
+    with db.transaction():
+        db.insert_many("employee", ("id", "name", "birth_year", "gender", "phone_number", "salary", "department", "nationality"), employees)
+        db.insert_many("doctor", ("id", "specialization"), doctors)
+        db.insert_many("nurse", ("id", "specialty"), nurses)
+    return db
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--employees", type=int, default=1_000_000)
+    parser.add_argument("--db-employees", type=int, default=200_000)
+    add_backend_arguments(parser)
+    args = parser.parse_args()
+
+    cents, departments, roles = synthetic(args.employees)
+    payroll = Payroll(np.arange(args.employees), cents, [DEPARTMENTS[d] for d in departments.tolist()], [ROLES[r] for r in roles.tolist()])
+    vectorized = timed(lambda: payroll.with_raise(5, role="Nurse").by_department(), repeat=3)
+    loop = timed(lambda: decimal_loop(cents, departments, roles))
+    print(f"{args.employees:,} employees, +5% for nurses, per-department total/mean/percentiles:")
+    print(f"  Payroll {vectorized * 1e3:9.1f} ms   Decimal loop {loop * 1e3:9.1f} ms   {loop / vectorized:.0f}x")
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        configure_backend(args, cache_size=0)
+        db = populate(args.db_employees)
+    pulled = timed(lambda: department_summary({"Nurse": 5}, pushdown=False))
+    pushed = timed(lambda: department_summary({"Nurse": 5}, pushdown=True))
+    db.execute("DELETE FROM employee WHERE id >= %s;", (ID_BASE,))
+    print(f"{args.db_employees:,} employees in {args.backend}, department summary:")
+    print(f"  pull {pulled * 1e3:9.1f} ms   GROUP BY pushdown {pushed * 1e3:9.1f} ms   {pulled / pushed:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,69 @@
+"""Throughput of concurrent Patient.save_to_db workers through the connection pool.
+
+Run from Hospitality-System/ against the Docker MySQL service, or hermetically
+with ``--backend sqlite``:
+
+    python -m benchmarks.bench_pool --threads 1 2 4 8 16 --ops 500
+    python -m benchmarks.bench_pool --threads 1 2 4 8 16 --group-commit 0.002
+"""
+import argparse
+import contextlib
+import io
+import threading
+import time
+
+from benchmarks import add_backend_arguments, configure_backend
+from hospital import HospitalDatabase, Patient
+
+ID_BASE = 900_000_000  # benchmark rows live far above real patient ids
+
+
+def run(args, threads, ops):
+    batches = [
+        [
+            Patient(ID_BASE + t * ops + i, f"Bench Patient {i}", 1980, "Female", "5550000000", "Egyptian", ["None"])
+            for i in range(ops)
+        ]
+        for t in range(threads)
+    ]
+    start_line = threading.Barrier(threads + 1)
+
+    def worker(batch):
+        start_line.wait()
+        for patient in batch:
+            patient.save_to_db()
+
+    workers = [threading.Thread(target=worker, args=(batch,)) for batch in batches]
+    with contextlib.redirect_stdout(io.StringIO()):
+        configure_backend(args, pool_min_size=threads, pool_max_size=threads, group_commit_window=args.group_commit)
+        db = HospitalDatabase()
+        for w in workers:
+            w.start()
+        start_line.wait()
+        started = time.perf_counter()
+        for w in workers:
+            w.join()
+        elapsed = time.perf_counter() - started
+        db.execute("DELETE FROM patient WHERE id >= %s;", (ID_BASE,))
+        db.close_connection()
+    return threads * ops / elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8, 16])
+    parser.add_argument("--ops", type=int, default=500, help="inserts per worker thread")
+    parser.add_argument("--group-commit", type=float, default=0.0, metavar="SECONDS", help="group commit window, 0 disables")
+    add_backend_arguments(parser)
+    args = parser.parse_args()
+
+    baseline = None
+    print(f"{'threads':>8} {'inserts/s':>12} {'speedup':>8}")
+    for threads in args.threads:
+        rate = run(args, threads, args.ops)
+        baseline = baseline or rate
+        print(f"{threads:>8} {rate:>12.0f} {rate / baseline:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
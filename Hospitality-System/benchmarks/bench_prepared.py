@@ -0,0 +1,55 @@
+"""Per-insert latency of Patient.save_to_db with and without the prepared-statement cache.
+
+Run from Hospitality-System/ against the Docker MySQL service:
+
+    docker compose up -d mysql
+    python -m benchmarks.bench_prepared --rows 5000
+
+SQLite caches prepared statements inside the driver, so ``--backend sqlite``
+shows both modes taking the same path.
+"""
+import argparse
+import contextlib
+import io
+import statistics
+import time
+
+from benchmarks import add_backend_arguments, configure_backend
+from hospital import HospitalDatabase, Patient
+
+ID_BASE = 900_000_000  # benchmark rows live far above real patient ids
+
+
+def latencies(args, cache_size):
+    with contextlib.redirect_stdout(io.StringIO()):
+        configure_backend(args, prepared_cache_size=cache_size, cache_size=0)
+        db = HospitalDatabase()
+        db.execute("DELETE FROM patient WHERE id >= %s;", (ID_BASE,))
+    patients = [
+        Patient(ID_BASE + i, f"Bench Patient {i}", 1980, "Female", "5550000000", "Egyptian", ["Flu"])
+        for i in range(args.rows)
+    ]
+    times = []
+    for patient in patients:
+        started = time.perf_counter()
+        patient.save_to_db()
+        times.append(time.perf_counter() - started)
+    db.execute("DELETE FROM patient WHERE id >= %s;", (ID_BASE,))
+    return times
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=5000)
+    add_backend_arguments(parser)
+    args = parser.parse_args()
+
+    results = [("unprepared", latencies(args, 0)), ("prepared", latencies(args, 64))]
+    print(f"{'mode':>12} {'mean µs':>9} {'p50 µs':>9} {'p99 µs':>9}")
+    for name, times in results:
+        p99 = statistics.quantiles(times, n=100)[98]
+        print(f"{name:>12} {statistics.fmean(times) * 1e6:>9.1f} {statistics.median(times) * 1e6:>9.1f} {p99 * 1e6:>9.1f}")
+
+
+if __name__ == "__main__":
+    main()
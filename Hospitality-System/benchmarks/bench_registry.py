@@ -0,0 +1,97 @@
+"""Indexed HospitalRegistry lookups versus scanning every loaded entity.
+
+Entities are synthetic and built in memory with ``from_row``; no database is
+needed.
+
+    python -m benchmarks.bench_registry --count 1000000
+"""
+import argparse
+import random
+import time
+
+from hospital import DataEntry, Doctor, Employee, Manager, Nurse, Patient
+from registry import HospitalRegistry
+
+DEPARTMENTS = ["Cardiology", "ICU", "Emergency", "Pediatrics", "Oncology", "Radiology", "Surgery", "Administration"]
+SPECIALIZATIONS = ["Cardiologist", "Surgeon", "Pediatrician", "Oncologist", "Radiologist", "Neurologist"]
+SPECIALTIES = ["Critical Care", "Pediatric", "Surgical", "Emergency", "Oncology"]
+NATIONALITIES = [f"Country {i}" for i in range(150)]
+
+
+def entities(count, seed=42):
+    """A hospital-shaped mix: 70% patients, then nurses, doctors, clerks and managers."""
+    rng = random.Random(seed)
+    for i in range(1, count + 1):
+        nationality = rng.choice(NATIONALITIES)
+        kind = rng.random()
+        if kind < 0.70:
+            yield Patient.from_row((i, f"Patient {i}", 1940 + i % 80, "Female", "5550000000", nationality), ["Flu"])
+            continue
+        department = rng.choice(DEPARTMENTS)
+        row = (i, f"Staff {i}", 1960 + i % 40, "Male", "5550000000", 9000.0, department, nationality)
+        if kind < 0.85:
+            yield Employee.from_row(row + (None, rng.choice(SPECIALTIES), None, None))
+        elif kind < 0.95:
+            yield Employee.from_row(row + (rng.choice(SPECIALIZATIONS), None, None, None))
+        elif kind < 0.99:
+            yield Employee.from_row(row + (None, None, i, None))
+        else:
+            yield Employee.from_row(row + (None, None, None, i))
+
+
+def timed(run, repeat):
+    best, result = float("inf"), None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        result = run()
+        best = min(best, time.perf_counter() - started)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=1_000_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    population = list(entities(args.count))
+    started = time.perf_counter()
+    registry = HospitalRegistry(population)
+    build = time.perf_counter() - started
+    print(f"Registered {len(registry):,} entities in {build:.2f} s ({len(registry) / build:,.0f}/s)")
+
+    queries = [
+        ("cardiologists", lambda: registry.by_specialization("Cardiologist"),
+         lambda: [e for e in population if isinstance(e, Doctor) and e.specialization == "Cardiologist"]),
+        ("nurses in ICU", lambda: registry.find(Nurse, department="ICU"),
+         lambda: [e for e in population if isinstance(e, Nurse) and e.department == "ICU"]),
+        ("ICU staff", lambda: registry.by_department("ICU"),
+         lambda: [e for e in population if isinstance(e, Employee) and e.department == "ICU"]),
+        ("Country 7 patients", lambda: registry.by_nationality("Country 7", Patient),
+         lambda: [e for e in population if isinstance(e, Patient) and e.nationality == "Country 7"]),
+        ("critical-care nurses", lambda: registry.by_specialty("Critical Care"),
+         lambda: [e for e in population if isinstance(e, Nurse) and e.specialty == "Critical Care"]),
+        ("managers", lambda: registry.find(Manager),
+         lambda: [e for e in population if isinstance(e, Manager)]),
+        ("clerks from Country 7", lambda: registry.find(DataEntry, nationality="Country 7"),
+         lambda: [e for e in population if isinstance(e, DataEntry) and e.nationality == "Country 7"]),
+    ]
+    print(f"{'query':>22} {'results':>9} {'index ms':>9} {'scan ms':>9} {'speedup':>8}")
+    for name, indexed, scan in queries:
+        fast, found = timed(indexed, args.repeat)
+        slow, expected = timed(scan, max(1, args.repeat // 2))
+        assert sorted(e.id for e in found) == sorted(e.id for e in expected)
+        print(f"{name:>22} {len(found):>9,} {fast * 1e3:>9.2f} {slow * 1e3:>9.1f} {slow / fast:>7.0f}x")
+
+    victims = random.Random(7).sample(population, min(10_000, len(population)))
+    started = time.perf_counter()
+    for entity in victims:
+        registry.remove(entity)
+    for entity in victims:
+        registry.add(entity)
+    churn = (time.perf_counter() - started) / (2 * len(victims))
+    print(f"remove/add: {churn * 1e6:.2f} µs per operation")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Census statistics from a columnar Roster versus loops over Patient objects.
+
+Patients are synthetic and built in memory; no database is needed.
+
+    python -m benchmarks.bench_roster --count 1000000
+"""
+import argparse
+import random
+import statistics
+import time
+from collections import Counter, defaultdict
+
+from hospital import Patient
+from roster import Roster
+
+NATIONALITIES = [f"Country {i}" for i in range(150)]
+
+
+def patients(count, seed=42):
+    rng = random.Random(seed)
+    genders = ("Female", "Male")
+    return [
+        Patient.from_row((i, f"Patient {i}", rng.randint(1925, 2024), rng.choice(genders), "5550000000", rng.choice(NATIONALITIES)))
+        for i in range(1, count + 1)
+    ]
+
+
+def timed(run):
+    started = time.perf_counter()
+    run()
+    return time.perf_counter() - started
+
+
+def loop_percentiles(population):
+    groups = defaultdict(list)
+    for patient in population:
+        groups[patient.nationality].append(patient.calculate_age())
+    return {key: statistics.quantiles(ages, n=4, method="inclusive") for key, ages in groups.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--count", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    population = patients(args.count)
+    started = time.perf_counter()
+    roster = Roster.from_entities(population)
+    print(f"Built a {len(roster):,}-row roster in {time.perf_counter() - started:.2f} s")
+
+    cases = [
+        ("ages", lambda: roster.ages(), lambda: [p.calculate_age() for p in population]),
+        ("count by gender+nationality", lambda: roster.count_by("gender", "nationality"),
+         lambda: Counter((p.gender, p.nationality) for p in population)),
+        ("age histogram", lambda: roster.age_histogram(bins=10),
+         lambda: Counter(min(p.calculate_age() // 10, 9) for p in population)),
+        ("age quartiles by nationality", lambda: roster.age_percentiles(by=("nationality",)),
+         lambda: loop_percentiles(population)),
+        ("female over 65", lambda: roster.mask(gender="Female") & (roster.ages() > 65),
+         lambda: [p for p in population if p.gender == "Female" and p.calculate_age() > 65]),
+    ]
+    print(f"{'statistic':>30} {'roster ms':>10} {'objects ms':>11} {'speedup':>8}")
+    for name, vectorized, loop in cases:
+        fast = min(timed(vectorized) for _ in range(5))
+        slow = timed(loop)
+        print(f"{name:>30} {fast * 1e3:>10.2f} {slow * 1e3:>11.1f} {slow / fast:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
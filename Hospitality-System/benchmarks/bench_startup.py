@@ -0,0 +1,86 @@
+"""Startup cost: ``import hospital`` under ``-X importtime``, first HospitalDatabase() and CLI ``--help``.
+
+Every measurement runs in a fresh interpreter, so nothing imported by an
+earlier case is already cached. No database is needed.
+
+    python -m benchmarks.bench_startup              # exits 1 if an import is over budget
+    python -m benchmarks.bench_startup --runs 10
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+HERE = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Cumulative seconds ``import hospital`` may take in a fresh interpreter. It
+# needs about 0.03 s with warm bytecode caches; the budget leaves room for slow
+# CI machines, not for a database driver (~0.1 s) or pytest (~0.15 s).
+IMPORT_BUDGET = 0.15
+
+# Modules only the code paths that need them may import.
+DEFERRED = ("mysql.connector", "sqlite3", "backends", "group_commit", "write_behind", "query_stats", "numpy", "pytest")
+
+_PROBE = "import sys; import {module}; import json; print(json.dumps(sorted(sys.modules)))"
+
+
+def _env():
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)  # let the first run write the caches the next ones read
+    return env
+
+
+def import_profile(module="hospital", runs=3):
+    """(best cumulative seconds to import ``module``, modules it loaded) over fresh interpreters."""
+    best, loaded = float("inf"), ()
+    for _ in range(runs + 1):  # the first run only warms the bytecode caches
+        done = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", _PROBE.format(module=module)],
+            cwd=HERE, env=_env(), capture_output=True, text=True, check=True,
+        )
+        for line in done.stderr.splitlines():
+            # "import time: <self us> | <cumulative us> | <name>", nested imports indented
+            fields = line.split("|")
+            if len(fields) == 3 and fields[2].rstrip() == f" {module}":
+                best = min(best, int(fields[1]) / 1e6)
+        loaded = json.loads(done.stdout.splitlines()[-1])
+    return best, loaded
+
+
+def wall_time(argv, runs=3):
+    """Best wall-clock seconds of ``python <argv>`` in a fresh interpreter."""
+    best = float("inf")
+    for _ in range(runs):
+        started = time.perf_counter()
+        subprocess.run([sys.executable, *argv], cwd=HERE, env=_env(), capture_output=True, check=True)
+        best = min(best, time.perf_counter() - started)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+
+    seconds, loaded = import_profile("hospital", args.runs)
+    eager = [name for name in DEFERRED if name in loaded]
+    print(f"import hospital            {seconds * 1e3:8.1f} ms   budget {IMPORT_BUDGET * 1e3:.0f} ms")
+    print(f"  deferred modules loaded: {', '.join(eager) or 'none'}")
+
+    construct = (
+        "import time; started = time.perf_counter(); from hospital import HospitalDatabase; "
+        "HospitalDatabase(); print(time.perf_counter() - started)"
+    )
+    done = subprocess.run([sys.executable, "-c", construct], cwd=HERE, env=_env(), capture_output=True, text=True, check=True)
+    print(f"import + HospitalDatabase() {float(done.stdout) * 1e3:7.1f} ms   (no connection opened)")
+    for argv in (["-c", "pass"], ["importer.py", "--help"], ["payroll.py", "--help"]):
+        print(f"python {' '.join(argv):<20}{wall_time(argv, args.runs) * 1e3:8.1f} ms wall")
+
+    if seconds > IMPORT_BUDGET or eager:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,200 @@
+"""Hot-path benchmark suite with machine-readable results and a stored baseline.
+
+Run from Hospitality-System/; persistence cases use a throwaway SQLite file:
+
+    python -m benchmarks.suite                        # compare with benchmarks/baseline.json
+    python -m benchmarks.suite --json results.json    # also write this run's results
+    python -m benchmarks.suite --save-baseline        # record this machine's baseline
+
+Each case reports the best time per operation over ``--repeat`` runs. A case
+slower than the baseline by more than ``--tolerance`` is a regression and
+makes the command exit with status 1. Baselines only compare runs on the
+same machine and Python build.
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+
+from hospital import DataEntry, Doctor, Employee, HospitalDatabase, Manager, Nurse, Patient, PrescriptionFactory
+
+ID_BASE = 900_000_000  # benchmark rows live far above real ids
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+
+def best(run, ops, repeat, setup=None):
+    """Fastest seconds per operation of ``run(state)`` over ``repeat`` runs of ``ops`` operations."""
+    times = []
+    for _ in range(repeat):
+        state = setup() if setup else None
+        with contextlib.redirect_stdout(io.StringIO()):
+            started = time.perf_counter()
+            run(state)
+            times.append(time.perf_counter() - started)
+    return min(times) / ops
+
+
+def make_doctor(i=0):
+    return Doctor(ID_BASE + i, "Dr. Bench", 1975, "Female", "5550000000", "Egyptian", 100000, "Surgery", "Surgeon")
+
+
+def make_patient(i=0):
+    return Patient(ID_BASE + i, f"Bench Patient {i}", 1980, "Male", "5551111111", "Egyptian", ["Flu", "Asthma"])
+
+
+def bench_construction(repeat):
+    ops = 10_000
+    return {
+        "construct_doctor": best(lambda _: [make_doctor(i) for i in range(ops)], ops, repeat),
+        "construct_patient": best(lambda _: [make_patient(i) for i in range(ops)], ops, repeat),
+    }
+
+
+def bench_prescriptions(repeat):
+    doctor = make_doctor()
+    ops = 5_000
+    results = {
+        "factory_create_prescription": best(
+            lambda patient: [PrescriptionFactory.create_prescription(doctor, patient, f"Drug {i}") for i in range(ops)],
+            ops, repeat, setup=make_patient,
+        ),
+        "write_prescription": best(
+            lambda patient: [doctor.write_prescription(patient, f"Drug {i}") for i in range(ops)],
+            ops, repeat, setup=make_patient,
+        ),
+    }
+
+    # Adding to a patient that already holds ``size`` prescriptions.
+    for size in (100, 1_000, 10_000):
+        adds = 1_000
+
+        def setup():
+            patient = make_patient()
+            for i in range(size):
+                patient.add_prescription(PrescriptionFactory.create_prescription(doctor, patient, f"Old {i}"))
+            new = [PrescriptionFactory.create_prescription(doctor, patient, f"New {i}") for i in range(adds)]
+            return patient, new
+
+        def run(state):
+            patient, new = state
+            for prescription in new:
+                patient.add_prescription(prescription)
+
+        results[f"add_prescription[{size}]"] = best(run, adds, repeat, setup=setup)
+    return results
+
+
+def bench_persistence(repeat):
+    with tempfile.TemporaryDirectory() as tmp, contextlib.redirect_stdout(io.StringIO()):
+        settings = dict(HospitalDatabase.config)
+        HospitalDatabase.configure(backend="sqlite", sqlite_path=os.path.join(tmp, "suite.db"), cache_size=0)
+        db = HospitalDatabase()
+        try:
+            def clear():
+                db.execute("DELETE FROM patient WHERE id >= %s;", (ID_BASE,))
+                db.execute("DELETE FROM employee WHERE id >= %s;", (ID_BASE,))
+
+            def patients(count):
+                clear()
+                return [make_patient(i) for i in range(count)]
+
+            def doctors(count):
+                clear()
+                return [make_doctor(i) for i in range(count)]
+
+            def staff(count):
+                clear()
+                kinds = (
+                    lambda i: Doctor(ID_BASE + i, "Dr. Bench", 1975, "Female", "5550000000", "Egyptian", 100000, "Surgery", "Surgeon"),
+                    lambda i: Nurse(ID_BASE + i, "Nurse Bench", 1990, "Male", "5550000000", 50000, "ICU", "Egyptian", "Critical Care"),
+                    lambda i: Manager(ID_BASE + i, "Manager Bench", 1970, "Female", "5550000000", 90000, "Administration", "Egyptian"),
+                    lambda i: DataEntry(ID_BASE + i, "Clerk Bench", 1995, "Male", "5550000000", 30000, "Records", "Egyptian"),
+                )
+                return [kinds[i % 4](i) for i in range(count)]
+
+            def save_each(entities):
+                for entity in entities:
+                    entity.save_to_db()
+
+            results = {
+                "patient_save_to_db": best(save_each, 500, repeat, setup=lambda: patients(500)),
+                "doctor_save_to_db": best(save_each, 500, repeat, setup=lambda: doctors(500)),
+                "patient_save_many": best(Patient.save_many, 20_000, repeat, setup=lambda: patients(20_000)),
+                "employee_save_many": best(Employee.save_many, 20_000, repeat, setup=lambda: staff(20_000)),
+            }
+            clear()
+        finally:
+            HospitalDatabase.configure(**settings)
+    return results
+
+
+def run_suite(repeat):
+    results = {}
+    for bench in (bench_construction, bench_prescriptions, bench_persistence):
+        results.update(bench(repeat))
+    return {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "results": {name: {"seconds_per_op": seconds} for name, seconds in results.items()},
+    }
+
+
+def compare(current, baseline, tolerance):
+    """Print each case against the baseline and return the names that regressed."""
+    regressions = []
+    print(f"{'case':>28} {'µs/op':>10} {'baseline':>10} {'change':>8}")
+    for name, result in current["results"].items():
+        seconds = result["seconds_per_op"]
+        before = baseline.get("results", {}).get(name, {}).get("seconds_per_op")
+        if before is None:
+            print(f"{name:>28} {seconds * 1e6:>10.2f} {'-':>10} {'new':>8}")
+            continue
+        change = seconds / before - 1
+        flag = ""
+        if change > tolerance:
+            regressions.append(name)
+            flag = "  ❌ regression"
+        print(f"{name:>28} {seconds * 1e6:>10.2f} {before * 1e6:>10.2f} {change:>+8.0%}{flag}")
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="runs per case; the fastest counts")
+    parser.add_argument("--json", help="write this run's results to a file")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--save-baseline", action="store_true", help="store this run as the baseline")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="allowed slowdown before a case fails")
+    args = parser.parse_args(argv)
+
+    current = run_suite(args.repeat)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(current, f, indent=2)
+
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(current, f, indent=2)
+            f.write("\n")
+        print(f"✅ Baseline saved to {args.baseline}")
+        return 0
+
+    baseline = {}
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+    regressions = compare(current, baseline, args.tolerance)
+    if regressions:
+        print(f"❌ {len(regressions)} case(s) slower than the baseline: {', '.join(regressions)}")
+        return 1
+    print("✅ No regressions.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
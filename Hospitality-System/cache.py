@@ -0,0 +1,87 @@
+import threading
+import time
+from collections import OrderedDict
+
+
+class EntityCache:
+    """Bounded, thread-safe LRU cache of entities keyed by id, with optional TTL.
+
+    ``maxsize=0`` disables caching and ``ttl=None`` keeps entries until they
+    are evicted or invalidated. Readers take a ``token()`` before querying the
+    database and pass it to ``put()``; the entry is dropped if anything was
+    invalidated in between, so a slow read never re-caches a stale row.
+    """
+
+    def __init__(self, maxsize=10000, ttl=None, clock=time.monotonic):
+        if not isinstance(maxsize, int) or maxsize < 0:
+            raise ValueError("Cache size must be a non-negative integer.")
+
+        if ttl is not None and ttl <= 0:
+            raise ValueError("Cache TTL must be positive or None.")
+
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._clock = clock
+        self._data = OrderedDict()  # key -> (entity, expires_at), least recent first
+        self._lock = threading.Lock()
+        self._invalidations = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def __len__(self):
+        return len(self._data)
+
+    def get(self, key):
+        """Return the cached entity for ``key`` or None."""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            entity, expires_at = entry
+            if expires_at is not None and self._clock() >= expires_at:
+                del self._data[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return entity
+
+    def token(self):
+        return self._invalidations
+
+    def put(self, key, entity, token=None):
+        """Cache ``entity``; skipped if an invalidation happened since ``token``."""
+        if self.maxsize == 0:
+            return
+        expires_at = None if self.ttl is None else self._clock() + self.ttl
+        with self._lock:
+            if token is not None and token != self._invalidations:
+                return
+            self._data[key] = (entity, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+                self.evictions += 1
+
+    def invalidate(self, key):
+        with self._lock:
+            self._invalidations += 1
+            self._data.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._invalidations += 1
+            self._data.clear()
+
+    def stats(self):
+        return {
+            "size": len(self._data),
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
@@ -0,0 +1,78 @@
+import threading
+
+
+class CategoryDictionary:
+    """Append-only dictionary of the distinct values of one low-cardinality field.
+
+    ``intern()`` returns the one shared instance of an equal string, so a
+    million entities hold a few hundred strings between them. ``code()`` and
+    ``value()`` translate to and from compact integer codes, numbered in
+    first-seen order and stable for the life of the process. Looking up a
+    known value takes no lock; values that are not strings pass through.
+    """
+
+    __slots__ = ("name", "_codes", "_values", "_lock")
+
+    def __init__(self, name, values=()):
+        self.name = name
+        self._codes = {}  # value -> code
+        self._values = []  # code -> the shared instance
+        self._lock = threading.Lock()
+        for value in values:
+            self.code(value)
+
+    def __len__(self):
+        return len(self._values)
+
+    def __iter__(self):
+        return iter(list(self._values))
+
+    def __contains__(self, value):
+        return value in self._codes
+
+    def _add(self, value):
+        with self._lock:
+            code = self._codes.get(value)
+            if code is None:
+                code = len(self._values)
+                self._values.append(value)
+                self._codes[value] = code
+        return code
+
+    def intern(self, value):
+        """The shared instance equal to ``value``."""
+        if value.__class__ is not str:
+            return value
+        code = self._codes.get(value)
+        if code is None:
+            code = self._add(value)
+        return self._values[code]
+
+    def code(self, value):
+        """Integer code of the string ``value``, adding it if it is new."""
+        if value.__class__ is not str:
+            raise TypeError(f"{self.name} values must be strings.")
+        code = self._codes.get(value)
+        return self._add(value) if code is None else code
+
+    def value(self, code):
+        """The string with integer ``code``; IndexError for unknown codes."""
+        if code < 0:
+            raise IndexError(f"Unknown {self.name} code: {code}")
+        return self._values[code]
+
+    def encode(self, values):
+        return [self.code(value) for value in values]
+
+    def decode(self, codes):
+        return [self.value(code) for code in codes]
+
+
+GENDERS = CategoryDictionary("gender")
+NATIONALITIES = CategoryDictionary("nationality")
+DEPARTMENTS = CategoryDictionary("department")
+SPECIALIZATIONS = CategoryDictionary("specialization")
+SPECIALTIES = CategoryDictionary("specialty")
+MEDICATIONS = CategoryDictionary("medication")
+
+CATEGORIES = {dictionary.name: dictionary for dictionary in (GENDERS, NATIONALITIES, DEPARTMENTS, SPECIALIZATIONS, SPECIALTIES, MEDICATIONS)}
@@ -0,0 +1,109 @@
+"""End-to-end walkthrough of the hospital system against the configured database.
+
+    python demo.py                                   # the Docker MySQL service
+    DB_BACKEND=sqlite DB_PATH=demo.db python demo.py
+"""
+from hospital import DataEntry, Doctor, HospitalDatabase, Patient
+from logging_config import configure_logging
+
+
+def run_demo():
+    # Initialize the database connection
+    db = HospitalDatabase()
+
+    try:
+        # Clear existing data for a clean test
+        db.execute("DELETE FROM printed_prescriptions;")
+        db.execute("DELETE FROM prescription;")
+        db.execute("DELETE FROM patient;")
+        db.execute("DELETE FROM doctor;")
+        db.execute("DELETE FROM employee;")
+        print("✅ Cleared existing data for a clean test.")
+
+        # Step 1: Create and save a DataEntry employee
+        data_entry = DataEntry(
+            id=31, name="Masri", birth_year=1990, gender="Male",
+            phone_number="111223233", salary=3500, department="Records", nationality="saudi"
+        )
+        data_entry.save_to_db()
+        print("✅ DataEntry employee created and saved.")
+
+        # Step 2: Create and save a Patient
+        patient = Patient(
+            id=1, name="John Ahmed", birth_year=1985, gender="Male",
+            phone_number="123456789", nationality="American", medical_history=["Flu", "Allergies"]
+        )
+        patient.save_to_db()
+        print("✅ Patient created and saved.")
+
+        # Step 3: Create and save a Doctor (`employee` and `doctor` rows together)
+        doctor = Doctor(
+            id=10, name="Dr. Sami", birth_year=1975, gender="Male",
+            phone_number="987654321", nationality="British", salary=8000,
+            department="Cardiology", specialization="Cardiologist"
+        )
+        doctor.save_to_db()
+        print("✅ Doctor created and saved.")
+
+        # Step 4: Write a prescription and save it
+        doctor.write_prescription(patient, "Paracetamol")
+        patient.prescriptions[0].save_to_db()
+        print("✅ Prescription created and saved.")
+
+        # Step 5: Log the prescription print event
+        prescription_id = patient.prescriptions[0].id  # Get the prescription ID
+        data_entry.print_prescription(prescription_id)
+        print("✅ Prescription print event logged.")
+
+        # Step 6: Fetch and display data from the database
+        print("\n📋 Fetching and displaying data from the database:")
+
+        # Fetch employees
+        print("\nEmployees:")
+        for emp in db.stream("SELECT * FROM employee;"):
+            print(emp)
+
+        # Fetch patients
+        print("\nPatients:")
+        for pat in db.stream("SELECT * FROM patient;"):
+            print(pat)
+
+        # Fetch prescriptions
+        print("\nPrescriptions:")
+        for pres in db.stream("SELECT * FROM prescription;"):
+            print(pres)
+
+        # Fetch printed prescriptions
+        print("\nPrinted Prescriptions:")
+        for pp in db.stream("SELECT * FROM printed_prescriptions;"):
+            print(pp)
+
+        # Step 7: Test error handling
+        print("\n🧪 Testing error handling:")
+
+        # Try to save a duplicate employee
+        try:
+            data_entry.save_to_db()
+        except db.errors as err:
+            print(f"❌ Expected error when saving duplicate employee: {err}")
+
+        # Try to write a prescription with invalid medication
+        try:
+            doctor.write_prescription(patient, "")
+        except ValueError as err:
+            print(f"❌ Expected error when writing prescription with invalid medication: {err}")
+
+        # Try to log a print event for a non-existent prescription
+        try:
+            data_entry.print_prescription(999)  # Non-existent prescription ID
+        except db.errors as err:
+            print(f"❌ Expected error when logging print event for non-existent prescription: {err}")
+
+    finally:
+        # Close the database connection
+        db.close_connection()
+
+
+if __name__ == "__main__":
+    configure_logging()
+    run_demo()
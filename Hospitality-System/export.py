@@ -0,0 +1,97 @@
+"""Stream hospital tables to CSV or JSON Lines with constant memory.
+
+    python export.py prescription prescriptions.csv.gz --chunk-size 5000
+    python export.py patient patients.jsonl
+"""
+import argparse
+import csv
+import gzip
+import io
+import json
+import sys
+import time
+
+from hospital import HospitalDatabase
+
+TABLES = (
+    "employee", "doctor", "nurse", "manager", "data_entry", "patient", "medical_condition", "patient_condition",
+    "prescription", "printed_prescriptions",
+)
+FORMATS = ("csv", "jsonl")
+
+
+def _guess_format(path):
+    name = path[:-3] if path.endswith(".gz") else path
+    for fmt in FORMATS:
+        if name.endswith("." + fmt):
+            return fmt
+    raise ValueError(f"Cannot tell the export format of {path}; pass fmt='csv' or 'jsonl'.")
+
+
+def _open_output(path, compress, buffer_size):
+    raw = gzip.open(path, "wb", compresslevel=6) if compress else open(path, "wb", buffering=0)
+    return io.TextIOWrapper(io.BufferedWriter(raw, buffer_size), encoding="utf-8", newline="")
+
+
+def _json_value(value):
+    return value.isoformat(" ") if hasattr(value, "isoformat") else str(value)
+
+
+def export_table(table, path, fmt=None, chunk_size=None, compress=None, buffer_size=1 << 20):
+    """Write every row of ``table`` to ``path`` and return (rows, seconds).
+
+    Rows stream from an unbuffered cursor ``chunk_size`` at a time into a
+    ``buffer_size`` write buffer, optionally gzip-compressed, so memory use
+    does not grow with the table.
+    """
+    if table not in TABLES:
+        raise ValueError(f"Unknown table: {table}")
+
+    fmt = fmt or _guess_format(path)
+    if fmt not in FORMATS:
+        raise ValueError(f"Unsupported export format: {fmt}")
+
+    if compress is None:
+        compress = path.endswith(".gz")
+
+    db = HospitalDatabase()
+    started = time.perf_counter()
+    count = 0
+    rows = db.stream(f"SELECT * FROM {table};", chunk_size=chunk_size, header=True)
+    try:
+        with _open_output(path, compress, buffer_size) as out:
+            columns = next(rows)
+            if fmt == "csv":
+                writer = csv.writer(out)
+                writer.writerow(columns)
+                for row in rows:
+                    writer.writerow(row)
+                    count += 1
+            else:
+                encode = json.JSONEncoder(default=_json_value, ensure_ascii=False, separators=(",", ":")).encode
+                write = out.write
+                for row in rows:
+                    write(encode(dict(zip(columns, row))))
+                    write("\n")
+                    count += 1
+    finally:
+        rows.close()
+    return count, time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Stream a hospital table to CSV or JSON Lines.")
+    parser.add_argument("table", choices=TABLES)
+    parser.add_argument("output", help="output file; .csv/.jsonl, add .gz to compress")
+    parser.add_argument("--format", choices=FORMATS, help="defaults to the output file extension")
+    parser.add_argument("--gzip", action="store_true", default=None, help="compress even without a .gz extension")
+    parser.add_argument("--chunk-size", type=int, default=None, help="rows fetched per round-trip")
+    args = parser.parse_args(argv)
+
+    rows, seconds = export_table(args.table, args.output, args.format, args.chunk_size, args.gzip)
+    rate = rows / seconds if seconds else float("inf")
+    print(f"✅ Exported {rows} rows from {args.table} to {args.output} in {seconds:.2f}s ({rate:,.0f} rows/s)", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
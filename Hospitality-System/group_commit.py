@@ -0,0 +1,103 @@
+import threading
+import time
+from contextlib import contextmanager
+
+
+class _Batch:
+    """Statements that will become durable with the same commit."""
+    __slots__ = ("done", "error")
+
+    def __init__(self):
+        self.done = False
+        self.error = None
+
+
+class GroupCommitter:
+    """Coalesce commits from concurrent threads into one commit per window.
+
+    Writers run their statement on one shared connection and then wait for
+    the batch leader, which waits up to ``window`` seconds (or until
+    ``max_batch`` statements joined) and commits once for everybody. A
+    failing statement only affects its own caller; a failing commit is
+    raised to every member of the batch.
+    """
+
+    def __init__(self, pool, window=0.002, max_batch=256):
+        if window <= 0:
+            raise ValueError("Group commit window must be positive.")
+
+        self._pool = pool
+        self.window = window
+        self.max_batch = max_batch
+        self.commits = 0
+        self._cond = threading.Condition()
+        self._conn = None
+        self._batch = _Batch()
+        self._pending = 0
+        self._leader = False
+
+    def run(self, work):
+        """Call ``work(conn)`` on the shared connection and return once it is committed."""
+        with self.hold() as conn:
+            return work(conn)
+
+    @contextmanager
+    def hold(self):
+        """Hold the shared connection for a block of statements, then wait for their commit.
+
+        Other writers queue until the block ends. If it raises, nothing is
+        waited for and undoing its statements is up to the caller.
+        """
+        with self._cond:
+            if self._conn is None:
+                self._conn = self._pool.acquire()
+            yield self._conn
+            batch = self._batch
+            self._pending += 1
+            if self._leader:
+                if self._pending >= self.max_batch:
+                    self._cond.notify_all()
+                while not batch.done:
+                    self._cond.wait()
+            else:
+                self._leader = True
+                self._lead()
+            if batch.error is not None:
+                raise batch.error
+
+    def _lead(self):
+        # Called with the condition held; waiting releases it so followers can join.
+        deadline = time.monotonic() + self.window
+        while self._pending < self.max_batch:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            self._cond.wait(remaining)
+
+        batch, self._batch = self._batch, _Batch()
+        try:
+            self._conn.commit()
+            self.commits += 1
+        except BaseException as e:
+            batch.error = e
+            self._reset_connection()
+        batch.done = True
+        self._pending = 0
+        self._leader = False
+        self._cond.notify_all()
+
+    def _reset_connection(self):
+        conn, self._conn = self._conn, None
+        try:
+            conn.rollback()
+        except Exception:
+            self._pool.release(conn, discard=True)
+        else:
+            self._pool.release(conn)
+
+    def close(self):
+        """Return the shared connection to the pool."""
+        with self._cond:
+            if self._conn is not None:
+                self._pool.release(self._conn)
+                self._conn = None
@@ -1,8 +1,27 @@
 from datetime import date, datetime
 from abc import ABC, abstractmethod
-import mysql.connector
+from collections import OrderedDict
+from collections.abc import MutableSequence
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import chain, count, islice, repeat
+import logging
+import os
+import threading
+import time
+import weakref
+from cache import EntityCache
+from categories import DEPARTMENTS, GENDERS, MEDICATIONS, NATIONALITIES, SPECIALIZATIONS, SPECIALTIES
+from pool import ConnectionPool
+
+logger = logging.getLogger("hospital")
 
 class Person(ABC):
+    # Slots instead of a per-instance __dict__ keep large censuses compact;
+    # every subclass declares its own fields the same way. Low-cardinality
+    # strings are shared through the dictionaries in categories.py.
+    __slots__ = ("id", "name", "birth_year", "gender", "phone_number", "nationality")
+
     def __init__(self, id, name, birth_year, gender, phone_number, nationality):
         if not all([id, name, birth_year, gender, phone_number, nationality]):  
             raise ValueError("All fields are required and cannot be None or empty.")
@@ -16,9 +35,29 @@ class Person(ABC):
         self.id = id
         self.name = name
         self.birth_year = birth_year
-        self.gender = gender
+        self.gender = GENDERS.intern(gender)
         self.phone_number = phone_number
-        self.nationality = nationality
+        self.nationality = NATIONALITIES.intern(nationality)
+
+    @classmethod
+    def from_row(cls, row):
+        """Build from a trusted (id, name, birth_year, gender, phone_number, nationality) row.
+
+        Rows read back from the database were validated when they were saved,
+        so the field checks in ``__init__`` are skipped. Use the constructor
+        for user input.
+        """
+        person = cls.__new__(cls)
+        person.id, person.name, person.birth_year, gender, person.phone_number, nationality = row
+        person.gender = GENDERS.intern(gender)
+        person.nationality = NATIONALITIES.intern(nationality)
+        return person
+
+    @classmethod
+    def from_rows(cls, rows):
+        """Build a list of entities from trusted rows, skipping rows that map to none."""
+        from_row = cls.from_row
+        return [entity for entity in map(from_row, rows) if entity is not None]
 
     def display_info(self):
         print(f"ID: {self.id}, Name: {self.name}, Age: {self.calculate_age()}, Nationality: {self.nationality}")
@@ -29,6 +68,8 @@ class Person(ABC):
 
 # Abstract Employee class
 class Employee(Person, ABC):
+    __slots__ = ("salary", "department")
+
     def __init__(self, id, name, birth_year, gender, phone_number, nationality, salary, department):
         super().__init__(id, name, birth_year, gender, phone_number, nationality)
         
@@ -36,7 +77,7 @@ class Employee(Person, ABC):
             raise ValueError("Salary must be a positive number.")
 
         self.salary = salary
-        self.department = department
+        self.department = DEPARTMENTS.intern(department)
     
     @abstractmethod
     def perform_duties(self):
@@ -47,21 +88,158 @@ class Employee(Person, ABC):
         print(f"Department: {self.department}, Salary: {self.salary}")
 
     def save_to_db(self):
+        """Save the employee row and its subtype row in one transaction."""
         db = HospitalDatabase()
         try:
             sql = """
             INSERT INTO employee (id, name, birth_year, gender, phone_number, salary, department, nationality)
             VALUES (%s, %s, %s, %s, %s, %s, %s, %s);
             """
-            values = (self.id, self.name, self.birth_year, self.gender, self.phone_number, self.salary, self.department, self.nationality)
-            db.cursor.execute(sql, values)
-            db.conn.commit()
-            print(f"✅ Employee {self.name} saved to database.")
-        except mysql.connector.Error as err:
-            print(f"❌ Database Error: {err}")
+            with db.transaction():
+                db.execute(sql, self._db_values(), prepared=True)
+                if self._subtype_table:
+                    db.execute(self._subtype_sql(), self._subtype_values(), prepared=True)
+            db.caches["employee"].invalidate(self.id)
+            logger.info("✅ Employee %s saved to database.", self.name, extra={"event": "employee_saved", "employee_id": self.id})
+        except db.errors as err:
+            logger.error("❌ Database Error: %s", err, extra={"event": "employee_save_failed", "employee_id": self.id})
+
+    def delete_from_db(self):
+        """Delete the employee (subtype rows cascade) and drop it from the cache."""
+        db = HospitalDatabase()
+        try:
+            db.execute("DELETE FROM employee WHERE id = %s;", (self.id,))
+            db.caches["employee"].invalidate(self.id)
+            logger.info("🗑️ Employee %s deleted from database.", self.name, extra={"event": "employee_deleted", "employee_id": self.id})
+        except db.errors as err:
+            logger.error("❌ Database Error: %s", err, extra={"event": "employee_delete_failed", "employee_id": self.id})
+
+    _columns = ("id", "name", "birth_year", "gender", "phone_number", "salary", "department", "nationality")
+
+    # Subclasses name the table holding their subtype row (doctor, nurse, ...).
+    _subtype_table = None
+    _subtype_columns = ("id",)
+
+    def _db_values(self):
+        return (self.id, self.name, self.birth_year, self.gender, self.phone_number, self.salary, self.department, self.nationality)
+
+    def _subtype_values(self):
+        return (self.id,)
+
+    @classmethod
+    @lru_cache(maxsize=None)
+    def _subtype_sql(cls):
+        placeholders = ", ".join(["%s"] * len(cls._subtype_columns))
+        return f"INSERT INTO {cls._subtype_table} ({', '.join(cls._subtype_columns)}) VALUES ({placeholders});"
+
+    @classmethod
+    def save_many(cls, employees, batch_size=None):
+        """Save employees of mixed subtypes, one transaction per batch.
+
+        Each batch writes one multi-row INSERT into ``employee`` plus one per
+        subtype table present in the batch.
+        """
+        db = HospitalDatabase()
+        batch_size = db.batch_size(batch_size)
+        count = 0
+        try:
+            for batch in _chunks(employees, batch_size):
+                subtypes = {}
+                for employee in batch:
+                    if employee._subtype_table:
+                        subtypes.setdefault(type(employee), []).append(employee._subtype_values())
+                with db.transaction():
+                    db.insert_many("employee", Employee._columns, [e._db_values() for e in batch], batch_size)
+                    for subtype, rows in subtypes.items():
+                        db.insert_many(subtype._subtype_table, subtype._subtype_columns, rows, batch_size)
+                for employee in batch:
+                    db.caches["employee"].invalidate(employee.id)
+                count += len(batch)
+            logger.info("✅ %d employees saved to database.", count, extra={"event": "employees_saved", "count": count})
+            return count
+        except db.errors as err:
+            logger.error("❌ Database Error: %s", err, extra={"event": "employees_save_failed", "count": count})
+
+    # One LEFT JOIN across the subtype tables tells each row's subclass.
+    _load_sql = """
+    SELECT e.id, e.name, e.birth_year, e.gender, e.phone_number, e.salary, e.department, e.nationality,
+           d.specialization, n.specialty, m.id, de.id
+    FROM employee e
+    LEFT JOIN doctor d ON d.id = e.id
+    LEFT JOIN nurse n ON n.id = e.id
+    LEFT JOIN manager m ON m.id = e.id
+    LEFT JOIN data_entry de ON de.id = e.id
+    """
+
+    @classmethod
+    def load_all(cls, chunk_size=None):
+        """Yield every employee as its Doctor/Nurse/Manager/DataEntry subclass.
+
+        Rows stream through a server-side cursor, so memory stays flat
+        regardless of staff size. Employees without a subtype row are skipped.
+        """
+        db = HospitalDatabase()
+        from_row = Employee.from_row
+        for row in db.stream(cls._load_sql + " ORDER BY e.id;", chunk_size=chunk_size):
+            employee = from_row(row)
+            if employee is not None:
+                yield employee
+
+    @classmethod
+    def load_by_ids(cls, ids, batch_size=None):
+        """Yield the employees with the given ids in id order.
+
+        Lookups read through the employee cache; the misses of each batch of
+        ids are fetched with one query.
+        """
+        db = HospitalDatabase()
+
+        def fetch(missing):
+            placeholders = ", ".join(["%s"] * len(missing))
+            rows = db.stream(cls._load_sql + f" WHERE e.id IN ({placeholders});", missing)
+            return (employee for employee in map(Employee.from_row, rows) if employee is not None)
+
+        for batch in _chunks(ids, db.batch_size(batch_size)):
+            found = _read_through(db, db.caches["employee"], batch, fetch)
+            for employee_id in sorted(found):
+                yield found[employee_id]
+
+    @classmethod
+    def load(cls, employee_id):
+        """Return the employee with ``employee_id`` or None, read through the cache."""
+        return next(cls.load_by_ids([employee_id]), None)
+
+    @classmethod
+    def from_row(cls, row):
+        """Build the right subclass from a trusted row of ``_load_sql``.
+
+        Returns None for employees without a subtype row.
+        """
+        specialization, specialty, manager_id, data_entry_id = row[8:]
+        if specialization is not None:
+            employee = Doctor.__new__(Doctor)
+            employee.specialization = SPECIALIZATIONS.intern(specialization)
+        elif specialty is not None:
+            employee = Nurse.__new__(Nurse)
+            employee.specialty = SPECIALTIES.intern(specialty)
+        elif manager_id is not None:
+            employee = Manager.__new__(Manager)
+        elif data_entry_id is not None:
+            employee = DataEntry.__new__(DataEntry)
+        else:
+            return None
+        (employee.id, employee.name, employee.birth_year, gender, employee.phone_number,
+         salary, department, nationality) = row[:8]
+        employee.gender = GENDERS.intern(gender)
+        employee.department = DEPARTMENTS.intern(department)
+        employee.nationality = NATIONALITIES.intern(nationality)
+        employee.salary = salary if isinstance(salary, (int, float)) else float(salary)  # DECIMAL comes back as Decimal
+        return employee
 
 # Doctor class
 class Doctor(Employee):
+    __slots__ = ("specialization",)
+
     def __init__(self, id, name, birth_year, gender, phone_number, nationality, salary, department, specialization):
         """Initialize Doctor with required fields."""
         if not all([id, name, birth_year, gender, phone_number, nationality, salary, department, specialization]):
@@ -71,7 +249,13 @@ class Doctor(Employee):
             raise ValueError("❌ Salary must be a positive number.")
 
         super().__init__(id, name, birth_year, gender, phone_number, nationality, salary, department)
-        self.specialization = specialization
+        self.specialization = SPECIALIZATIONS.intern(specialization)
+
+    _subtype_table = "doctor"
+    _subtype_columns = ("id", "specialization")
+
+    def _subtype_values(self):
+        return (self.id, self.specialization)
     
     def diagnose_patient(self):
         print(f"👨‍⚕️ {self.name} is diagnosing a patient.")
@@ -95,6 +279,8 @@ class Doctor(Employee):
 
 # Patient class
 class Patient(Person):
+    __slots__ = ("medical_history", "prescriptions")
+
     def __init__(self, id, name, birth_year, gender, phone_number, nationality, medical_history):
         if not all([id, name, birth_year, gender, phone_number, nationality, medical_history]):
             raise ValueError("All fields are required and cannot be None or empty.")
@@ -104,7 +290,7 @@ class Patient(Person):
 
         super().__init__(id, name, birth_year, gender, phone_number, nationality)
         self.medical_history = medical_history
-        self.prescriptions = []  # Initialize an empty list of prescriptions
+        self.prescriptions = PrescriptionCollection()  # Initialize an empty list of prescriptions
 
     def add_prescription(self, prescription):
         if prescription in self.prescriptions:
@@ -117,20 +303,196 @@ class Patient(Person):
         print(f"Medical History: {', '.join(self.medical_history)}")
 
     def save_to_db(self):
+        """Save the patient row and its medical history links in one transaction."""
         db = HospitalDatabase()
         try:
             sql = """
-            INSERT INTO patient (id, name, birth_year, gender, phone_number, nationality, medical_history)
-            VALUES (%s, %s, %s, %s, %s, %s, %s);
+            INSERT INTO patient (id, name, birth_year, gender, phone_number, nationality)
+            VALUES (%s, %s, %s, %s, %s, %s);
             """
-            values = (self.id, self.name, self.birth_year, self.gender, self.phone_number, self.nationality, ", ".join(self.medical_history))
-            db.cursor.execute(sql, values)
-            db.conn.commit()
-            print(f"✅ Patient {self.name} saved to database.")
-        except mysql.connector.Error as err:
-            print(f"❌ Database Error: {err}")
+            [conditions] = Patient._condition_rows(db, [(self.id, self.medical_history)])
+            with db.transaction():
+                db.execute(sql, self._db_values(), prepared=True)
+                if conditions:  # legacy patients migrated with a NULL history have none
+                    db.execute(Patient._condition_sql(len(conditions)), [value for row in conditions for value in row], prepared=True)
+            db.caches["patient"].invalidate(self.id)
+            logger.info("✅ Patient %s saved to database.", self.name, extra={"event": "patient_saved", "patient_id": self.id})
+        except db.errors as err:
+            logger.error("❌ Database Error: %s", err, extra={"event": "patient_save_failed", "patient_id": self.id})
+
+    def delete_from_db(self):
+        """Delete the patient (prescriptions cascade) and drop it from the cache."""
+        db = HospitalDatabase()
+        try:
+            db.execute("DELETE FROM patient WHERE id = %s;", (self.id,))
+            db.caches["patient"].invalidate(self.id)
+            logger.info("🗑️ Patient %s deleted from database.", self.name, extra={"event": "patient_deleted", "patient_id": self.id})
+        except db.errors as err:
+            logger.error("❌ Database Error: %s", err, extra={"event": "patient_delete_failed", "patient_id": self.id})
+
+    @classmethod
+    def load_by_ids(cls, ids, batch_size=None):
+        """Yield the patients with the given ids in id order, read through the cache."""
+        db = HospitalDatabase()
+
+        def fetch(missing):
+            placeholders = ", ".join(["%s"] * len(missing))
+            sql = f"SELECT {', '.join(Patient._columns)} FROM patient WHERE id IN ({placeholders});"
+            patients = {patient.id: patient for patient in map(Patient.from_row, db.stream(sql, missing))}
+            Patient._load_histories(db, patients)
+            return patients.values()
+
+        for batch in _chunks(ids, db.batch_size(batch_size)):
+            found = _read_through(db, db.caches["patient"], batch, fetch)
+            for patient_id in sorted(found):
+                yield found[patient_id]
+
+    @classmethod
+    def load(cls, patient_id):
+        """Return the patient with ``patient_id`` or None, read through the cache."""
+        return next(cls.load_by_ids([patient_id]), None)
+
+    _columns = ("id", "name", "birth_year", "gender", "phone_number", "nationality")
+    _condition_columns = ("patient_id", "condition_id", "position")
+
+    def _db_values(self):
+        return (self.id, self.name, self.birth_year, self.gender, self.phone_number, self.nationality)
+
+    @classmethod
+    def from_row(cls, row, medical_history=None):
+        """Build from a trusted ``patient`` row (columns in ``_columns`` order).
+
+        The history lives in ``patient_condition``; loaders fill it in.
+        """
+        patient = cls.__new__(cls)
+        patient.id, patient.name, patient.birth_year, gender, patient.phone_number, nationality = row
+        patient.gender = GENDERS.intern(gender)
+        patient.nationality = NATIONALITIES.intern(nationality)
+        patient.medical_history = list(medical_history) if medical_history else []
+        patient.prescriptions = PrescriptionCollection()
+        return patient
+
+    @staticmethod
+    @lru_cache(maxsize=32)
+    def _condition_sql(rows):
+        """Multi-row ``patient_condition`` INSERT; one prepared statement per history length."""
+        values = ", ".join(["(%s, %s, %s)"] * rows)
+        return f"INSERT INTO patient_condition ({', '.join(Patient._condition_columns)}) VALUES {values};"
+
+    @staticmethod
+    def _condition_rows(db, histories):
+        """``patient_condition`` rows of each (patient_id, condition names) pair, in history order.
+
+        Call outside the transaction that writes them: names seen for the
+        first time are added to ``medical_condition`` first.
+        """
+        histories = list(histories)
+        ids = _condition_ids(db, [name for _, names in histories for name in names])
+        result = []
+        for patient_id, names in histories:
+            condition_ids = dict.fromkeys(map(ids.__getitem__, names))  # first mention wins
+            result.append(list(zip(repeat(patient_id), condition_ids, count())))
+        return result
+
+    @staticmethod
+    def _load_histories(db, patients):
+        """Fill in ``medical_history`` of ``patients`` ({id: patient}) with one query over the link table's primary key."""
+        if not patients:
+            return
+        placeholders = ", ".join(["%s"] * len(patients))
+        sql = f"""
+        SELECT pc.patient_id, c.name FROM patient_condition pc
+        JOIN medical_condition c ON c.id = pc.condition_id
+        WHERE pc.patient_id IN ({placeholders}) ORDER BY pc.patient_id, pc.position;
+        """
+        for patient_id, name in db.stream(sql, list(patients)):
+            patients[patient_id].medical_history.append(name)
+
+    @classmethod
+    def ids_with_conditions(cls, all_of=(), any_of=()):
+        """Ids of patients with every condition in ``all_of`` and at least one in ``any_of``, ascending.
+
+        Names resolve through the unique index on ``medical_condition.name``
+        and patients through ``idx_patient_condition_condition``; no patient
+        row is read.
+        """
+        if not all_of and not any_of:
+            raise ValueError("At least one condition is required.")
+
+        db = HospitalDatabase()
+        known = _lookup_conditions(db, list(dict.fromkeys([*all_of, *any_of])))
+        if any(name not in known for name in all_of):
+            return []
+        all_ids = sorted({known[name] for name in all_of})
+        any_ids = sorted({known[name] for name in any_of if name in known})
+        if any_of and not any_ids:
+            return []
+
+        if all_ids:
+            sql = f"SELECT patient_id FROM patient_condition WHERE condition_id IN ({', '.join(['%s'] * len(all_ids))})"
+            params = all_ids
+            if any_ids:
+                sql += f" AND patient_id IN (SELECT patient_id FROM patient_condition WHERE condition_id IN ({', '.join(['%s'] * len(any_ids))}))"
+                params = params + any_ids
+            sql += " GROUP BY patient_id HAVING COUNT(*) = %s ORDER BY patient_id;"
+            params = params + [len(all_ids)]
+        else:
+            sql = f"SELECT DISTINCT patient_id FROM patient_condition WHERE condition_id IN ({', '.join(['%s'] * len(any_ids))}) ORDER BY patient_id;"
+            params = any_ids
+        return [row[0] for row in db.query(sql, params)]
+
+    def load_prescriptions(self, since=None, limit=50, after=None):
+        """Return one page of this patient's prescriptions, newest first.
+
+        Pages are keyset-paginated over ``idx_prescription_patient_issued``:
+        pass ``after=(p.date_issued, p.id)`` of the last prescription of a page
+        to fetch the next one, so every page is an index range scan no matter
+        how deep it is. ``since`` drops prescriptions issued before it.
+        """
+        if not isinstance(limit, int) or limit <= 0:
+            raise ValueError("Limit must be a positive integer.")
+
+        sql = "SELECT id, doctor_id, patient_id, medication, date_issued FROM prescription WHERE patient_id = %s"
+        params = [self.id]
+        if since is not None:
+            sql += " AND date_issued >= %s"
+            params.append(since)
+        if after is not None:
+            issued, prescription_id = after
+            # The bare range on date_issued lets the engine seek into the index.
+            sql += " AND date_issued <= %s AND (date_issued < %s OR id < %s)"
+            params += [issued, issued, prescription_id]
+        sql += " ORDER BY date_issued DESC, id DESC LIMIT %s;"
+        params.append(limit)
+
+        rows = HospitalDatabase().query(sql, params)
+        doctors = {doctor.id: doctor for doctor in Employee.load_by_ids(sorted({row[1] for row in rows}))}
+        return Prescription.from_rows(rows, doctors, {self.id: self})
+
+    @classmethod
+    def save_many(cls, patients, batch_size=None):
+        """Save patients and their history links with multi-row INSERTs, one transaction per batch."""
+        db = HospitalDatabase()
+        batch_size = db.batch_size(batch_size)
+        cache = db.caches["patient"]
+        count = 0
+        try:
+            for batch in _chunks(patients, batch_size):
+                conditions = Patient._condition_rows(db, [(patient.id, patient.medical_history) for patient in batch])
+                with db.transaction():
+                    db.insert_many("patient", Patient._columns, [patient._db_values() for patient in batch], batch_size)
+                    db.insert_many("patient_condition", Patient._condition_columns, chain.from_iterable(conditions), batch_size)
+                for patient in batch:
+                    cache.invalidate(patient.id)
+                count += len(batch)
+            logger.info("✅ %d patients saved to database.", count, extra={"event": "patients_saved", "count": count})
+            return count
+        except db.errors as err:
+            logger.error("❌ Database Error: %s", err, extra={"event": "patients_save_failed"})
 
 class DataEntry(Employee):
+    __slots__ = ()
+
     def __init__(self, id, name, birth_year, gender, phone_number, salary, department, nationality):
         if not all([id, name, birth_year, gender, phone_number, salary, department, nationality]):
             raise ValueError("All fields are required and cannot be None or empty.")
@@ -140,6 +502,8 @@ class DataEntry(Employee):
 
         super().__init__(id, name, birth_year, gender, phone_number, nationality, salary, department)
 
+    _subtype_table = "data_entry"
+
     def add_record(self, person):
         print(f"Record added for: {person.name}")
 
@@ -159,23 +523,33 @@ class DataEntry(Employee):
         raise TypeError("Invalid prescription ID. Must be a positive integer.")
 
      db = HospitalDatabase()
+     values = (prescription_id, self.id, datetime.now())
+     if db.audit is not None:
+        # Write-behind: spooled now, inserted in the next batch.
+        db.audit.submit(values)
+        logger.info("✅ Prescription %d queued as printed by Data Entry ID %s", prescription_id, self.id,
+                    extra={"event": "prescription_print_queued", "prescription_id": prescription_id, "data_entry_id": self.id})
+        return
      try:
         sql = """
         INSERT INTO printed_prescriptions (prescription_id, data_entry_id, printed_at)
         VALUES (%s, %s, %s);
         """
-        values = (prescription_id, self.id, datetime.now())
-        db.cursor.execute(sql, values)
-        db.conn.commit()
-        print(f"✅ Prescription {prescription_id} logged as printed by Data Entry ID {self.id}")
-     except mysql.connector.Error as err:
-        print(f"❌ Database Error: {err}")
+        db.execute(sql, values, prepared=True)
+        logger.info("✅ Prescription %d logged as printed by Data Entry ID %s", prescription_id, self.id,
+                    extra={"event": "prescription_printed", "prescription_id": prescription_id, "data_entry_id": self.id})
+     except db.errors as err:
+        logger.error("❌ Database Error: %s", err, extra={"event": "prescription_print_failed", "prescription_id": prescription_id})
 
 # Manager class
 class Manager(Employee):
+    __slots__ = ()
+
     def __init__(self, id, name, birth_year, gender, phone_number, salary, department, nationality):
         super().__init__(id, name, birth_year, gender, phone_number, nationality, salary, department)
 
+    _subtype_table = "manager"
+
     def perform_duties(self):
         print(f"{self.name} is managing the hospital.")
 
@@ -183,9 +557,17 @@ class Manager(Employee):
         super().display_info()
 
 class Nurse(Employee):
+    __slots__ = ("specialty",)
+
     def __init__(self, id, name, birth_year, gender, phone_number, salary, department, nationality, specialty):
         super().__init__(id, name, birth_year, gender, phone_number, nationality, salary, department)
-        self.specialty = specialty
+        self.specialty = SPECIALTIES.intern(specialty)
+
+    _subtype_table = "nurse"
+    _subtype_columns = ("id", "specialty")
+
+    def _subtype_values(self):
+        return (self.id, self.specialty)
 
     def assist_doctor(self, doctor):
         print(f"{self.name} is assisting {doctor.name} in a procedure.")
@@ -201,6 +583,8 @@ class Nurse(Employee):
         print(f"Specialty: {self.specialty}")
 
 class Prescription:
+    __slots__ = ("doctor", "patient", "medication", "date_issued", "id")
+
     def __init__(self, doctor, patient, medication):
         if not all([doctor, patient, medication]):
             raise ValueError("Doctor, Patient, and Medication are required and cannot be None or empty.")
@@ -216,10 +600,23 @@ class Prescription:
 
         self.doctor = doctor
         self.patient = patient
-        self.medication = medication
+        self.medication = MEDICATIONS.intern(medication)
         self.date_issued = datetime.now()
         self.id = None  # Initialize id as None
 
+    @property
+    def key(self):
+        """Identity of an order within one patient's prescriptions: the same doctor, medication and issue day."""
+        return (self.doctor.id, self.medication, self.date_issued.date())
+
+    def __eq__(self, other):
+        if not isinstance(other, Prescription):
+            return NotImplemented
+        return self.patient.id == other.patient.id and self.key == other.key
+
+    def __hash__(self):
+        return hash((self.patient.id, self.key))
+
     def display_prescription(self):
         print(f"Prescription Details:\nDoctor: {self.doctor.name}\nPatient: {self.patient.name}\nMedication: {self.medication}\nDate Issued: {self.date_issued}")
 
@@ -230,21 +627,160 @@ class Prescription:
             INSERT INTO prescription (doctor_id, patient_id, medication, date_issued)
             VALUES (%s, %s, %s, %s);
             """
-            values = (self.doctor.id, self.patient.id, self.medication, self.date_issued)
-            db.cursor.execute(sql, values)
-            db.conn.commit()
-
-            # ✅ Debug: Print last inserted row ID
-            print(f"🔍 lastrowid: {db.cursor.lastrowid}")
+            lastrowid = db.execute(sql, self._db_values(), prepared=True)
+            logger.debug("🔍 lastrowid: %s", lastrowid)
 
-            self.id = db.cursor.lastrowid  # Assigning last inserted ID
+            self.id = lastrowid  # Assigning last inserted ID
 
             if self.id is None:
                 raise ValueError("❌ Prescription ID was not assigned after saving.")
 
-            print(f"✅ Prescription for {self.medication} saved with ID {self.id}.")
-        except mysql.connector.Error as err:
-            print(f"❌ Database Error: {err}")
+            logger.info("✅ Prescription for %s saved with ID %s.", self.medication, self.id,
+                        extra={"event": "prescription_saved", "prescription_id": self.id, "patient_id": self.patient.id})
+        except db.errors as err:
+            logger.error("❌ Database Error: %s", err, extra={"event": "prescription_save_failed", "patient_id": self.patient.id})
+
+    _columns = ("doctor_id", "patient_id", "medication", "date_issued")
+
+    def _db_values(self):
+        return (self.doctor.id, self.patient.id, self.medication, self.date_issued)
+
+    @classmethod
+    def from_row(cls, row, doctor, patient):
+        """Build from a trusted (id, doctor_id, patient_id, medication, date_issued) row.
+
+        ``doctor`` and ``patient`` are the already-loaded entities the row refers to.
+        """
+        prescription = cls.__new__(cls)
+        prescription.id, _, _, medication, prescription.date_issued = row
+        prescription.medication = MEDICATIONS.intern(medication)
+        prescription.doctor = doctor
+        prescription.patient = patient
+        return prescription
+
+    @classmethod
+    def from_rows(cls, rows, doctors, patients):
+        """Build prescriptions from trusted rows, resolving ids through ``doctors``/``patients`` maps."""
+        return [cls.from_row(row, doctors[row[1]], patients[row[2]]) for row in rows]
+
+    @classmethod
+    def save_many(cls, prescriptions, batch_size=None):
+        """Save prescriptions in batches and assign each its auto-increment ID."""
+        prescriptions = list(prescriptions)
+        db = HospitalDatabase()
+        try:
+            ids = db.insert_many(
+                "prescription", Prescription._columns, [p._db_values() for p in prescriptions], batch_size, return_ids=True
+            )
+            for prescription, prescription_id in zip(prescriptions, ids):
+                prescription.id = prescription_id
+            logger.info("✅ %d prescriptions saved to database.", len(ids), extra={"event": "prescriptions_saved", "count": len(ids)})
+            return len(ids)
+        except db.errors as err:
+            logger.error("❌ Database Error: %s", err, extra={"event": "prescriptions_save_failed"})
+
+class PrescriptionCollection(MutableSequence):
+    """List of a patient's prescriptions indexed by ``Prescription.key``.
+
+    Membership tests and duplicate detection are O(1) dict lookups, with
+    secondary indexes by medication and by doctor id. It behaves like the
+    plain list it replaces; adding a duplicate raises ValueError.
+    """
+
+    __slots__ = ("_items", "_by_key", "_by_medication", "_by_doctor")
+
+    def __init__(self, prescriptions=()):
+        self._items = []
+        self._by_key = {}
+        self._by_medication = {}
+        self._by_doctor = {}
+        for prescription in prescriptions:
+            self.append(prescription)
+
+    def _replace(self, prescriptions):
+        """Swap in ``prescriptions`` once all are indexed; a bad or duplicate item changes nothing."""
+        staged = PrescriptionCollection(prescriptions)
+        self._items, self._by_key = staged._items, staged._by_key
+        self._by_medication, self._by_doctor = staged._by_medication, staged._by_doctor
+
+    def _index(self, prescription):
+        if not isinstance(prescription, Prescription):
+            raise TypeError("Only Prescription objects can be added.")
+        key = prescription.key
+        if key in self._by_key:
+            raise ValueError(f"Duplicate prescription for {prescription.medication}.")
+        self._by_key[key] = prescription
+        self._by_medication.setdefault(prescription.medication, []).append(prescription)
+        self._by_doctor.setdefault(prescription.doctor.id, []).append(prescription)
+
+    def _unindex(self, prescription):
+        del self._by_key[prescription.key]
+        for index, value in ((self._by_medication, prescription.medication), (self._by_doctor, prescription.doctor.id)):
+            bucket = index[value]
+            bucket.remove(prescription)
+            if not bucket:
+                del index[value]
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __setitem__(self, index, prescription):
+        if isinstance(index, slice):
+            items = list(self._items)
+            items[index] = prescription
+            self._replace(items)
+            return
+        old = self._items[index]
+        self._unindex(old)
+        try:
+            self._index(prescription)
+        except (TypeError, ValueError):
+            self._index(old)
+            raise
+        self._items[index] = prescription
+
+    def __delitem__(self, index):
+        if isinstance(index, slice):
+            items = list(self._items)
+            del items[index]
+            self._replace(items)
+            return
+        self._unindex(self._items[index])
+        del self._items[index]
+
+    def __len__(self):
+        return len(self._items)
+
+    def __contains__(self, prescription):
+        return isinstance(prescription, Prescription) and self._by_key.get(prescription.key) == prescription
+
+    def __eq__(self, other):
+        if isinstance(other, (PrescriptionCollection, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self):
+        return f"PrescriptionCollection({self._items!r})"
+
+    def insert(self, index, prescription):
+        self._index(prescription)
+        self._items.insert(index, prescription)
+
+    def reverse(self):
+        self._items.reverse()
+
+    def sort(self, *, key=None, reverse=False):
+        self._items.sort(key=key, reverse=reverse)
+
+    def get(self, doctor_id, medication, issued_on):
+        """Prescription with the given key, or None."""
+        return self._by_key.get((doctor_id, medication, issued_on))
+
+    def by_medication(self, medication):
+        return list(self._by_medication.get(medication, ()))
+
+    def by_doctor(self, doctor_id):
+        return list(self._by_doctor.get(doctor_id, ()))
 
 class PrescriptionFactory:
     @staticmethod
@@ -255,282 +791,587 @@ class PrescriptionFactory:
             raise TypeError("Patient must be an instance of Patient class.")
         return Prescription(doctor, patient, medication)
 
-import mysql.connector
-
 class HospitalDatabase:
     _instance = None
+    _lock = threading.Lock()
+
+    # Connection settings; environment variables match the Docker image.
+    config = {
+        "backend": os.environ.get("DB_BACKEND", "mysql"),  # "mysql" or embedded "sqlite"
+        "sqlite_path": os.environ.get("DB_PATH", "hospital.db"),
+        "host": os.environ.get("DB_HOST", "mysql"),  # Use the Docker service name 'mysql'
+        "user": os.environ.get("DB_USER", "root"),
+        "password": os.environ.get("DB_PASSWORD", "12345"),
+        "database": os.environ.get("DB_NAME", "hospitalll_db"),
+        "pool_min_size": int(os.environ.get("DB_POOL_MIN", "1")),
+        "pool_max_size": int(os.environ.get("DB_POOL_MAX", "10")),
+        "pool_timeout": float(os.environ.get("DB_POOL_TIMEOUT", "30")),
+        "batch_size": int(os.environ.get("DB_BATCH_SIZE", "1000")),
+        "fetch_size": int(os.environ.get("DB_FETCH_SIZE", "1000")),
+        "cache_size": int(os.environ.get("DB_CACHE_SIZE", "10000")),  # entities per type, 0 disables
+        "cache_ttl": float(os.environ.get("DB_CACHE_TTL", "300")),  # seconds, 0 never expires
+        "group_commit_window": float(os.environ.get("DB_GROUP_COMMIT_WINDOW", "0")),  # seconds, 0 disables
+        "local_infile": os.environ.get("DB_LOCAL_INFILE", "0") == "1",  # allow LOAD DATA LOCAL INFILE imports
+        "instrument": os.environ.get("DB_INSTRUMENT", "1") == "1",  # per-statement latency stats
+        "prepared_cache_size": int(os.environ.get("DB_PREPARED_CACHE", "64")),  # statements per connection, 0 disables
+        "audit_spool": os.environ.get("DB_AUDIT_SPOOL", ""),  # spool file enabling write-behind print logging
+        "audit_flush_interval": float(os.environ.get("DB_AUDIT_FLUSH_SECONDS", "0.5")),
+        "slow_query_threshold": float(os.environ.get("DB_SLOW_QUERY_SECONDS", "0.5")),
+        "slow_query_log": os.environ.get("DB_SLOW_QUERY_LOG", ""),  # file path, empty keeps them in memory only
+    }
 
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(HospitalDatabase, cls).__new__(cls)
-            cls._instance._connect()
+            with cls._lock:
+                if cls._instance is None:
+                    instance = super(HospitalDatabase, cls).__new__(cls)
+                    instance._connect()
+                    cls._instance = instance
         return cls._instance
 
+    @classmethod
+    def configure(cls, **options):
+        """Update connection settings; the next HospitalDatabase() uses them."""
+        unknown = set(options) - set(cls.config)
+        if unknown:
+            raise ValueError(f"Unknown database settings: {', '.join(sorted(unknown))}")
+
+        with cls._lock:
+            instance, cls._instance = cls._instance, None
+            cls.config = {**cls.config, **options}
+        if instance is not None:
+            instance.close_connection()
+
     def _connect(self):
-        try:
-            self.conn = mysql.connector.connect(
-                host="mysql",  # Use the Docker service name 'mysql'
-                user="root",
-                password="12345",
-                database="hospitalll_db"
+        """Set up the instance without touching the server.
+
+        The backend (and its driver) is created on first use and the pool's
+        first connections are opened by the first query, so code that never
+        reaches the database never waits on it.
+        """
+        self._local = threading.local()
+        self._backend = None
+        self._opened = False
+        self._open_lock = threading.RLock()
+        self._pool = ConnectionPool(
+            self._open_connection,
+            min_size=self.config["pool_min_size"],
+            max_size=self.config["pool_max_size"],
+            timeout=self.config["pool_timeout"],
+            validate=self._is_alive,
+        )
+        ttl = self.config["cache_ttl"] or None
+        self.caches = {
+            "patient": EntityCache(self.config["cache_size"], ttl),
+            "employee": EntityCache(self.config["cache_size"], ttl),
+        }
+        self.condition_ids = {}  # medical_condition name -> id; the dictionary only grows
+        self._prepared = weakref.WeakKeyDictionary()  # connection -> (session id, {sql: (sql, cursor)})
+        self._prepared_lock = threading.Lock()
+        self.stats = None
+        if self.config["instrument"]:
+            from query_stats import QueryStats
+            self.stats = QueryStats(self.config["slow_query_threshold"], self.config["slow_query_log"] or None)
+        self.group_commit = None
+        if self.config["group_commit_window"] > 0:
+            from group_commit import GroupCommitter
+            self.group_commit = GroupCommitter(self._pool, self.config["group_commit_window"])
+        self.audit = None
+        if self.config["audit_spool"]:
+            from write_behind import WriteBehindWriter
+            self.audit = WriteBehindWriter(
+                self,
+                "printed_prescriptions",
+                ("prescription_id", "data_entry_id", "printed_at"),
+                self.config["audit_spool"],
+                batch_size=self.config["batch_size"],
+                flush_interval=self.config["audit_flush_interval"],
             )
-            self.cursor = self.conn.cursor()  # Ensure cursor is initialized after connection
-            print("✅ Database connection established.")
-        except mysql.connector.Error as e:
-            print(f"❌ Database connection failed: {e}")
-            self.cursor = None  # Set cursor to None in case of failure
 
-    def close_connection(self):
-        if self.cursor:
-            self.cursor.close()
-            print("🔒 Database cursor closed.")
-        if self.conn:
-            self.conn.close()
-            print("🔒 Database connection closed.")
+    @property
+    def backend(self):
+        """The storage backend, created (and its driver imported) on first use."""
+        backend = self._backend
+        if backend is None:
+            with self._open_lock:
+                if self._backend is None:
+                    from backends import create_backend
+                    self._backend = create_backend(self.config)
+                backend = self._backend
+        return backend
+
+    @property
+    def pool(self):
+        """The connection pool; the first access opens its first connections."""
+        if not self._opened:
+            self._open()
+        return self._pool
+
+    def _open(self):
+        with self._open_lock:
+            if self._opened or self._pool.closed:
+                return
+            self._opened = True
+            try:
+                self._pool.fill()
+                logger.info("✅ Database connection established.", extra={"event": "db_connected", "backend": self.backend.name})
+            except self.errors as e:
+                logger.error("❌ Database connection failed: %s", e, extra={"event": "db_connect_failed", "backend": self.backend.name})
+
+    def _open_connection(self):
+        return self.backend.connect()
+
+    def _is_alive(self, conn):
+        return self.backend.is_alive(conn)
+
+    def cache_stats(self):
+        """Hit/miss/eviction counters of each entity cache."""
+        return {name: cache.stats() for name, cache in self.caches.items()}
+
+    def statement_stats(self, limit=None):
+        """Per-statement latency summary, slowest total first; empty when instrumentation is off."""
+        return self.stats.summary(limit) if self.stats is not None else []
+
+    def _record(self, sql, started, rows=0, failed=False):
+        if self.stats is not None:
+            self.stats.record(sql, time.perf_counter() - started, rows, failed)
+
+    @property
+    def errors(self):
+        """Driver exception type(s) to catch around database calls."""
+        return self.backend.errors
+
+    @property
+    def conn(self):
+        """Connection pinned to the calling thread for legacy callers.
+
+        It goes back to the pool, rolled back, on ``close_connection()`` or
+        when the thread exits.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = self.pool.acquire()
+            self._local.conn, self._local.pin = conn, _Pin(self, conn)
+        return conn
+
+    @property
+    def cursor(self):
+        """Cursor on the calling thread's pinned connection."""
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is None:
+            cursor = self._local.cursor = self.conn.cursor()
+        return cursor
+
+    @contextmanager
+    def connection(self):
+        """Check a pooled connection out for the duration of the block.
+
+        Inside ``transaction()`` the thread's transaction connection is used.
+        """
+        conn = getattr(self._local, "tx_conn", None)
+        if conn is not None:
+            yield conn
+            return
+
+        conn = self.pool.acquire()
+        try:
+            yield conn
+        finally:
+            self._check_in(conn)
+
+    def _check_in(self, conn):
+        """Roll back whatever ``conn`` left open (a failed write, a read's snapshot) and pool it."""
+        try:
+            self.backend.reset(conn)
+        except Exception:
+            self._pool.release(conn, discard=True)
         else:
-            print("❌ No connection to close.")
+            self._pool.release(conn)
 
-    def execute_query(self, query):
-        if self.cursor:
+    @contextmanager
+    def transaction(self):
+        """Commit every statement in the block once, at exit.
+
+        Per-object commits inside the block are suppressed. Nested blocks run
+        as savepoints, so an exception only undoes the innermost block. With
+        group commit enabled the block runs as a savepoint on the shared
+        connection and its commit is coalesced with other writers'.
+        """
+        local = self._local
+        conn = getattr(local, "tx_conn", None)
+        if conn is not None:
+            local.tx_depth += 1
             try:
-                self.cursor.execute(query)
-                self.conn.commit()
-            except mysql.connector.Error as e:
-                print(f"❌ Query execution failed: {e}")
+                with self._savepoint(conn, f"sp_{local.tx_depth}"):
+                    yield self
+            finally:
+                local.tx_depth -= 1
+            return
+
+        if self.group_commit is not None:
+            with self.group_commit.hold() as conn:
+                if self.backend.begin_sql and not conn.in_transaction:
+                    self._run(conn, self.backend.begin_sql)
+                local.tx_conn, local.tx_depth = conn, 0
+                try:
+                    with self._savepoint(conn, "sp_0"):
+                        yield self
+                finally:
+                    local.tx_conn = None
+            return
+
+        conn = self.pool.acquire()
+        local.tx_conn, local.tx_depth = conn, 0
+        broken = False
+        try:
+            if self.backend.begin_sql:
+                self._run(conn, self.backend.begin_sql)
+            yield self
+            conn.commit()
+        except BaseException:
+            try:
+                conn.rollback()
+            except Exception:
+                broken = True
+            raise
+        finally:
+            local.tx_conn = None
+            self.pool.release(conn, discard=broken)
+
+    @contextmanager
+    def _savepoint(self, conn, name):
+        self._run(conn, f"SAVEPOINT {name};")
+        try:
+            yield
+        except BaseException:
+            self._run(conn, f"ROLLBACK TO SAVEPOINT {name};")
+            raise
+        finally:
+            self._run(conn, f"RELEASE SAVEPOINT {name};")
+
+    def in_transaction(self):
+        return getattr(self._local, "tx_conn", None) is not None
+
+    def _commit(self, conn):
+        if conn is not getattr(self._local, "tx_conn", None):
+            conn.commit()
+
+    def _prepared_statement(self, conn, sql):
+        """The cached ``(sql, cursor)`` with ``sql`` prepared on ``conn``.
+
+        The driver only skips re-preparing when it is handed the very string
+        it prepared, so the cached string is returned for execution. Cursors
+        are dropped when the connection's server session changes (reconnect)
+        and least recently used ones beyond ``prepared_cache_size`` are closed.
+        """
+        session = self.backend.session_id(conn)
+        with self._prepared_lock:
+            entry = self._prepared.get(conn)
+            if entry is None or entry[0] != session:
+                if entry is not None:
+                    _close_cursors(entry[1].values())
+                entry = self._prepared[conn] = (session, OrderedDict())
+        statements = entry[1]
+        statement = statements.get(sql)
+        if statement is not None:
+            statements.move_to_end(sql)
+            return statement
+        statement = statements[sql] = (self.backend.sql(sql), self.backend.prepared_cursor(conn))
+        if len(statements) > self.config["prepared_cache_size"]:
+            _close_cursors([statements.popitem(last=False)[1]])
+        return statement
+
+    def _forget_prepared(self, conn, sql):
+        entry = self._prepared.get(conn)
+        statement = entry[1].pop(sql, None) if entry is not None else None
+        if statement is not None:
+            _close_cursors([statement])
+
+    def _run(self, conn, sql, params=None, prepared=False):
+        if prepared and self.backend.prepares_statements and self.config["prepared_cache_size"]:
+            statement, cursor = self._prepared_statement(conn, sql)
         else:
-            print("❌ No cursor available to execute query.")
+            statement, cursor, prepared = self.backend.sql(sql), conn.cursor(), False
+        started = time.perf_counter()
+        try:
+            cursor.execute(statement, params or ())
+            self._record(sql, started, max(cursor.rowcount, 0))
+            return cursor.lastrowid
+        except self.errors:
+            self._record(sql, started, failed=True)
+            if prepared:
+                self._forget_prepared(conn, sql)  # the next call prepares afresh
+            raise
+        finally:
+            if not prepared:
+                cursor.close()
+
+    def execute(self, sql, params=None, prepared=False):
+        """Run one statement, commit it (unless in a transaction), and return lastrowid.
+
+        ``prepared`` runs it through this connection's cache of server-side
+        prepared statements; use it for fixed statements run many times.
+        """
+        if self.group_commit is not None and not self.in_transaction():
+            return self.group_commit.run(lambda conn: self._run(conn, sql, params, prepared))
+        with self.connection() as conn:
+            lastrowid = self._run(conn, sql, params, prepared)
+            self._commit(conn)
+            return lastrowid
+
+    def query(self, sql, params=None):
+        """Run a SELECT on a pooled connection and return all rows."""
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            started = time.perf_counter()
+            try:
+                cursor.execute(self.backend.sql(sql), params or ())
+                rows = cursor.fetchall()
+                self._record(sql, started, len(rows))
+                return rows
+            except self.errors:
+                self._record(sql, started, failed=True)
+                raise
+            finally:
+                cursor.close()
+
+    def stream(self, sql, params=None, chunk_size=None, header=False):
+        """Yield the rows of a SELECT, fetching ``chunk_size`` rows at a time.
+
+        The result is read through an unbuffered (server-side) cursor, so only
+        one chunk is held in memory. The connection stays checked out until
+        the generator is exhausted or closed. With ``header`` the first item
+        is the tuple of column names.
+        """
+        chunk_size = chunk_size or self.config["fetch_size"]
+        with self.connection() as conn:
+            cursor = self.backend.stream_cursor(conn)
+            finished = False
+            started = time.perf_counter()  # recorded time includes the consumer's pauses
+            count = 0
+            try:
+                cursor.execute(self.backend.sql(sql), params or ())
+                if header:
+                    yield tuple(column[0] for column in cursor.description)
+                while True:
+                    rows = cursor.fetchmany(chunk_size)
+                    if not rows:
+                        break
+                    count += len(rows)
+                    yield from rows
+                finished = True
+            except self.errors:
+                self._record(sql, started, count, failed=True)
+                started = None
+                raise
+            finally:
+                if started is not None:
+                    self._record(sql, started, count)
+                try:
+                    cursor.close()
+                except self.errors:
+                    if finished:
+                        raise
+                    # Abandoned mid-result: the pool discards the connection.
+
+    def batch_size(self, batch_size=None):
+        """Validate ``batch_size``, defaulting to the configured size."""
+        if batch_size is None:
+            batch_size = self.config["batch_size"]
+        if not isinstance(batch_size, int) or batch_size <= 0:
+            raise ValueError("Batch size must be a positive integer.")
+        return batch_size
+
+    def insert_many(self, table, columns, rows, batch_size=None, return_ids=False):
+        """Insert ``rows`` with multi-row VALUES statements, committing once per batch.
+
+        Returns the number of rows written, or with ``return_ids`` the
+        auto-increment id of every row in input order.
+        """
+        batch_size = self.batch_size(batch_size)
+        prefix = f"INSERT INTO {table} ({', '.join(columns)}) VALUES "
+        placeholders = "(" + ", ".join(["%s"] * len(columns)) + ")"
+        ids = []
+        count = 0
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            try:
+                step = self.backend.auto_increment_step(cursor) if return_ids else 1
+                for batch in _chunks(rows, batch_size):
+                    sql = prefix + ", ".join([placeholders] * len(batch)) + ";"
+                    started = time.perf_counter()
+                    try:
+                        cursor.execute(self.backend.sql(sql), [value for row in batch for value in row])
+                        self._commit(conn)
+                    except self.errors:
+                        self._record(sql, started, failed=True)
+                        raise
+                    self._record(sql, started, len(batch))
+                    if return_ids:
+                        # Ids within one multi-row INSERT are consecutive (InnoDB's
+                        # auto-inc lock, SQLite's AUTOINCREMENT).
+                        first = self.backend.first_insert_id(cursor, len(batch))
+                        ids.extend(range(first, first + step * len(batch), step))
+                    count += len(batch)
+            finally:
+                cursor.close()
+        return ids if return_ids else count
+
+    def load_file(self, table, columns, path):
+        """Bulk-load a tab-separated file with the engine's native loader.
+
+        Commits unless called inside ``transaction()`` and returns the number
+        of rows loaded. Check ``backend.can_load_file()`` first.
+        """
+        with self.connection() as conn:
+            cursor = conn.cursor()
+            sql = f"LOAD DATA INTO {table} ({', '.join(columns)});"  # stats key, not executed
+            started = time.perf_counter()
+            try:
+                count = self.backend.load_file(cursor, table, columns, path)
+                self._commit(conn)
+                self._record(sql, started, count)
+                return count
+            except self.errors:
+                self._record(sql, started, failed=True)
+                raise
+            finally:
+                cursor.close()
 
-# Main Execution
-from datetime import date, datetime
-import mysql.connector
-
-# Ensure the HospitalDatabase and other classes are imported
-# (Assuming they are already defined in your code)
-
-def test_system():
-    # Initialize the database connection
-    db = HospitalDatabase()
-
-    try:
-        # Clear existing data for a clean test
-        db.cursor.execute("DELETE FROM printed_prescriptions;")
-        db.cursor.execute("DELETE FROM prescription;")
-        db.cursor.execute("DELETE FROM patient;")
-        db.cursor.execute("DELETE FROM doctor;")
-        db.cursor.execute("DELETE FROM employee;")
-        db.conn.commit()
-        print("✅ Cleared existing data for a clean test.")
-
-        # Step 1: Create and save a DataEntry employee
-        data_entry = DataEntry(
-            id=31, name="Masri", birth_year=1990, gender="Male",
-            phone_number="111223233", salary=3500, department="Records", nationality="saudi"
-        )
-        data_entry.save_to_db()
-        print("✅ DataEntry employee created and saved.")
+    def close_connection(self):
+        cursor = getattr(self._local, "cursor", None)
+        if cursor is not None:
+            cursor.close()
+            self._local.cursor = None
+            logger.debug("🔒 Database cursor closed.")
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.conn = None
+            self._local.pin.release()
+
+        if self._pool.closed:
+            logger.warning("❌ No connection to close.")
+            return
+        if self.audit is not None:
+            self.audit.close()
+        if self.group_commit is not None:
+            self.group_commit.close()
+        self._pool.close()
+        with HospitalDatabase._lock:
+            if HospitalDatabase._instance is self:
+                HospitalDatabase._instance = None
+        logger.info("🔒 Database connection closed.", extra={"event": "db_closed"})
 
-        # Step 2: Create and save a Patient
-        patient = Patient(
-            id=1, name="John Ahmed", birth_year=1985, gender="Male",
-            phone_number="123456789", nationality="American", medical_history=["Flu", "Allergies"]
-        )
-        patient.save_to_db()
-        print("✅ Patient created and saved.")
-
-        # Step 3: Create and save a Doctor
-        doctor = Doctor(
-            id=10, name="Dr. Sami", birth_year=1975, gender="Male",
-            phone_number="987654321", nationality="British", salary=8000,
-            department="Cardiology", specialization="Cardiologist"
-        )
-        doctor.save_to_db()
-        print("✅ Doctor created and saved.")
-
-        # Step 4: Insert the doctor into the `doctor` table
-        db.cursor.execute("INSERT INTO doctor (id, specialization) VALUES (%s, %s);", (doctor.id, doctor.specialization))
-        db.conn.commit()
-        print("✅ Doctor specialization saved to the `doctor` table.")
-
-        # Step 5: Write a prescription and save it
-        doctor.write_prescription(patient, "Paracetamol")
-        patient.prescriptions[0].save_to_db()
-        print("✅ Prescription created and saved.")
-
-        # Step 6: Log the prescription print event
-        prescription_id = patient.prescriptions[0].id  # Get the prescription ID
-        data_entry.print_prescription(prescription_id)
-        print("✅ Prescription print event logged.")
-
-        # Step 7: Fetch and display data from the database
-        print("\n📋 Fetching and displaying data from the database:")
-
-        # Fetch employees
-        db.cursor.execute("SELECT * FROM employee;")
-        employees = db.cursor.fetchall()
-        print("\nEmployees:")
-        for emp in employees:
-            print(emp)
-
-        # Fetch patients
-        db.cursor.execute("SELECT * FROM patient;")
-        patients = db.cursor.fetchall()
-        print("\nPatients:")
-        for pat in patients:
-            print(pat)
-
-        # Fetch prescriptions
-        db.cursor.execute("SELECT * FROM prescription;")
-        prescriptions = db.cursor.fetchall()
-        print("\nPrescriptions:")
-        for pres in prescriptions:
-            print(pres)
-
-        # Fetch printed prescriptions
-        db.cursor.execute("SELECT * FROM printed_prescriptions;")
-        printed_prescriptions = db.cursor.fetchall()
-        print("\nPrinted Prescriptions:")
-        for pp in printed_prescriptions:
-            print(pp)
-
-        # Step 8: Test error handling
-        print("\n🧪 Testing error handling:")
-
-        # Try to save a duplicate employee
+    def execute_query(self, query):
+        if self._pool.closed:
+            logger.warning("❌ No connection available to execute query.")
+            return
         try:
-            data_entry.save_to_db()
-        except mysql.connector.Error as err:
-            print(f"❌ Expected error when saving duplicate employee: {err}")
+            self.execute(query)
+        except self.errors as e:
+            logger.error("❌ Query execution failed: %s", e, extra={"event": "query_failed"})
 
-        # Try to write a prescription with invalid medication
-        try:
-            doctor.write_prescription(patient, "")
-        except ValueError as err:
-            print(f"❌ Expected error when writing prescription with invalid medication: {err}")
+class _Pin:
+    """Returns a thread's pinned connection to the pool once the thread's locals are cleared at exit."""
+
+    __slots__ = ("release", "__weakref__")
+
+    def __init__(self, db, conn):
+        self.release = weakref.finalize(self, db._check_in, conn)
+        self.release.atexit = False
+
+
+def _read_through(db, cache, ids, fetch):
+    """Return {id: entity} for ``ids``, loading the cache misses with one ``fetch(missing)`` call.
 
-        # Try to log a print event for a non-existent prescription
+    Inside a transaction the misses are read on its connection and may be
+    uncommitted, so they are returned but not cached.
+    """
+    found = {}
+    missing = []
+    for entity_id in ids:
+        entity = cache.get(entity_id)
+        if entity is None:
+            missing.append(entity_id)
+        else:
+            found[entity_id] = entity
+    if missing:
+        token = None if db.in_transaction() else cache.token()
+        for entity in fetch(missing):
+            if token is not None:
+                cache.put(entity.id, entity, token)
+            found[entity.id] = entity
+    return found
+
+def _condition_key(name):
+    """``name`` as the unique key on ``medical_condition.name`` compares it.
+
+    MySQL's default ``_ci`` collations ignore case and trailing spaces.
+    """
+    return name.rstrip(" ").casefold()
+
+def _lookup_conditions(db, names):
+    """{name: id} of the condition ``names`` already in the dictionary.
+
+    Cached ids are used first; MySQL's case-insensitive collation may answer
+    with a differently cased name, which is mapped back.
+    """
+    cache = db.condition_ids
+    ids = {name: cache[name] for name in names if name in cache}
+    for batch in _chunks([name for name in names if name not in ids], db.batch_size()):
+        placeholders = ", ".join(["%s"] * len(batch))
+        rows = db.query(f"SELECT name, id FROM medical_condition WHERE name IN ({placeholders});", batch)
+        exact = dict(rows)
+        folded = {_condition_key(name): condition_id for name, condition_id in rows}
+        for name in batch:
+            condition_id = exact.get(name, folded.get(_condition_key(name)))
+            if condition_id is not None:
+                ids[name] = condition_id
+    if not db.in_transaction():
+        cache.update(ids)
+    return ids
+
+def _condition_ids(db, names):
+    """{name: id} for condition ``names``, adding the ones seen for the first time.
+
+    Outside a transaction new names are committed at once and their ids
+    cached; inside one they share its fate, so nothing is cached.
+    """
+    names = list(dict.fromkeys(names))
+    ids = _lookup_conditions(db, names)
+    new = [name for name in names if name not in ids]
+    if new:
+        # Spellings the unique key treats as one name ("Flu", "flu") are added
+        # once, as first spelled, and share its id.
+        spellings = {}
+        for name in new:
+            spellings.setdefault(_condition_key(name), name)
+        first = list(spellings.values())
         try:
-            data_entry.print_prescription(999)  # Non-existent prescription ID
-        except mysql.connector.Error as err:
-            print(f"❌ Expected error when logging print event for non-existent prescription: {err}")
-
-    finally:
-        # Close the database connection
-        db.close_connection()
-        print("🔒 Database connection closed.")
-
-# Run the test
-if __name__ == "__main__":
-    test_system()
-
-
-import pytest
-from datetime import datetime
-from hospital import Doctor, Patient, Prescription, PrescriptionFactory, HospitalDatabase
-
-# ✅ Fixture for valid Doctor instance
-@pytest.fixture
-def valid_doctor():
-    return Doctor(301, "Dr. Emily Carter", 1985, "Female", "5551112222", "Canadian", 120000, "Surgery", "Neurosurgeon")
-
-# ✅ Fixture for valid Patient instance
-@pytest.fixture
-def valid_patient():
-    return Patient(401, "John Smith", 1995, "Male", "4445556666", "American", ["Asthma"])
-
-# ✅ Fixture for valid Prescription instance
-@pytest.fixture
-def valid_prescription(valid_doctor, valid_patient):
-    return Prescription(valid_doctor, valid_patient, "Amoxicillin")
-
-# ✅ Fixture for HospitalDatabase instance (ensure a clean test DB)
-@pytest.fixture(scope="module")
-def hospital_db():
-    db = HospitalDatabase()
-    yield db
-    db.close_connection()  # Ensure connection closes after tests
-
-
-# ✅ Test Prescription Object Creation
-def test_prescription_creation(valid_prescription):
-    """Test that a Prescription object is correctly initialized"""
-    assert valid_prescription.doctor.name == "Dr. Emily Carter"
-    assert valid_prescription.patient.name == "John Smith"
-    assert valid_prescription.medication == "Amoxicillin"
-    assert isinstance(valid_prescription.date_issued, datetime)
-
-
-# ✅ Test Invalid Prescription (Missing Fields)
-def test_invalid_prescription_missing_field(valid_doctor, valid_patient):
-    """Test that missing fields raise ValueError"""
-    with pytest.raises(ValueError):
-        Prescription(None, valid_patient, "Paracetamol")  # Missing doctor
-    
-    with pytest.raises(ValueError):
-        Prescription(valid_doctor, None, "Paracetamol")  # Missing patient
-    
-    with pytest.raises(ValueError):
-        Prescription(valid_doctor, valid_patient, None)  # Missing medication
-
-# ✅ Test Invalid Prescription (Wrong Type)
-def test_invalid_prescription_wrong_type(valid_doctor, valid_patient):
-    """Test incorrect object types raise TypeError"""
-    with pytest.raises(TypeError):
-        Prescription("Dr. Fake", valid_patient, "Paracetamol")  # Doctor must be an instance of Doctor class
-
-    with pytest.raises(TypeError):
-        Prescription(valid_doctor, "John Doe", "Paracetamol")  # Patient must be an instance of Patient class
-
-    with pytest.raises(ValueError):
-        Prescription(valid_doctor, valid_patient, "")  # Medication must be non-empty string
-
-
-# ✅ Test Prescription Display Method
-def test_prescription_display_info(valid_prescription, capsys):
-    """Test the display_prescription method"""
-    valid_prescription.display_prescription()
-    captured = capsys.readouterr()
-    assert "Prescription Details:" in captured.out
-    assert "Dr. Emily Carter" in captured.out
-    assert "John Smith" in captured.out
-    assert "Amoxicillin" in captured.out
-
-
-# ✅ Test PrescriptionFactory Create Method
-def test_prescription_factory(valid_doctor, valid_patient):
-    """Test that the factory correctly creates Prescription objects"""
-    prescription = PrescriptionFactory.create_prescription(valid_doctor, valid_patient, "Ibuprofen")
-    assert isinstance(prescription, Prescription)
-    assert prescription.medication == "Ibuprofen"
-
-
-# ✅ Test Prescription Save to Database
-def test_prescription_save_to_db(valid_prescription, hospital_db):
-    """Test that the prescription can be saved to the database"""
-    try:
-        valid_prescription.save_to_db()
-        assert valid_prescription.id is not None  # ID should be set after saving
-    except Exception as e:
-        pytest.fail(f"Unexpected error: {e}")
-
-
-# ✅ Test HospitalDatabase Singleton
-def test_hospital_database_singleton():
-    """Ensure that only one instance of the database exists"""
-    db1 = HospitalDatabase()
-    db2 = HospitalDatabase()
-    assert db1 is db2  # Both instances should be the same
-
-
-# ✅ Test HospitalDatabase Connection
-def test_hospital_database_connection(hospital_db):
-    """Test that the database connection is established"""
-    assert hospital_db.conn is not None
-    assert hospital_db.cursor is not None
-
-
-# ✅ Test HospitalDatabase Closing Connection
-def test_hospital_database_close_connection(hospital_db):
-    """Ensure that closing the database connection works"""
-    hospital_db.close_connection()
-    with pytest.raises(Exception):
-        hospital_db.cursor.execute("SELECT 1;")  # Should fail if connection is closed
+            with db.transaction():
+                added = dict(zip(first, db.insert_many("medical_condition", ("name",), [(name,) for name in first], return_ids=True)))
+        except db.backend.permanent_errors:
+            added = _lookup_conditions(db, first)  # added concurrently
+        for name in new:
+            condition_id = added.get(spellings[_condition_key(name)])
+            if condition_id is not None:
+                ids[name] = condition_id
+        if not db.in_transaction():
+            db.condition_ids.update(ids)
+    return ids
+
+def _close_cursors(statements):
+    for _, cursor in statements:
+        try:
+            cursor.close()
+        except Exception:
+            pass
+
+def _chunks(iterable, size):
+    """Yield lists of at most ``size`` items without materializing ``iterable``."""
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
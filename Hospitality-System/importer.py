@@ -0,0 +1,433 @@
+"""Bulk-import patients and staff from CSV.
+
+    python importer.py patient patients.csv
+    python importer.py doctor doctors.csv.gz --batch-size 5000 --rejects bad_doctors.csv
+    python importer.py patient part-*.csv --workers 8
+
+The header names the constructor fields of the imported class (``id``,
+``name``, ``birth_year``, ...); ``medical_history`` is a comma-separated list.
+"""
+import argparse
+import csv
+import gzip
+import inspect
+import multiprocessing
+import os
+import queue
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from hospital import DataEntry, Doctor, Employee, HospitalDatabase, Manager, Nurse, Patient, _chunks
+
+KINDS = {"patient": Patient, "doctor": Doctor, "nurse": Nurse, "manager": Manager, "data_entry": DataEntry}
+
+# CSV gives strings; these fields are converted before the constructor checks them.
+_CONVERTERS = {
+    "id": int,
+    "birth_year": int,
+    "salary": float,
+    "medical_history": lambda value: [item.strip() for item in value.split(",") if item.strip()],
+}
+
+
+def _fields(cls):
+    return [name for name in inspect.signature(cls.__init__).parameters if name != "self"]
+
+
+def _check_columns(fields, fieldnames):
+    missing = set(fields) - set(fieldnames or ())
+    if missing:
+        raise ValueError(f"Missing CSV columns: {', '.join(sorted(missing))}")
+
+
+def _parse(cls, fields, record):
+    """Build an entity from a CSV record, raising ValueError/TypeError like the constructor."""
+    values = {}
+    for field in fields:
+        value = (record.get(field) or "").strip()
+        convert = _CONVERTERS.get(field)
+        if convert is not None and value:
+            try:
+                value = convert(value)
+            except ValueError:
+                raise ValueError(f"Invalid {field}: {value!r}") from None
+        values[field] = value
+    return cls(**values)
+
+
+def _tables(cls):
+    """(table, columns) pairs a ``cls`` entity is written to."""
+    if cls is Patient:
+        return [("patient", Patient._columns), ("patient_condition", Patient._condition_columns)]
+    return [("employee", Employee._columns), (cls._subtype_table, cls._subtype_columns)]
+
+
+def _table_rows(cls, entities):
+    """Values of ``entities`` aligned per entity: patient rows and histories, or employee and subtype rows.
+
+    Plain values so batches can cross process boundaries; condition ids are
+    resolved by the writer.
+    """
+    if cls is Patient:
+        return [[patient._db_values() for patient in entities], [tuple(patient.medical_history) for patient in entities]]
+    return [[employee._db_values() for employee in entities], [employee._subtype_values() for employee in entities]]
+
+
+def _tsv_value(value):
+    if value is None:
+        return "\\N"
+    return str(value).replace("\\", "\\\\").replace("\t", "\\t").replace("\n", "\\n")
+
+
+def _load_batch(db, table, columns, rows):
+    """Write ``rows`` to a temporary tab-separated file and LOAD DATA it."""
+    with tempfile.NamedTemporaryFile("w", encoding="utf-8", newline="", suffix=".tsv", delete=False) as out:
+        for row in rows:
+            out.write("\t".join(map(_tsv_value, row)))
+            out.write("\n")
+    try:
+        return db.load_file(table, columns, out.name)
+    finally:
+        os.remove(out.name)
+
+
+class _Rejects:
+    """Reject file opened on the first bad row: the input columns plus ``error``."""
+
+    def __init__(self, path, fieldnames):
+        self.path = path
+        self.fieldnames = list(fieldnames) + ["error"]
+        self.count = 0
+        self._file = None
+        self._writer = None
+
+    def add(self, record, error):
+        if self._writer is None:
+            self._file = open(self.path, "w", encoding="utf-8", newline="")
+            self._writer = csv.DictWriter(self._file, self.fieldnames, extrasaction="ignore")
+            self._writer.writeheader()
+        self._writer.writerow({**record, "error": str(error)})
+        self.count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+
+
+class _Duplicates(Exception):
+    """Rolls back a LOAD DATA batch that skipped rows as duplicates."""
+
+
+class _Writer:
+    """Writes validated batches, one transaction each, isolating rows the database refuses.
+
+    On MySQL with ``local_infile`` enabled, batches go through ``LOAD DATA
+    LOCAL INFILE`` unless ``load_data=False``. A batch in which it skipped a
+    duplicate row is rolled back and written again with INSERTs, which
+    isolate the offending rows into the reject file.
+    """
+
+    def __init__(self, db, cls, batch_size, load_data, rejects):
+        self.db = db
+        self.cls = cls
+        self.tables = _tables(cls)
+        self.batch_size = batch_size
+        self.load_data = db.backend.can_load_file() if load_data is None else load_data
+        self.rejects = rejects
+        self.imported = 0
+        self._cache = db.caches["patient" if cls is Patient else "employee"]
+
+    @property
+    def rejected(self):
+        return self.rejects.count
+
+    def write(self, table_rows, records=None):
+        """Write one batch given as rows per table; ``records`` are the input rows for rejects."""
+        count = len(table_rows[0])
+        self.imported += self._write(table_rows, records)
+        for row in table_rows[0]:
+            self._cache.invalidate(row[0])
+        return count
+
+    def _entity_rows(self, table_rows):
+        """Rows for each of ``self.tables``, as one list per entity."""
+        if self.cls is not Patient:
+            return [[[row] for row in rows] for rows in table_rows]
+        patients, histories = table_rows
+        return [[[row] for row in patients], Patient._condition_rows(self.db, zip((row[0] for row in patients), histories))]
+
+    def _record(self, table_rows, i):
+        """Input record rebuilt from the values of entity ``i``."""
+        if self.cls is Patient:
+            return {**dict(zip(Patient._columns, table_rows[0][i])), "medical_history": ", ".join(table_rows[1][i])}
+        return {column: value for (_, columns), rows in zip(self.tables, table_rows) for column, value in zip(columns, rows[i])}
+
+    def _write(self, table_rows, records):
+        db = self.db
+        count = len(table_rows[0])
+        entity_rows = self._entity_rows(table_rows)
+        if self.load_data:
+            try:
+                with db.transaction():
+                    for (table, columns), rows in zip(self.tables, entity_rows):
+                        rows = [row for group in rows for row in group]
+                        if _load_batch(db, table, columns, rows) < len(rows):
+                            # LOCAL skips duplicate keys table by table: a skipped
+                            # patient or employee would keep the batch's history or
+                            # subtype row, so nothing of the batch is kept.
+                            raise _Duplicates
+                return count
+            except _Duplicates:
+                pass
+            except db.errors as err:
+                print(f"⚠️ LOAD DATA LOCAL INFILE failed ({err}); using batched INSERTs.", file=sys.stderr)
+                self.load_data = False
+        try:
+            with db.transaction():
+                for (table, columns), rows in zip(self.tables, entity_rows):
+                    db.insert_many(table, columns, [row for group in rows for row in group], self.batch_size)
+            return count
+        except db.errors:
+            pass
+        # Something in the batch is bad: retry row by row to find it.
+        written = 0
+        for i in range(count):
+            try:
+                with db.transaction():
+                    for (table, columns), rows in zip(self.tables, entity_rows):
+                        db.insert_many(table, columns, rows[i])
+                written += 1
+            except db.errors as err:
+                self.rejects.add(records[i] if records is not None else self._record(table_rows, i), err)
+        return written
+
+
+def _report(read, before, every, writer, started):
+    if every and read // every != before // every:
+        rate = read / (time.perf_counter() - started)
+        print(f"… {read:,} rows read, {writer.imported:,} imported, {writer.rejected:,} rejected ({rate:,.0f} rows/s)", file=sys.stderr)
+
+
+def _open_input(path):
+    if path.endswith(".gz"):
+        return gzip.open(path, "rt", encoding="utf-8", newline="")
+    return open(path, encoding="utf-8", newline="")
+
+
+def _read_header(path):
+    with _open_input(path) as source:
+        return next(csv.reader(source), None)
+
+
+def import_csv(kind, path, rejects=None, batch_size=None, load_data=None, progress_every=None):
+    """Import ``kind`` entities from the CSV at ``path`` and return (imported, rejected, seconds).
+
+    Rows are validated by the entity constructor and written in batches of
+    ``batch_size``, one transaction per batch. Rows that fail validation or
+    the database (duplicate id, ...) are written to ``rejects`` (default
+    ``<path>.rejects.csv``) with the reason, and the run carries on.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown import kind: {kind}")
+
+    cls = KINDS[kind]
+    fields = _fields(cls)
+    db = HospitalDatabase()
+    batch_size = db.batch_size(batch_size)
+    started = time.perf_counter()
+    read = 0
+
+    with _open_input(path) as source:
+        reader = csv.DictReader(source)
+        _check_columns(fields, reader.fieldnames)
+        writer = _Writer(db, cls, batch_size, load_data, _Rejects(rejects or path + ".rejects.csv", reader.fieldnames))
+        try:
+            for records in _chunks(reader, batch_size):
+                entities, good = [], []
+                for record in records:
+                    try:
+                        entities.append(_parse(cls, fields, record))
+                        good.append(record)
+                    except (ValueError, TypeError) as err:
+                        writer.rejects.add(record, err)
+                if entities:
+                    writer.write(_table_rows(cls, entities), good)
+                read += len(records)
+                _report(read, read - len(records), progress_every, writer, started)
+        finally:
+            writer.rejects.close()
+
+    return writer.imported, writer.rejected, time.perf_counter() - started
+
+
+# Set in each worker process by _init_worker.
+_batches = None
+
+
+def _init_worker(batches):
+    global _batches
+    _batches = batches
+
+
+def _shards(paths, pieces):
+    """Split plain CSV files into about ``pieces`` byte ranges; gzip files stay whole.
+
+    Ranges are cut at line starts by the reader, so records must not contain
+    quoted newlines.
+    """
+    sizes = {path: os.path.getsize(path) for path in paths}
+    target = max(1, sum(sizes.values()) // pieces)
+    for path in paths:
+        if path.endswith(".gz"):
+            yield path, 0, None
+            continue
+        for start in range(0, sizes[path] or 1, target):
+            yield path, start, min(start + target, sizes[path])
+
+
+def _shard_lines(path, start, end):
+    """Yield the lines starting within [start, end) of ``path``, skipping the header."""
+    if end is None:
+        with _open_input(path) as source:
+            next(source, None)
+            yield from source
+        return
+    with open(path, "rb") as source:
+        if start:
+            source.seek(start - 1)
+        source.readline()  # the header, or the tail of a line owned by the previous shard
+        while source.tell() < end:
+            line = source.readline()
+            if not line:
+                break
+            yield line.decode("utf-8")
+
+
+def _parse_shard(kind, path, start, end, fieldnames, batch_size):
+    """Parse and validate one shard in a worker, sending batches to the writer.
+
+    Each message is ``(table_rows, rejects)``: plain tuples for the valid rows
+    and ``(record, error)`` pairs for the rest. ``None`` marks the shard done.
+    """
+    cls = KINDS[kind]
+    fields = _fields(cls)
+    read = 0
+    try:
+        reader = csv.DictReader(_shard_lines(path, start, end), fieldnames)
+        for records in _chunks(reader, batch_size):
+            entities, bad = [], []
+            for record in records:
+                try:
+                    entities.append(_parse(cls, fields, record))
+                except (ValueError, TypeError) as err:
+                    bad.append((record, str(err)))
+            _batches.put((_table_rows(cls, entities) if entities else None, bad, len(records)))
+            read += len(records)
+    finally:
+        _batches.put(None)
+    return read
+
+
+def import_parallel(kind, paths, workers=None, rejects=None, batch_size=None, load_data=None, progress_every=None):
+    """Import ``kind`` entities from several CSV files using a pool of parser processes.
+
+    Files are cut into shards that ``workers`` processes parse and validate
+    in parallel. Batches flow over a bounded queue to this process, which is
+    the only database writer, so slow writes push back on the parsers
+    instead of piling up in memory. Returns (imported, rejected, seconds)
+    like ``import_csv``; all files must share one header.
+    """
+    if kind not in KINDS:
+        raise ValueError(f"Unknown import kind: {kind}")
+
+    paths = [paths] if isinstance(paths, str) else list(paths)
+    workers = workers or os.cpu_count() or 1
+    cls = KINDS[kind]
+    header = _read_header(paths[0])
+    _check_columns(_fields(cls), header)
+    for path in paths[1:]:
+        if _read_header(path) != header:
+            raise ValueError(f"{path} does not have the same header as {paths[0]}.")
+
+    db = HospitalDatabase()
+    batch_size = db.batch_size(batch_size)
+    started = time.perf_counter()
+    read = 0
+    writer = _Writer(db, cls, batch_size, load_data, _Rejects(rejects or paths[0] + ".rejects.csv", header))
+    batches = multiprocessing.Queue(maxsize=2 * workers)
+    try:
+        with ProcessPoolExecutor(workers, initializer=_init_worker, initargs=(batches,)) as pool:
+            futures = [
+                pool.submit(_parse_shard, kind, path, start, end, header, batch_size)
+                for path, start, end in _shards(paths, workers * 4)
+            ]
+            try:
+                pending = len(futures)
+                while pending:
+                    try:
+                        message = batches.get(timeout=0.5)
+                    except queue.Empty:
+                        for future in futures:
+                            if future.done() and future.exception() is not None:
+                                raise future.exception()
+                        continue
+                    if message is None:
+                        pending -= 1
+                        continue
+                    table_rows, bad, count = message
+                    for record, error in bad:
+                        writer.rejects.add(record, error)
+                    if table_rows:
+                        writer.write(table_rows)
+                    read += count
+                    _report(read, read - count, progress_every, writer, started)
+            except BaseException:
+                # Unblock workers waiting on the full queue so the pool can shut down.
+                for future in futures:
+                    future.cancel()
+                while not all(future.done() for future in futures):
+                    try:
+                        batches.get(timeout=0.1)
+                    except queue.Empty:
+                        pass
+                raise
+            for future in futures:
+                future.result()
+    finally:
+        writer.rejects.close()
+        batches.close()
+
+    return writer.imported, writer.rejected, time.perf_counter() - started
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-import patients or staff from CSV files.")
+    parser.add_argument("kind", choices=KINDS)
+    parser.add_argument("inputs", nargs="+", metavar="input", help="CSV file with a header row; .gz is decompressed")
+    parser.add_argument("--rejects", help="where rejected rows go (default: <first input>.rejects.csv)")
+    parser.add_argument("--batch-size", type=int, default=None, help="rows per transaction")
+    parser.add_argument("--workers", type=int, default=1, help="parser processes; 0 uses every core")
+    parser.add_argument("--no-load-data", dest="load_data", action="store_false", default=None,
+                        help="use batched INSERTs even when LOAD DATA LOCAL INFILE is available")
+    parser.add_argument("--progress-every", type=int, default=100_000, help="rows between progress lines")
+    args = parser.parse_args(argv)
+
+    if args.workers == 1 and len(args.inputs) == 1:
+        imported, rejected, seconds = import_csv(
+            args.kind, args.inputs[0], args.rejects, args.batch_size, args.load_data, args.progress_every
+        )
+    else:
+        imported, rejected, seconds = import_parallel(
+            args.kind, args.inputs, args.workers or None, args.rejects, args.batch_size, args.load_data, args.progress_every
+        )
+    rate = imported / seconds if seconds else float("inf")
+    print(f"✅ Imported {imported} {args.kind} rows in {seconds:.2f}s ({rate:,.0f} rows/s), {rejected} rejected", file=sys.stderr)
+    rejects = args.rejects or args.inputs[0] + ".rejects.csv"
+    if rejected and os.path.exists(rejects):
+        print(f"⚠️ Rejected rows written to {rejects}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
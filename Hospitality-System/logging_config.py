@@ -0,0 +1,74 @@
+import atexit
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import sys
+
+# Attributes every LogRecord has; anything else came in through ``extra=``.
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", (), None))) | {"message", "asctime", "taskName"}
+
+_listener = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line: time, level, logger, message and the ``extra`` fields."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS:
+                entry[key] = value
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, default=str, ensure_ascii=False)
+
+
+def configure_logging(level=None, quiet=None, fmt=None, stream=None):
+    """Send the ``hospital`` logger through a queue to a background writer thread.
+
+    Callers only enqueue records; formatting and stream I/O happen on the
+    listener thread. ``quiet`` raises the level to WARNING so successful
+    writes log nothing and cost one level check. Defaults come from
+    LOG_LEVEL (INFO), LOG_QUIET (0) and LOG_FORMAT (``text`` or ``json``).
+    Calling it again replaces the previous setup.
+    """
+    global _listener
+
+    level = level or os.environ.get("LOG_LEVEL", "INFO")
+    quiet = os.environ.get("LOG_QUIET", "0") == "1" if quiet is None else quiet
+    fmt = fmt or os.environ.get("LOG_FORMAT", "text")
+    if fmt not in ("text", "json"):
+        raise ValueError(f"Unknown log format: {fmt}")
+
+    shutdown_logging()
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(JsonFormatter() if fmt == "json" else logging.Formatter("%(message)s"))
+    records = queue.SimpleQueue()
+    _listener = logging.handlers.QueueListener(records, handler, respect_handler_level=True)
+    _listener.start()
+
+    logger = logging.getLogger("hospital")
+    for old in [h for h in logger.handlers if isinstance(h, logging.handlers.QueueHandler)]:
+        logger.removeHandler(old)
+    logger.addHandler(logging.handlers.QueueHandler(records))
+    logger.setLevel(logging.WARNING if quiet else level)
+    logger.propagate = False
+    return logger
+
+
+def shutdown_logging():
+    """Flush queued records and stop the writer thread."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+atexit.register(shutdown_logging)
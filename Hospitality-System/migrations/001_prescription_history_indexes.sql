@@ -0,0 +1,10 @@
+-- ✅ Composite indexes for prescription history queries on existing databases.
+-- New databases get them from OrangeFinalProjectDataBase.sql.
+USE hospitalll_db;
+
+ALTER TABLE prescription
+    ADD INDEX idx_prescription_patient_issued (patient_id, date_issued),
+    ADD INDEX idx_prescription_doctor_issued (doctor_id, date_issued);
+
+ALTER TABLE printed_prescriptions
+    ADD INDEX idx_printed_prescription_printed (prescription_id, printed_at);
@@ -0,0 +1,54 @@
+-- ✅ Move patient.medical_history (comma-separated TEXT) into the indexed
+-- medical_condition / patient_condition tables on existing databases.
+-- New databases get the tables from OrangeFinalProjectDataBase.sql.
+USE hospitalll_db;
+
+CREATE TABLE IF NOT EXISTS medical_condition (
+    id INT AUTO_INCREMENT PRIMARY KEY,
+    name VARCHAR(255) NOT NULL,
+    UNIQUE KEY uq_medical_condition_name (name)
+);
+
+CREATE TABLE IF NOT EXISTS patient_condition (
+    patient_id INT NOT NULL,
+    condition_id INT NOT NULL,
+    position INT NOT NULL,
+    PRIMARY KEY (patient_id, condition_id),
+    FOREIGN KEY (patient_id) REFERENCES patient(id) ON DELETE CASCADE,
+    FOREIGN KEY (condition_id) REFERENCES medical_condition(id) ON DELETE CASCADE,
+    INDEX idx_patient_condition_condition (condition_id, patient_id)
+);
+
+-- Item positions 0..99999, enough for any TEXT value (MySQL 5.7 has no
+-- recursive CTEs to split with, and cannot join a temporary table to itself).
+CREATE TABLE history_digit (d INT PRIMARY KEY);
+INSERT INTO history_digit (d) VALUES (0), (1), (2), (3), (4), (5), (6), (7), (8), (9);
+CREATE TEMPORARY TABLE history_position (n INT PRIMARY KEY) AS
+SELECT d0.d + 10 * d1.d + 100 * d2.d + 1000 * d3.d + 10000 * d4.d AS n
+FROM history_digit d0, history_digit d1, history_digit d2, history_digit d3, history_digit d4;
+DROP TABLE history_digit;
+
+-- One row per history item, split on commas and trimmed like the importer does.
+CREATE TEMPORARY TABLE patient_history_item AS
+SELECT p.id AS patient_id, h.n AS position,
+       TRIM(SUBSTRING_INDEX(SUBSTRING_INDEX(p.medical_history, ',', h.n + 1), ',', -1)) AS name
+FROM patient p
+JOIN history_position h
+  ON h.n <= CHAR_LENGTH(p.medical_history) - CHAR_LENGTH(REPLACE(p.medical_history, ',', ''))
+WHERE p.medical_history IS NOT NULL AND p.medical_history <> '';
+
+DELETE FROM patient_history_item WHERE name = '';
+
+INSERT IGNORE INTO medical_condition (name)
+SELECT DISTINCT name FROM patient_history_item;
+
+-- IGNORE keeps the first occurrence of a condition listed twice for one patient.
+INSERT IGNORE INTO patient_condition (patient_id, condition_id, position)
+SELECT i.patient_id, c.id, i.position
+FROM patient_history_item i
+JOIN medical_condition c ON c.name = i.name
+ORDER BY i.patient_id, i.position;
+
+DROP TEMPORARY TABLE patient_history_item, history_position;
+
+ALTER TABLE patient DROP COLUMN medical_history;
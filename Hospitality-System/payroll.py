@@ -0,0 +1,225 @@
+"""Department payroll analytics over salaries held as integer cents.
+
+    python payroll.py                          # per-department totals, means and percentiles
+    python payroll.py --raise Nurse=5          # ... after a 5% raise for nurses
+    python payroll.py --pushdown --raise Nurse=5
+"""
+import argparse
+from decimal import ROUND_HALF_UP, Decimal
+
+import numpy as np
+
+from categories import DEPARTMENTS, CategoryDictionary
+from hospital import DataEntry, Doctor, HospitalDatabase, Manager, Nurse
+from roster import CategoryColumn, group_sort, percentiles_of_sorted
+
+ROLES = {cls.__name__: cls for cls in (Doctor, Nurse, Manager, DataEntry)}
+
+# Role codes are fixed by ROLES; department codes come from the shared DEPARTMENTS.
+_ROLE_NAMES = CategoryDictionary("role", ROLES)
+
+# Above this many employees department_summary() aggregates in the database.
+PULL_LIMIT = 2_000_000
+
+_CENT = Decimal("0.01")
+
+_ROLE_SQL = """
+    CASE WHEN d.id IS NOT NULL THEN 'Doctor' WHEN n.id IS NOT NULL THEN 'Nurse'
+         WHEN m.id IS NOT NULL THEN 'Manager' WHEN de.id IS NOT NULL THEN 'DataEntry' END
+"""
+
+_ROLE_JOINS = """
+    FROM employee e
+    LEFT JOIN doctor d ON d.id = e.id
+    LEFT JOIN nurse n ON n.id = e.id
+    LEFT JOIN manager m ON m.id = e.id
+    LEFT JOIN data_entry de ON de.id = e.id
+"""
+
+
+def to_cents(salary):
+    """Exact integer cents of a DECIMAL(10, 2), float or int salary."""
+    if isinstance(salary, Decimal):
+        return int(salary.scaleb(2).to_integral_value(ROUND_HALF_UP))
+    return round(salary * 100)
+
+
+def to_amount(cents):
+    """Decimal amount of a (possibly fractional) number of cents, rounded half-up to the cent."""
+    if isinstance(cents, (int, np.integer)):
+        return Decimal(int(cents)).scaleb(-2)
+    return Decimal(repr(float(cents))).scaleb(-2).quantize(_CENT, ROUND_HALF_UP)
+
+
+def _basis_points(percent):
+    """``percent`` (5, "2.5", Decimal) in integer hundredths of a percent."""
+    points = Decimal(str(percent)) * 100
+    if points != points.to_integral_value():
+        raise ValueError(f"Raises are limited to hundredths of a percent: {percent}")
+    return int(points)
+
+
+def _raised(cents, points):
+    """``cents`` raised by ``points`` basis points, rounded half-up per value."""
+    return (cents * (10_000 + points) + 5_000) // 10_000
+
+
+class Payroll:
+    """Salaries as an int64 array of cents, with departments and roles dictionary-encoded.
+
+    Integer cents keep every total exact, however many salaries are added;
+    results come back as ``Decimal``. Department statistics take one sort of
+    the whole array, not a loop over employees.
+    """
+
+    def __init__(self, ids, cents, departments, roles):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.cents = np.asarray(cents, dtype=np.int64)
+        self.departments = departments if isinstance(departments, CategoryColumn) else CategoryColumn.encode(departments, DEPARTMENTS)
+        self.roles = roles if isinstance(roles, CategoryColumn) else CategoryColumn.encode(roles, _ROLE_NAMES)
+        if not len(self.ids) == len(self.cents) == len(self.departments) == len(self.roles):
+            raise ValueError("Payroll columns must have the same length.")
+
+    @classmethod
+    def from_employees(cls, employees):
+        employees = list(employees)
+        return cls(
+            [e.id for e in employees],
+            [to_cents(e.salary) for e in employees],
+            [e.department for e in employees],
+            [type(e).__name__ for e in employees],
+        )
+
+    @classmethod
+    def load(cls, chunk_size=None):
+        """Payroll of every employee with a role, streamed from the database."""
+        sql = f"SELECT e.id, e.salary, e.department, {_ROLE_SQL} {_ROLE_JOINS} ORDER BY e.id;"
+        ids, cents = [], []
+        department_codes, role_codes = [], []
+        for employee_id, salary, department, role in HospitalDatabase().stream(sql, chunk_size=chunk_size):
+            if role is None:
+                continue  # no subtype row, skipped like Employee.load_all
+            ids.append(employee_id)
+            cents.append(to_cents(salary))
+            department_codes.append(DEPARTMENTS.code(department))
+            role_codes.append(_ROLE_NAMES.code(role))
+        return cls(ids, cents, CategoryColumn.shared(department_codes, DEPARTMENTS), CategoryColumn.shared(role_codes, _ROLE_NAMES))
+
+    def __len__(self):
+        return len(self.ids)
+
+    def total(self):
+        return to_amount(int(self.cents.sum()))
+
+    def mask(self, role=None, department=None):
+        """Boolean mask of the employees with ``role`` (class or class name) and/or in ``department``."""
+        result = np.ones(len(self), dtype=bool)
+        if role is not None:
+            result &= self.roles.codes == self.roles.code(getattr(role, "__name__", role))
+        if department is not None:
+            result &= self.departments.codes == self.departments.code(department)
+        return result
+
+    def with_raise(self, percent, role=None, department=None):
+        """A new Payroll where the selected employees earn ``percent`` more, rounded to the cent each."""
+        points = _basis_points(percent)
+        selected = self.mask(role, department)
+        cents = np.where(selected, _raised(self.cents, points), self.cents)
+        return Payroll(self.ids, cents, self.departments, self.roles)
+
+    def by_department(self, q=(50, 90)):
+        """{department: {count, total, mean, min, max, p<q>...}} with Decimal amounts."""
+        ordered, present, starts, counts = group_sort(self.cents, self.departments.codes, len(self.departments.labels))
+        if not len(ordered):
+            return {}
+        totals = np.add.reduceat(ordered, starts)
+        percentiles = percentiles_of_sorted(ordered, starts, counts, np.asarray(q, dtype=np.float64) / 100)
+        summary = {}
+        for i, code in enumerate(present):
+            total, count = int(totals[i]), int(counts[i])
+            stats = {
+                "count": count,
+                "total": to_amount(total),
+                "mean": (Decimal(total) / count).scaleb(-2).quantize(_CENT, ROUND_HALF_UP),
+                "min": to_amount(int(ordered[starts[i]])),
+                "max": to_amount(int(ordered[starts[i] + count - 1])),
+            }
+            for p, value in zip(q, percentiles[i]):
+                stats[f"p{p}"] = to_amount(value)
+            summary[self.departments.labels[code]] = stats
+        return summary
+
+
+def department_summary(raises=None, pushdown=None, pull_limit=PULL_LIMIT):
+    """Per-department count/total/mean/min/max after ``raises`` ({role: percent}).
+
+    Up to ``pull_limit`` employees the salaries are pulled into a Payroll,
+    which also reports p50/p90 and rounds raises per employee. Above it (or
+    with ``pushdown=True``) the database runs ``GROUP BY department, role``
+    and only one row per group comes back; raises are then rounded per group,
+    so totals can differ from the pulled result by under a cent per employee,
+    and no percentiles are reported.
+    """
+    raises = {getattr(role, "__name__", role): percent for role, percent in (raises or {}).items()}
+    unknown = set(raises) - set(ROLES)
+    if unknown:
+        raise ValueError(f"Unknown roles: {', '.join(sorted(unknown))}")
+
+    db = HospitalDatabase()
+    if pushdown is None:
+        pushdown = db.query("SELECT COUNT(*) FROM employee;")[0][0] > pull_limit
+    if not pushdown:
+        payroll = Payroll.load()
+        for role, percent in raises.items():
+            payroll = payroll.with_raise(percent, role=role)
+        return payroll.by_department()
+
+    cents = "CAST(ROUND(e.salary * 100) AS SIGNED)"
+    sql = f"""
+    SELECT e.department, {_ROLE_SQL} AS role, COUNT(*), SUM({cents}), MIN({cents}), MAX({cents})
+    {_ROLE_JOINS}
+    GROUP BY e.department, role
+    ORDER BY e.department;
+    """
+    groups = {}
+    for department, role, count, total, low, high in db.query(sql):
+        if role is None:
+            continue
+        points = _basis_points(raises.get(role, 0))
+        total, low, high = (_raised(int(value), points) for value in (total, low, high))
+        stats = groups.setdefault(department, {"count": 0, "total": 0, "min": low, "max": high})
+        stats["count"] += count
+        stats["total"] += total
+        stats["min"] = min(stats["min"], low)
+        stats["max"] = max(stats["max"], high)
+    return {
+        department: {
+            "count": stats["count"],
+            "total": to_amount(stats["total"]),
+            "mean": (Decimal(stats["total"]) / stats["count"]).scaleb(-2).quantize(_CENT, ROUND_HALF_UP),
+            "min": to_amount(stats["min"]),
+            "max": to_amount(stats["max"]),
+        }
+        for department, stats in groups.items()
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--raise", dest="raises", action="append", default=[], metavar="ROLE=PERCENT",
+                        help="simulate a raise, e.g. Nurse=5 (repeatable)")
+    parser.add_argument("--pushdown", action="store_true", help="aggregate in the database")
+    parser.add_argument("--pull-limit", type=int, default=PULL_LIMIT, metavar="N",
+                        help=f"aggregate in the database above N employees (default {PULL_LIMIT})")
+    args = parser.parse_args()
+
+    raises = dict(item.split("=", 1) for item in args.raises)
+    summary = department_summary(raises, pushdown=args.pushdown or None, pull_limit=args.pull_limit)
+    columns = list(next(iter(summary.values()), {}))  # no p50/p90 when aggregated in the database
+    print(f"{'department':>20} " + " ".join(f"{c:>14}" for c in columns))
+    for department, stats in sorted(summary.items()):
+        print(f"{department:>20} " + " ".join(f"{stats[c]:>14}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class PoolTimeoutError(RuntimeError):
+    """Raised when no connection becomes free before the checkout timeout."""
+
+
+class ConnectionPool:
+    """Bounded, thread-safe pool of DB-API connections.
+
+    Connections are opened lazily by ``factory`` up to ``max_size``; ``fill()``
+    pre-opens ``min_size`` of them. A connection that sat idle for longer than
+    ``health_check_after`` seconds is passed to ``validate`` on checkout and
+    replaced if the check fails.
+    """
+
+    def __init__(self, factory, min_size=1, max_size=10, timeout=30.0, validate=None, health_check_after=1.0):
+        if not callable(factory):
+            raise TypeError("Connection factory must be callable.")
+
+        if not isinstance(min_size, int) or min_size < 0:
+            raise ValueError("min_size must be a non-negative integer.")
+
+        if not isinstance(max_size, int) or max_size < 1 or max_size < min_size:
+            raise ValueError("max_size must be a positive integer and at least min_size.")
+
+        self._factory = factory
+        self._validate = validate
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_after = health_check_after
+        self._idle = deque()  # (connection, released_at) pairs, most recent last
+        self._size = 0  # open connections, idle and checked out
+        self._closed = False
+        self._cond = threading.Condition()
+
+    @property
+    def size(self):
+        return self._size
+
+    @property
+    def idle(self):
+        return len(self._idle)
+
+    @property
+    def in_use(self):
+        return self._size - len(self._idle)
+
+    @property
+    def closed(self):
+        return self._closed
+
+    def fill(self):
+        """Open connections until at least ``min_size`` exist."""
+        while True:
+            with self._cond:
+                if self._closed or self._size >= self.min_size:
+                    return
+                self._size += 1
+            conn = self._open()
+            with self._cond:
+                self._idle.append((conn, time.monotonic()))
+                self._cond.notify()
+
+    def acquire(self, timeout=None):
+        """Check a connection out, blocking up to ``timeout`` seconds."""
+        deadline = time.monotonic() + (self.timeout if timeout is None else timeout)
+        while True:
+            conn = released_at = None
+            with self._cond:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Connection pool is closed.")
+                    if self._idle:
+                        conn, released_at = self._idle.pop()  # LIFO keeps hot connections hot
+                        break
+                    if self._size < self.max_size:
+                        self._size += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise PoolTimeoutError(f"No connection available within {self.max_size}-connection pool.")
+                    self._cond.wait(remaining)
+
+            if conn is None:
+                return self._open()
+            if self._is_healthy(conn, released_at):
+                return conn
+            self._discard(conn)
+
+    def release(self, conn, discard=False):
+        """Return a checked-out connection; ``discard`` closes it instead."""
+        if discard or self._closed:
+            self._discard(conn)
+            return
+        with self._cond:
+            self._idle.append((conn, time.monotonic()))
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self, timeout=None):
+        """Check a connection out for the duration of the ``with`` block."""
+        conn = self.acquire(timeout)
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        """Close idle connections; checked-out ones are closed on release."""
+        with self._cond:
+            self._closed = True
+            idle = [conn for conn, _ in self._idle]
+            self._idle.clear()
+            self._size -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            _close_quietly(conn)
+
+    def _open(self):
+        try:
+            return self._factory()
+        except BaseException:
+            with self._cond:
+                self._size -= 1
+                self._cond.notify()
+            raise
+
+    def _discard(self, conn):
+        _close_quietly(conn)
+        with self._cond:
+            self._size -= 1
+            self._cond.notify()
+
+    def _is_healthy(self, conn, released_at):
+        if self._validate is None or time.monotonic() - released_at < self.health_check_after:
+            return True
+        try:
+            return bool(self._validate(conn))
+        except Exception:
+            return False
+
+
+def _close_quietly(conn):
+    try:
+        conn.close()
+    except Exception:
+        pass
@@ -0,0 +1,127 @@
+import re
+import threading
+from bisect import bisect_left
+from collections import deque
+from datetime import datetime
+from functools import lru_cache
+
+# Histogram bucket upper bounds in seconds; the last bucket is open-ended.
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float("inf"))
+
+_LITERAL = re.compile(r"'(?:[^'\\]|\\.)*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_ROW_LIST = re.compile(r"\(\?\.\.\.\)(?:\s*,\s*\(\?\.\.\.\))+")
+
+
+@lru_cache(maxsize=4096)
+def normalize(sql):
+    """Collapse a statement to its shape: literals and placeholders become ``?``.
+
+    Placeholder lists of any length (``IN (...)``, multi-row ``VALUES``) map to
+    the same key, so batches of different sizes share one histogram.
+    """
+    sql = " ".join(sql.split()).replace("%s", "?")
+    sql = _LITERAL.sub("?", sql)
+    sql = _PLACEHOLDER_LIST.sub("(?...)", sql)
+    return _ROW_LIST.sub("(?...)", sql)
+
+
+class _Statement:
+    __slots__ = ("count", "errors", "rows", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.rows = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = [0] * len(BUCKETS)
+
+    def percentile(self, q):
+        """Upper bound of the bucket holding the ``q`` quantile (the max for the open bucket)."""
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS, self.buckets):
+            seen += count
+            if seen >= rank and count:
+                return min(bound, self.max)
+        return self.max
+
+
+class QueryStats:
+    """Per-statement latency histograms, row and error counts, and a slow-query log.
+
+    Statements are keyed by ``normalize(sql)``. Recording is a dictionary
+    lookup, a bisect and a few additions under one lock, cheap enough to
+    leave on. Statements slower than ``slow_threshold`` seconds are appended
+    to ``slow_log`` (a file path) and kept in ``slow`` for ``summary()``;
+    parameters are never logged.
+    """
+
+    def __init__(self, slow_threshold=0.5, slow_log=None, keep_slow=100):
+        self.slow_threshold = slow_threshold
+        self.slow_log = slow_log
+        self.slow = deque(maxlen=keep_slow)  # (logged_at, seconds, rows, sql), newest last
+        self._statements = {}
+        self._lock = threading.Lock()
+
+    def record(self, sql, seconds, rows=0, failed=False):
+        key = normalize(sql)
+        with self._lock:
+            statement = self._statements.get(key)
+            if statement is None:
+                statement = self._statements[key] = _Statement()
+            statement.count += 1
+            statement.rows += rows
+            statement.total += seconds
+            if seconds > statement.max:
+                statement.max = seconds
+            statement.buckets[bisect_left(BUCKETS, seconds)] += 1
+            if failed:
+                statement.errors += 1
+        if self.slow_threshold is not None and seconds >= self.slow_threshold:
+            self._log_slow(key, seconds, rows)
+
+    def _log_slow(self, sql, seconds, rows):
+        entry = (datetime.now(), seconds, rows, sql)
+        with self._lock:
+            self.slow.append(entry)
+            if self.slow_log:
+                with open(self.slow_log, "a", encoding="utf-8") as log:
+                    log.write(f"{entry[0].isoformat(' ', 'seconds')}\t{seconds:.6f}\trows={rows}\t{sql}\n")
+
+    def reset(self):
+        with self._lock:
+            self._statements.clear()
+            self.slow.clear()
+
+    def summary(self, limit=None):
+        """Statements by total time spent, as dicts of count/errors/rows/total/mean/max/p50/p95/p99."""
+        with self._lock:
+            statements = [
+                {
+                    "sql": sql,
+                    "count": s.count,
+                    "errors": s.errors,
+                    "rows": s.rows,
+                    "total": s.total,
+                    "mean": s.total / s.count,
+                    "max": s.max,
+                    "p50": s.percentile(0.50),
+                    "p95": s.percentile(0.95),
+                    "p99": s.percentile(0.99),
+                }
+                for sql, s in self._statements.items()
+            ]
+        statements.sort(key=lambda s: s["total"], reverse=True)
+        return statements[:limit]
+
+    def format_summary(self, limit=20):
+        """The ``summary()`` as a fixed-width text table."""
+        lines = [f"{'count':>8} {'errors':>6} {'rows':>9} {'total s':>9} {'mean ms':>8} {'p95 ms':>8} {'max ms':>8}  statement"]
+        for s in self.summary(limit):
+            lines.append(
+                f"{s['count']:>8} {s['errors']:>6} {s['rows']:>9} {s['total']:>9.3f} {s['mean'] * 1e3:>8.2f} "
+                f"{s['p95'] * 1e3:>8.2f} {s['max'] * 1e3:>8.2f}  {s['sql'][:120]}"
+            )
+        return "\n".join(lines)
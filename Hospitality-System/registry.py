@@ -0,0 +1,153 @@
+from hospital import Employee, Patient, Person
+
+# Fields with a secondary index. Entities without the field (patients have no
+# department, only doctors a specialization) are simply not filed under it.
+INDEXED_FIELDS = ("department", "specialization", "nationality", "specialty")
+
+
+def _slots(cls):
+    return {field for klass in cls.__mro__ for field in getattr(klass, "__slots__", ())}
+
+
+class HospitalRegistry:
+    """Every loaded patient and employee, by id, with secondary indexes.
+
+    Patients and employees have separate id spaces, like their tables. Index
+    buckets are keyed by (concrete class, value) and hold {id: entity}, so
+    add and remove are O(1) and ``find(Nurse, department="ICU")`` costs
+    O(result), not O(population). Indexed values are read when an entity is
+    added; after changing one, call ``reindex(entity)``.
+    """
+
+    def __init__(self, entities=()):
+        self._by_id = {Patient: {}, Employee: {}}
+        self._by_class = {}  # concrete class -> {id: entity}
+        self._indexes = {field: {} for field in INDEXED_FIELDS}
+        self._filed = {Patient: {}, Employee: {}}  # id -> indexed values, as filed
+        self._fields = {}  # concrete class -> indexed fields it has
+        self.add_many(entities)
+
+    @staticmethod
+    def _root(entity):
+        if isinstance(entity, Patient):
+            return Patient
+        if isinstance(entity, Employee):
+            return Employee
+        raise TypeError("Only Patient and Employee objects can be registered.")
+
+    def _indexed_fields(self, cls):
+        fields = self._fields.get(cls)
+        if fields is None:
+            slots = _slots(cls)
+            fields = self._fields[cls] = tuple(field for field in INDEXED_FIELDS if field in slots)
+            self._by_class[cls] = {}
+        return fields
+
+    def _index(self, root, entity):
+        cls = type(entity)
+        fields = self._indexed_fields(cls)
+        values = tuple(getattr(entity, field) for field in fields)
+        for field, value in zip(fields, values):
+            self._indexes[field].setdefault((cls, value), {})[entity.id] = entity
+        self._by_class[cls][entity.id] = entity
+        self._filed[root][entity.id] = values
+
+    def _unindex(self, root, entity):
+        cls = type(entity)
+        values = self._filed[root].pop(entity.id)
+        for field, value in zip(self._fields[cls], values):
+            index = self._indexes[field]
+            bucket = index[(cls, value)]
+            del bucket[entity.id]
+            if not bucket:
+                del index[(cls, value)]
+        del self._by_class[cls][entity.id]
+
+    def __len__(self):
+        return len(self._by_id[Patient]) + len(self._by_id[Employee])
+
+    def __contains__(self, entity):
+        try:
+            return self._by_id[self._root(entity)].get(entity.id) is entity
+        except TypeError:
+            return False
+
+    def add(self, entity):
+        """Register ``entity``, replacing the registered one with the same id."""
+        root = self._root(entity)
+        entities = self._by_id[root]
+        old = entities.get(entity.id)
+        if old is not None:
+            self._unindex(root, old)
+        entities[entity.id] = entity
+        self._index(root, entity)
+
+    def add_many(self, entities):
+        """Register every entity of an iterable (``Employee.load_all()``, ...); returns the count."""
+        add = self.add
+        count = 0
+        for entity in entities:
+            add(entity)
+            count += 1
+        return count
+
+    def remove(self, entity):
+        """Unregister ``entity``; KeyError if it is not registered."""
+        root = self._root(entity)
+        if self._by_id[root].get(entity.id) is not entity:
+            raise KeyError(entity.id)
+        self._unindex(root, entity)
+        del self._by_id[root][entity.id]
+
+    def reindex(self, entity):
+        """Refile ``entity`` after a change to an indexed field."""
+        root = self._root(entity)
+        if self._by_id[root].get(entity.id) is not entity:
+            raise KeyError(entity.id)
+        self._unindex(root, entity)
+        self._index(root, entity)
+
+    def patient(self, patient_id):
+        """The registered patient with ``patient_id`` or None."""
+        return self._by_id[Patient].get(patient_id)
+
+    def employee(self, employee_id):
+        """The registered employee with ``employee_id`` or None."""
+        return self._by_id[Employee].get(employee_id)
+
+    def find(self, kind=Person, **criteria):
+        """Registered ``kind`` entities whose indexed fields equal ``criteria``, grouped by class.
+
+        Each class is answered from its smallest matching bucket, so the cost
+        is bounded by the rarest criterion rather than the population.
+        """
+        unknown = set(criteria) - set(INDEXED_FIELDS)
+        if unknown:
+            raise ValueError(f"Not indexed: {', '.join(sorted(unknown))}")
+
+        result = []
+        for cls, fields in self._fields.items():
+            if not issubclass(cls, kind) or not set(criteria) <= set(fields):
+                continue
+            if not criteria:
+                result.extend(self._by_class[cls].values())
+                continue
+            buckets = sorted((self._indexes[field].get((cls, value), {}) for field, value in criteria.items()), key=len)
+            smallest, others = buckets[0], buckets[1:]
+            if not others:
+                result.extend(smallest.values())
+                continue
+            result.extend(entity for entity_id, entity in smallest.items() if all(entity_id in bucket for bucket in others))
+        return result
+
+    def by_department(self, department, kind=Employee):
+        return self.find(kind, department=department)
+
+    def by_specialization(self, specialization):
+        return self.find(specialization=specialization)
+
+    def by_nationality(self, nationality, kind=Person):
+        return self.find(kind, nationality=nationality)
+
+    def by_specialty(self, specialty):
+        return self.find(specialty=specialty)
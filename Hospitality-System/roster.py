@@ -0,0 +1,257 @@
+from datetime import date
+
+import numpy as np
+
+from categories import DEPARTMENTS, GENDERS, NATIONALITIES
+from hospital import Employee, HospitalDatabase, Patient
+
+CATEGORIES = ("gender", "nationality", "department")
+
+# The shared dictionaries entities intern these fields through; their codes
+# are the columns' codes.
+_DICTIONARIES = {"gender": GENDERS, "nationality": NATIONALITIES, "department": DEPARTMENTS}
+
+
+def group_sort(values, codes, groups):
+    """Integer ``values`` sorted within each group code, from one plain sort.
+
+    Returns (sorted values, codes present, start of each present group,
+    its size). (code, value) pairs are packed into one int64 key, so
+    ``groups * (max - min + 1)`` must fit in it.
+    """
+    values = np.asarray(values, dtype=np.int64)
+    low = int(values.min()) if len(values) else 0
+    span = int(values.max()) - low + 1 if len(values) else 1
+    ordered = np.sort(np.asarray(codes, dtype=np.int64) * span + (values - low)) % span + low
+    counts = np.bincount(codes, minlength=groups)
+    present = np.flatnonzero(counts)
+    starts = (np.cumsum(counts) - counts)[present]
+    return ordered, present, starts, counts[present]
+
+
+def percentiles_of_sorted(ordered, starts, counts, q):
+    """Quantiles ``q`` (0-1) of each group of ``group_sort`` output, interpolated like ``numpy.percentile``."""
+    ordered = ordered.astype(np.float64)
+    position = starts[:, None] + np.asarray(q, dtype=np.float64)[None, :] * (counts - 1)[:, None]
+    low = np.floor(position).astype(np.int64)
+    high = np.ceil(position).astype(np.int64)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+class CategoryColumn:
+    """Dictionary-encoded strings: an int32 code per row and the label of each code.
+
+    Columns encoded against a shared ``CategoryDictionary`` use its stable
+    codes, so columns built at different times agree code for code; ``None``
+    (a patient's department) then takes the code after the last label.
+    Otherwise codes number labels in first-seen order.
+    """
+
+    __slots__ = ("codes", "labels", "_lookup")
+
+    def __init__(self, codes, labels):
+        self.codes = np.asarray(codes, dtype=np.int32)
+        self.labels = list(labels)
+        self._lookup = {label: code for code, label in enumerate(self.labels)}
+
+    @classmethod
+    def shared(cls, codes, dictionary):
+        """Column of ``dictionary`` codes, where -1 stands for ``None``."""
+        codes = np.asarray(codes, dtype=np.int32)
+        labels = list(dictionary)
+        missing = codes < 0
+        if missing.any():
+            codes = np.where(missing, len(labels), codes).astype(np.int32)
+            labels.append(None)
+        return cls(codes, labels)
+
+    @classmethod
+    def encode(cls, values, dictionary=None):
+        """Column of ``values``, coded by ``dictionary`` when given."""
+        if dictionary is not None:
+            code = dictionary.code
+            return cls.shared(np.fromiter((-1 if value is None else code(value) for value in values), dtype=np.int32), dictionary)
+        lookup = {}
+        codes = np.fromiter((lookup.setdefault(value, len(lookup)) for value in values), dtype=np.int32)
+        return cls(codes, lookup)
+
+    def code(self, label):
+        """Code of ``label``, or -1 when no row has it."""
+        return self._lookup.get(label, -1)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, row):
+        return self.labels[self.codes[row]]
+
+
+class RosterView:
+    """One roster row read in place from the columns; nothing is copied."""
+
+    __slots__ = ("_roster", "_row")
+
+    def __init__(self, roster, row):
+        self._roster = roster
+        self._row = row
+
+    @property
+    def id(self):
+        return int(self._roster.ids[self._row])
+
+    @property
+    def birth_year(self):
+        return int(self._roster.birth_years[self._row])
+
+    @property
+    def gender(self):
+        return self._roster.columns["gender"][self._row]
+
+    @property
+    def nationality(self):
+        return self._roster.columns["nationality"][self._row]
+
+    @property
+    def department(self):
+        return self._roster.columns["department"][self._row]
+
+    def calculate_age(self, on=None):
+        return (on or date.today()).year - self.birth_year
+
+    def entity(self):
+        """The Patient/Employee this row was built from, if the roster kept them."""
+        return self._roster.entity(self._row)
+
+    def __repr__(self):
+        return f"RosterView(id={self.id}, birth_year={self.birth_year}, gender={self.gender!r}, nationality={self.nationality!r})"
+
+
+class Roster:
+    """Columnar census of patients and/or employees for vectorized statistics.
+
+    ``birth_years`` is an int16 array and gender, nationality and department
+    are ``CategoryColumn``s, so ages, grouped counts and percentiles are
+    whole-array NumPy operations instead of a loop over entity objects.
+    ``roster[i]`` is a ``RosterView`` over row ``i``.
+    """
+
+    def __init__(self, ids, birth_years, gender, nationality, department=None, entities=None):
+        self.ids = np.asarray(ids, dtype=np.int64)
+        self.birth_years = np.asarray(birth_years, dtype=np.int16)
+        if department is None:
+            department = [None] * len(self.ids)
+        self.columns = {
+            name: column if isinstance(column, CategoryColumn) else CategoryColumn.encode(column, _DICTIONARIES[name])
+            for name, column in zip(CATEGORIES, (gender, nationality, department))
+        }
+        if any(len(column) != len(self.ids) for column in (self.birth_years, *self.columns.values())):
+            raise ValueError("Roster columns must have the same length.")
+        self._entities = entities
+
+    @classmethod
+    def from_entities(cls, entities, keep=True):
+        """Roster of Patient/Employee objects; with ``keep`` rows map back to them via ``entity()``."""
+        entities = list(entities)
+        return cls(
+            np.fromiter((e.id for e in entities), dtype=np.int64, count=len(entities)),
+            np.fromiter((e.birth_year for e in entities), dtype=np.int16, count=len(entities)),
+            [e.gender for e in entities],
+            [e.nationality for e in entities],
+            [e.department if isinstance(e, Employee) else None for e in entities],
+            entities if keep else None,
+        )
+
+    @classmethod
+    def load(cls, kind=Patient, chunk_size=None):
+        """Roster of every patient (``Patient``) or employee (``Employee``), streamed from the database."""
+        if kind is Patient:
+            sql = "SELECT id, birth_year, gender, nationality, NULL FROM patient ORDER BY id;"
+        elif kind is Employee:
+            sql = "SELECT id, birth_year, gender, nationality, department FROM employee ORDER BY id;"
+        else:
+            raise ValueError("Rosters load Patient or Employee.")
+        ids, years = [], []
+        dictionaries = [_DICTIONARIES[name] for name in CATEGORIES]
+        codes = [[] for _ in CATEGORIES]
+        for row in HospitalDatabase().stream(sql, chunk_size=chunk_size):
+            ids.append(row[0])
+            years.append(row[1])
+            for dictionary, column_codes, value in zip(dictionaries, codes, row[2:]):
+                column_codes.append(-1 if value is None else dictionary.code(value))
+        columns = [CategoryColumn.shared(column_codes, dictionary) for column_codes, dictionary in zip(codes, dictionaries)]
+        return cls(ids, years, *columns)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, row):
+        if not -len(self) <= row < len(self):
+            raise IndexError("Roster row out of range.")
+        return RosterView(self, row % len(self))
+
+    def entity(self, row):
+        if self._entities is None:
+            raise LookupError("This roster was built without its entities.")
+        return self._entities[row]
+
+    def views(self, mask=None):
+        """Views of every row, or of the rows selected by a boolean ``mask``."""
+        rows = range(len(self)) if mask is None else np.flatnonzero(mask)
+        return (RosterView(self, int(row)) for row in rows)
+
+    def ages(self, on=None):
+        """Every row's age in years on ``on`` (default today), computed like ``Person.calculate_age``."""
+        return (on or date.today()).year - self.birth_years.astype(np.int32)
+
+    def mask(self, **criteria):
+        """Boolean mask of rows whose categories equal ``criteria`` (e.g. ``gender="Female"``)."""
+        result = np.ones(len(self), dtype=bool)
+        for name, label in criteria.items():
+            result &= self.columns[name].codes == self.columns[name].code(label)
+        return result
+
+    def _group_codes(self, by):
+        """One code per row combining the ``by`` categories, and the label tuple of each code."""
+        columns = [self.columns[name] for name in by]
+        sizes = [len(column.labels) for column in columns]
+        combined = np.zeros(len(self), dtype=np.int64)
+        for column, size in zip(columns, sizes):
+            combined = combined * size + column.codes
+
+        def labels(code):
+            return tuple(column.labels[c] for column, c in zip(columns, np.unravel_index(code, sizes)))
+        return combined, int(np.prod(sizes)), labels
+
+    def count_by(self, *by, mask=None):
+        """{(label, ...): rows} for each combination of the ``by`` categories present."""
+        combined, groups, labels = self._group_codes(by)
+        if mask is not None:
+            combined = combined[mask]
+        counts = np.bincount(combined, minlength=groups)
+        return {labels(code): int(counts[code]) for code in np.flatnonzero(counts)}
+
+    def age_histogram(self, bins=10, on=None, mask=None):
+        """(counts, bin edges) of ages, as ``numpy.histogram`` returns them."""
+        ages = self.ages(on)
+        return np.histogram(ages if mask is None else ages[mask], bins=bins)
+
+    def age_percentiles(self, q=(25, 50, 75), by=None, on=None, mask=None):
+        """Age percentiles (linear interpolation, like ``numpy.percentile``).
+
+        Without ``by`` returns an array with one value per ``q``; with
+        ``by`` (category names) a {(label, ...): array} dict, computed for
+        all groups at once from one sort.
+        """
+        q = np.asarray(q, dtype=np.float64) / 100
+        ages = self.ages(on)
+        if mask is not None:
+            ages = ages[mask]
+        if not by:
+            return np.percentile(ages, q * 100)
+
+        combined, groups, labels = self._group_codes(by)
+        if mask is not None:
+            combined = combined[mask]
+        ordered, present, starts, counts = group_sort(ages, combined, groups)
+        values = percentiles_of_sorted(ordered, starts, counts, q)
+        return {labels(code): values[i] for i, code in enumerate(present)}
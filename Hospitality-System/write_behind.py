@@ -0,0 +1,232 @@
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from datetime import datetime
+
+from pool import PoolTimeoutError
+
+logger = logging.getLogger("hospital.write_behind")
+
+_STOP = object()
+
+
+def _encode(value):
+    if isinstance(value, datetime):
+        return {"datetime": value.isoformat()}
+    raise TypeError(f"Cannot spool {type(value).__name__} values.")
+
+
+def _decode(obj):
+    if obj.keys() == {"datetime"}:
+        return datetime.fromisoformat(obj["datetime"])
+    return obj
+
+
+class WriteBehindWriter:
+    """Queue rows for ``table`` and insert them in batches on a background thread.
+
+    ``submit()`` appends the row to a local spool file before queueing it, so
+    rows survive a crash or a database outage and are replayed by the next
+    writer opened on the same spool. The thread writes a batch when
+    ``batch_size`` rows are waiting or ``flush_interval`` seconds after the
+    first one, in one transaction, then checkpoints the spool; it is
+    truncated whenever everything submitted is committed. Delivery is
+    at-least-once: a crash between a commit and its checkpoint replays that
+    batch. Rows the database rejects as invalid are logged and dropped;
+    connection errors are retried until ``close()``.
+    """
+
+    def __init__(self, db, table, columns, spool_path, batch_size=500, flush_interval=0.5, max_queue=10000, fsync=False, retry_interval=1.0):
+        self.db = db
+        self.table = table
+        self.columns = tuple(columns)
+        self.spool_path = spool_path
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retry_interval = retry_interval
+        self.fsync = fsync
+        self.written = 0
+        self.dropped = 0
+        self._queue = queue.Queue(max_queue)
+        self._submit_lock = threading.Lock()  # orders sequence numbers with queue positions
+        self._spool_lock = threading.Lock()
+        self._done = threading.Condition()
+        self._flush_requested = threading.Event()
+        self._stopping = threading.Event()
+        self._closed = False
+        self._seq = 0
+        self._committed = 0
+        self._replay = self._read_spool()
+        self._spool = open(spool_path, "a", encoding="utf-8")
+        self._thread = threading.Thread(target=self._run, name=f"write-behind-{table}", daemon=True)
+        self._thread.start()
+
+    @property
+    def pending(self):
+        """Rows submitted but not yet committed."""
+        return self._seq - self._committed
+
+    def submit(self, row):
+        """Spool ``row`` and queue it; blocks while the queue is full."""
+        if self._closed:
+            raise RuntimeError("Write-behind writer is closed.")
+        line = json.dumps(list(row), default=_encode)
+        with self._submit_lock:
+            self._seq += 1
+            seq = self._seq
+            with self._spool_lock:
+                self._spool.write(f'{{"seq":{seq},"row":{line}}}\n')
+                self._spool.flush()
+                if self.fsync:
+                    os.fsync(self._spool.fileno())
+            self._queue.put((seq, tuple(row)))
+
+    def flush(self, timeout=None):
+        """Wait until every row submitted so far is committed; False on timeout."""
+        target = self._seq
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self._flush_requested.set()
+        with self._done:
+            while self._committed < target:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                if not self._thread.is_alive():
+                    return False
+                self._done.wait(remaining if remaining is not None else 0.1)
+        return True
+
+    def close(self, timeout=None):
+        """Stop accepting rows, write what is queued, and stop the thread.
+
+        Rows that could not be written (database unreachable) stay in the
+        spool file for the next writer.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._stopping.set()
+        try:
+            self._queue.put_nowait(_STOP)  # wakes the thread now; a full queue is drained first
+        except queue.Full:
+            pass
+        self._thread.join(timeout)
+        if not self._thread.is_alive():
+            with self._spool_lock:
+                self._spool.close()
+        if self.pending:
+            logger.warning("⚠️ %d %s rows kept in spool %s.", self.pending, self.table, self.spool_path,
+                           extra={"event": "write_behind_spooled", "table": self.table, "count": self.pending})
+
+    def _read_spool(self):
+        """Uncommitted rows left by a previous writer, in submission order."""
+        if not os.path.exists(self.spool_path):
+            return []
+        rows, committed = [], 0
+        with open(self.spool_path, encoding="utf-8") as spool:
+            for line in spool:
+                try:
+                    entry = json.loads(line, object_hook=_decode)
+                except ValueError:
+                    break  # torn last line from a crash mid-write
+                if "committed" in entry:
+                    committed = max(committed, entry["committed"])
+                else:
+                    rows.append((entry["seq"], tuple(entry["row"])))
+        rows = [(seq, row) for seq, row in rows if seq > committed]
+        self._seq = self._committed = max([committed] + [seq for seq, _ in rows])
+        self._committed -= len(rows)
+        if rows:
+            logger.info("🔁 Replaying %d spooled %s rows.", len(rows), self.table,
+                        extra={"event": "write_behind_replay", "table": self.table, "count": len(rows)})
+        return rows
+
+    def _collect(self):
+        """Next batch of (seq, row) pairs; None once closed and drained."""
+        if self._replay:
+            batch, self._replay = self._replay[:self.batch_size], self._replay[self.batch_size:]
+            return batch
+        while True:
+            try:
+                item = self._queue.get(timeout=self.flush_interval)
+                break
+            except queue.Empty:
+                if self._stopping.is_set():
+                    return None
+        if item is _STOP:
+            return None
+        batch = [item]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if self._flush_requested.is_set() or self._stopping.is_set():
+                remaining = 0
+            try:
+                item = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is _STOP:
+                break  # _stopping ends the next _collect() once the queue is empty
+            batch.append(item)
+        self._flush_requested.clear()
+        return batch
+
+    def _run(self):
+        errors = self.db.errors
+        retryable = (*errors, PoolTimeoutError) if isinstance(errors, tuple) else (errors, PoolTimeoutError)
+        while True:
+            batch = self._collect()
+            if batch is None:
+                return
+            last = batch[-1][0]
+            while True:
+                try:
+                    self._write(batch)
+                    break
+                except retryable as err:
+                    logger.error("❌ Write-behind to %s failed: %s", self.table, err,
+                                 extra={"event": "write_behind_failed", "table": self.table, "count": len(batch)})
+                    if self._closed:
+                        return  # the rows are in the spool
+                    time.sleep(self.retry_interval)
+            self._checkpoint(last)
+
+    def _write(self, batch):
+        """Insert ``batch``; rows are removed from it as they are settled, so a retry resumes."""
+        db = self.db
+        rows = [row for _, row in batch]
+        try:
+            with db.transaction():
+                db.insert_many(self.table, self.columns, rows, len(rows))
+            self.written += len(rows)
+            batch.clear()
+            return
+        except db.backend.permanent_errors:
+            pass
+        # An invalid row spoiled the batch: write the rest one by one.
+        while batch:
+            row = batch[0][1]
+            try:
+                with db.transaction():
+                    db.insert_many(self.table, self.columns, [row])
+                self.written += 1
+            except db.backend.permanent_errors as err:
+                self.dropped += 1
+                logger.error("❌ Dropped %s row %s: %s", self.table, row, err,
+                             extra={"event": "write_behind_dropped", "table": self.table})
+            del batch[0]
+
+    def _checkpoint(self, seq):
+        with self._spool_lock:
+            if self._seq == seq:
+                self._spool.flush()
+                self._spool.truncate(0)  # append mode: the next write starts the empty file
+            else:
+                self._spool.write(f'{{"committed":{seq}}}\n')
+            self._spool.flush()
+        with self._done:
+            self._committed = seq
+            self._done.notify_all()